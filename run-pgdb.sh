@@ -18,13 +18,14 @@ python src/app-bundler.py \
     ${JSON_SCHEMA_FILE} \
     --no-encode \
     --extension-list json \
-    --language none
+    --language none \
+    --json summary
 
 # ddl-ast.json
 echo "------------------------------" > ${DDL_AST_FILE}
 echo "ddl-ast.json file:" >> ${DDL_AST_FILE}
 echo "------------------------------" >> ${DDL_AST_FILE}
-cat "${ROOT_DIR}/data/ddl-ast.json" >> ${DDL_AST_FILE}
+python src/json_stream.py summary "${ROOT_DIR}/data/ddl-ast.json" >> ${DDL_AST_FILE}
 
 # python scripts
 python src/python_bundler.py --no-encode ${ROOT_DIR}/src ${PYTHON_SCRIPTS_FILE}
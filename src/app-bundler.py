@@ -27,11 +27,27 @@
 import os
 import sys
 import base64
+import hashlib
 import zipfile
 import tempfile
 import fnmatch
+import shutil
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from textwrap import dedent
 
+from budget import fit_budget
+from bundle_index import BundleIndex, member_record
+from cli_options import parse_budget_option, parse_count_option
+from fs_walk import walk_files
+from js_imports import SCRIPT_EXTENSIONS, JsImportGraph
+from json_stream import DEFAULT_SUMMARY_THRESHOLD, json_action, write_json
+from path_trie import PathTrie, iter_tree_lines
+from prefetch import DEFAULT_PREFETCH, prefetch_files, read_for_zip, read_text, zipinfo_from_stat
+from source_strip import StripStats, strip_source
+
+DEFAULT_ROOT_WORKERS = 4  # --root-workers: multi-directory roots processed at once
+DEFAULT_NODE_EXTENSIONS = ['js','mjs','jsx','ts','tsx','css']  # when no --extension-list is given
+
 def should_include_file(file_path, input_dir, user_extensions=None, language='node', root_files=None, include_patterns=None):
     """
     Decide if file_path should be included based on:
@@ -74,7 +90,7 @@ def should_include_file(file_path, input_dir, user_extensions=None, language='no
     if language == 'node':
         # By default, if user hasn't provided an --extension-list, we use these
         if not user_extensions:
-            user_extensions = ['js','mjs','jsx','ts','tsx','css']
+            user_extensions = DEFAULT_NODE_EXTENSIONS
         # Normalize them
         user_extensions = [ext.lower() for ext in user_extensions]
 
@@ -111,7 +127,7 @@ def should_include_file(file_path, input_dir, user_extensions=None, language='no
     # If some other language is passed, we mimic 'node' logic as a fallback.
     else:
         if not user_extensions:
-            user_extensions = ['js','mjs','jsx','ts','tsx','css']
+            user_extensions = DEFAULT_NODE_EXTENSIONS
         user_extensions = [ext.lower() for ext in user_extensions]
 
         # If exactly 'package.json' at the root
@@ -130,65 +146,174 @@ def should_include_file(file_path, input_dir, user_extensions=None, language='no
 
         return False
 
-def get_included_files(input_dir, user_extensions=None, language='node', file_subset=None, root_files=None, include_patterns=None):
+def get_included_files(input_dir, user_extensions=None, language='node', file_subset=None, root_files=None, include_patterns=None, walk_workers=1, entry_points=None, import_cache=None):
     """
     Walk through input_dir and return a sorted list of files that meet the
     should_include_file(...) criteria. If file_subset (list) is provided,
     ALL files in that subset will be included regardless of normal filtering rules.
+
+    If entry_points (list of paths relative to input_dir) is provided and
+    there is no file_subset, only the import closure of those entry points is
+    included instead (see get_entry_point_files). An explicit file_subset
+    takes precedence over entry_points.
+
+    Discovery uses fs_walk.walk_files(); walk_workers > 1 reads that many
+    directories concurrently (useful on network mounts where readdir latency
+    dominates). Without a file_subset, node_modules/ and .next/ can never
+    contribute files, so they are pruned instead of walked.
     """
+    if entry_points and file_subset is not None:
+        print(f"Note: --file-subset is given, so --entry is ignored for {input_dir}.")
+    elif entry_points:
+        present = [e for e in entry_points if os.path.isfile(os.path.join(input_dir, e))]
+        if present:
+            return get_entry_point_files(input_dir, present, user_extensions, language, root_files, include_patterns, walk_workers, import_cache)
+        print(f"Note: none of the --entry files exist under {input_dir}; using normal filtering for it.")
+
+    def prune_excluded_dirs(parent, name):
+        return name in ('node_modules', '.next')
+
+    prune_dir = prune_excluded_dirs if file_subset is None else None
+
     included_files = []
-    for root, dirs, files in os.walk(input_dir):
-        for file in files:
-            filepath = os.path.join(root, file)
-            rel_path = os.path.relpath(filepath, start=input_dir)
-            
-            # FIXED LOGIC: If file_subset is provided, check it FIRST
-            # Files in the subset are ALWAYS included regardless of normal filtering
-            if file_subset is not None:
-                if rel_path in file_subset:
-                    included_files.append(rel_path)
-                    continue
-                # If file_subset is provided but this file is not in it, skip it
-                continue
-            
-            # If no file_subset, apply normal filtering rules
-            if should_include_file(filepath, input_dir, user_extensions, language, root_files, include_patterns):
+    for filepath in walk_files(input_dir, walk_workers, prune_dir=prune_dir):
+        rel_path = os.path.relpath(filepath, start=input_dir)
+
+        # FIXED LOGIC: If file_subset is provided, check it FIRST
+        # Files in the subset are ALWAYS included regardless of normal filtering
+        if file_subset is not None:
+            if rel_path in file_subset:
                 included_files.append(rel_path)
-                
+                continue
+            # If file_subset is provided but this file is not in it, skip it
+            continue
+
+        # If no file_subset, apply normal filtering rules
+        if should_include_file(filepath, input_dir, user_extensions, language, root_files, include_patterns):
+            included_files.append(rel_path)
+
     included_files.sort()
     return included_files
 
-def build_directory_tree_structure(files_list):
-    tree = {}
-    for f in files_list:
-        parts = f.split(os.sep)
-        current = tree
-        for p in parts[:-1]:
-            current = current.setdefault(p, {})
-        # Final part is the file name
-        current[parts[-1]] = None
-    return tree
-
-def format_directory_tree(tree, prefix=""):
-    # Sort directories first, then files
-    entries = sorted(tree.items(), key=lambda x: (x[1] is None, x[0]))
-    lines = []
-    for i, (name, subtree) in enumerate(entries):
-        connector = "├── " if i < len(entries) - 1 else "└── "
-        if subtree is None:
-            lines.append(prefix + connector + name)
-        else:
-            lines.append(prefix + connector + name)
-            new_prefix = prefix + ("│   " if i < len(entries) - 1 else "    ")
-            lines.extend(format_directory_tree(subtree, new_prefix))
-    return lines
+def get_entry_point_files(input_dir, entry_points, user_extensions=None, language='node', root_files=None, include_patterns=None, walk_workers=1, import_cache=None):
+    """
+    Entry-point mode (--entry): return the sorted relative paths of every file
+    reachable from entry_points through import / export-from / require() /
+    dynamic import(), resolved like Node and TypeScript would (see
+    js_imports.py), instead of every matching file under src/ and app/.
+
+    Imports also reach images, fonts and other assets, so the closure is
+    filtered by extension like the normal mode: --extension-list if given,
+    else DEFAULT_NODE_EXTENSIONS plus every script type js_imports.py
+    follows. The entry files themselves are always kept.
+
+    The usual extras are still added on top of the closure:
+      - 'package.json' (node mode) and --root-files entries at the root
+      - files matching --include-patterns (the only case that needs a walk)
+    """
+    if root_files is None:
+        root_files = []
+    if include_patterns is None:
+        include_patterns = []
+
+    graph = JsImportGraph(input_dir, cache_path=import_cache)
+    reachable = graph.closure([os.path.join(input_dir, e) for e in entry_points])
+    graph.save_cache()
+
+    if user_extensions:
+        wanted = {'.' + ext.lower().lstrip('.') for ext in user_extensions}
+    else:
+        wanted = {'.' + ext for ext in DEFAULT_NODE_EXTENSIONS} | set(SCRIPT_EXTENSIONS)
+
+    abs_input_dir = os.path.abspath(input_dir)
+    included = {os.path.normpath(e) for e in entry_points}
+    for p in reachable:
+        if os.path.splitext(p)[1].lower() in wanted:
+            included.add(os.path.relpath(p, start=abs_input_dir))
+
+    extras = list(root_files)
+    if language != 'none':
+        extras.append('package.json')
+    for name in extras:
+        if name and os.path.isfile(os.path.join(input_dir, name)):
+            included.add(name)
+
+    if include_patterns:
+        def prune_excluded_dirs(parent, name):
+            return name in ('node_modules', '.next')
+
+        for filepath in walk_files(input_dir, walk_workers, prune_dir=prune_excluded_dirs):
+            rel_path = os.path.relpath(filepath, start=input_dir)
+            if any(fnmatch.fnmatch(rel_path, pattern) for pattern in include_patterns):
+                included.add(rel_path)
+
+    return sorted(included)
+
+def budget_graph(input_dir, included_files, entry_points=None, import_cache=None):
+    """
+    Import-graph signals for --budget ranking, keyed by absolute path:
+    distances from the --entry files (if any) and the import edges of every
+    candidate JS/TS file (see js_imports.py).
+    """
+    abs_input_dir = os.path.abspath(input_dir)
+    graph = JsImportGraph(abs_input_dir, cache_path=import_cache)
+    distances = {}
+    if entry_points:
+        present = [os.path.join(abs_input_dir, e) for e in entry_points if os.path.isfile(os.path.join(abs_input_dir, e))]
+        distances = graph.closure(present)
+    scripts = [os.path.join(abs_input_dir, f) for f in included_files if f.endswith(SCRIPT_EXTENSIONS)]
+    graph.closure(scripts)  # fills graph.edges for every candidate script
+    graph.save_cache()
+    return distances, graph.edges
+
+def fit_roots_to_budget(roots, budget, no_encode, entry_points=None, import_cache=None):
+    """
+    --budget: rank the files of every non-tree-only root together (see
+    budget.py) and keep the most important ones that fit. roots is a list
+    of (input_dir, tree_only, included_files). Sizes come from stat(); in
+    --no-encode mode each file's '## File:' header counts too.
+    """
+    paths = []
+    headers = {}
+    distances = {}
+    edges = {}
+    for input_dir, tree_only, included_files in roots:
+        if tree_only:
+            continue
+        root_distances, root_edges = budget_graph(input_dir, included_files, entry_points, import_cache)
+        distances.update(root_distances)
+        edges.update(root_edges)
+        abs_input_dir = os.path.abspath(input_dir)
+        for f in included_files:
+            full = os.path.join(abs_input_dir, f)
+            paths.append(full)
+            if no_encode:
+                headers[full] = len(f"## File: {f}\n# Full path under root '{abs_input_dir}' is: {full}\n\n\n")
+    return fit_budget(paths, budget, distances, edges, overhead=lambda p: headers.get(p, 0))
 
-def write_directory_tree(out, included_files, root_dir):
+def budget_kept_files(input_dir, included_files, fit):
+    """
+    The included files whose contents are written, given a --budget fit
+    (all of them when there is no budget).
+    """
+    if fit is None:
+        return included_files
+    abs_input_dir = os.path.abspath(input_dir)
+    return [f for f in included_files if os.path.join(abs_input_dir, f) in fit.kept]
+
+def write_directory_tree(out, included_files, root_dir, tree_opts=None):
     """
     Writes a tree structure to 'out', including the actual root directory name
     (instead of just '.').
+
+    The tree is built as a compact PathTrie (see path_trie.py) and streamed
+    line by line, so very large trees never exist as one big list of lines.
+    tree_opts may contain 'max_depth' and/or 'collapse_threshold' to summarize
+    deep or huge directories as '… (N files)'.
     """
-    tree_structure = build_directory_tree_structure(included_files)
+    if tree_opts is None:
+        tree_opts = {}
+    tree = PathTrie.from_paths(included_files)
     out.write("Project Directory Structure:\n\n")
     out.write("```\n")
     # Use the base name of the provided directory instead of '.'
@@ -196,41 +321,143 @@ def write_directory_tree(out, included_files, root_dir):
     if not root_name:
         root_name = '.'
     out.write(root_name + "\n")
-    lines = format_directory_tree(tree_structure)
-    for line in lines:
+    for line in iter_tree_lines(tree, dirs_first=True,
+                                max_depth=tree_opts.get('max_depth'),
+                                collapse_threshold=tree_opts.get('collapse_threshold')):
         out.write(line + "\n")
     out.write("```\n\n")
 
-def zip_filtered_directory(input_dir, zip_path, included_files):
+def zip_filtered_directory(input_dir, zip_path, included_files, strip_mode=None, stats=None, prefetch=DEFAULT_PREFETCH, members=None, json_opts=None):
+    """
+    ZIP the included files. With --strip, text files are stored minified
+    (binary / non-UTF-8 files are stored as-is).
+
+    Files are read up to 'prefetch' ahead in background threads (see
+    prefetch.py) while the current one is compressed, in the same order.
+    If 'members' is a list, an --index-out record of each stored file is
+    appended to it. With --json, .json files are streamed into the ZIP
+    (summaries are stored as '<file>.summary.txt').
+    """
+    full_paths = [os.path.join(input_dir, f) for f in included_files]
+    reader = skip_json_reads(read_for_zip, json_opts, lambda path: (os.stat(path), None))
     with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for f in included_files:
-            filepath = os.path.join(input_dir, f)
-            zipf.write(filepath, f)
+        for f, (filepath, (st, raw)) in zip(included_files, prefetch_files(full_paths, reader, prefetch)):
+            if raw is None:
+                # --json: minified or summarized straight into the archive
+                arcname = f
+                if json_action(st.st_size, json_opts['mode'], json_opts['threshold']) == 'summary':
+                    arcname = f + ".summary.txt"
+                zinfo = zipinfo_from_stat(st, arcname)
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                with zipf.open(zinfo, 'w') as dest:
+                    _, length, digest = stream_json_listing(filepath, json_opts, dest, 'utf-8', binary=True, size=st.st_size)
+                if stats is not None:
+                    stats.add_bytes(st.st_size, length)
+                if members is not None:
+                    members.append(member_record(arcname, None, length, digest))
+                continue
+            zinfo = zipinfo_from_stat(st, f)
+            if strip_mode is not None or stats is not None:
+                try:
+                    text = raw.decode('utf-8')
+                except UnicodeDecodeError:
+                    text = None
+                if text is not None:
+                    raw = strip_listing_text(text, f, strip_mode, stats).encode('utf-8')
+            zipf.writestr(zinfo, raw, compress_type=zipfile.ZIP_DEFLATED)
+            if members is not None:
+                members.append(member_record(f, raw))
+
+def strip_listing_text(text, fpath, strip_mode=None, stats=None):
+    """
+    Apply --strip ('all' or 'lines') to one file's text and record --stats.
+    """
+    written = text
+    if strip_mode is not None:
+        written = strip_source(text, fpath, keep_lines=(strip_mode == 'lines'))
+    if stats is not None:
+        stats.add(text, written)
+    return written
+
+def skip_json_reads(reader, json_opts, placeholder):
+    """
+    With --json, .json files are streamed by the writer rather than read
+    ahead: wrap 'reader' so it returns placeholder(path) for them instead.
+    """
+    if json_opts is None:
+        return reader
+    def read(path):
+        if os.path.splitext(path)[1].lower() == ".json":
+            return placeholder(path)
+        return reader(path)
+    return read
 
-def write_direct_listings(input_dir, output_file, included_files):
+def stream_json_listing(full_path, json_opts, dest, encoding, binary=False, size=None):
+    """
+    --json: write one .json file to 'dest' minified or summarized (see
+    json_stream.py), without holding the file in memory. Returns the
+    action taken ('minify' or 'summary') and the byte length and sha256 hex
+    digest of what was written, for --stats and --index-out.
+    """
+    sha = hashlib.sha256()
+    length = 0
+    def write(text):
+        nonlocal length
+        data = text.encode(encoding)
+        sha.update(data)
+        length += len(data)
+        dest.write(data if binary else text)
+    action = write_json(full_path, json_opts['mode'], write, json_opts['threshold'], size)
+    return action, length, sha.hexdigest()
+
+def write_direct_listings(input_dir, output_file, included_files, tree_opts=None, strip_mode=None, stats=None, prefetch=DEFAULT_PREFETCH, index=None, fit=None, json_opts=None):
     """
     Writes the directory tree and the actual contents of each included file.
     Also includes the full disk path for clarity.
+
+    File contents are read up to 'prefetch' files ahead (see prefetch.py),
+    so disk latency overlaps with writing the output. With an --index-out
+    BundleIndex, the byte range of each file's contents is recorded. With a
+    --budget fit, only the kept files' contents are written; the tree still
+    shows every included file. With --json, .json files are streamed in
+    minified or summarized (see json_stream.py).
     """
-    with open(output_file, "a") as out:  # 'a' to append if multiple dirs
-        write_directory_tree(out, included_files, input_dir)
+    listed_files = budget_kept_files(input_dir, included_files, fit)
+    full_paths = [os.path.join(input_dir, f) for f in listed_files]
+    reader = skip_json_reads(read_text, json_opts, lambda path: None)
+    with open(output_file, "a", encoding="utf-8") as out:  # 'a' to append if multiple dirs
+        write_directory_tree(out, included_files, input_dir, tree_opts)
+        if fit is not None:
+            out.write(fit.note() + "\n\n")
 
-        for fpath in included_files:
+        for fpath, (full_path, text) in zip(listed_files, prefetch_files(full_paths, reader, prefetch)):
             out.write(f"## File: {fpath}\n")
             # Provide the absolute path as a comment
             out.write(f"# Full path under root '{os.path.abspath(input_dir)}' is: {os.path.join(os.path.abspath(input_dir), fpath)}\n\n")
-            full_path = os.path.join(input_dir, fpath)
-            with open(full_path, "r", encoding='utf-8', errors='replace') as f:
-                out.write(f.read())
-                out.write("\n")
+            if index is not None:
+                start = out.tell()
+            if text is None:
+                # --json: streamed straight into the bundle
+                size = os.path.getsize(full_path)
+                action, length, digest = stream_json_listing(full_path, json_opts, out, out.encoding or "utf-8", size=size)
+                if stats is not None:
+                    stats.add_bytes(size, length)
+                if index is not None:
+                    index.add_range(input_dir, fpath + (".summary.txt" if action == "summary" else ""), start, length, digest)
+            else:
+                written = strip_listing_text(text, fpath, strip_mode, stats)
+                out.write(written)
+                if index is not None:
+                    index.add_text(out, input_dir, fpath, start, written)
+            out.write("\n")
 
-def write_direct_listings_tree_only(input_dir, output_file, included_files):
+def write_direct_listings_tree_only(input_dir, output_file, included_files, tree_opts=None):
     """
     Writes only the directory tree for the given root,
     omitting file contents (tree-only mode).
     """
-    with open(output_file, "a") as out:
-        write_directory_tree(out, included_files, input_dir)
+    with open(output_file, "a", encoding="utf-8") as out:
+        write_directory_tree(out, included_files, input_dir, tree_opts)
 
 def write_direct_listings_instructions(output_file):
     """
@@ -248,34 +475,42 @@ def write_direct_listings_instructions(output_file):
     1. Imagine these files are restored into a directory structure according to their paths.
     2. Review and potentially improve the code. Ask any follow-up questions if needed.
     ''')
-    with open(output_file, "a") as out:
+    with open(output_file, "a", encoding="utf-8") as out:
         out.write(instructions)
         out.write("\n")
 
-def write_encoded_listing(input_dir, output_file, included_files):
+def write_encoded_listing(input_dir, output_file, included_files, tree_opts=None, strip_mode=None, stats=None, prefetch=DEFAULT_PREFETCH, index=None, fit=None, json_opts=None):
     """
     Writes the directory tree plus a base64-encoded ZIP of included files.
+    With an --index-out BundleIndex, the position of the base64 text and
+    the ZIP's members are recorded. With a --budget fit, only the kept files
+    go into the ZIP; the tree still shows every included file.
     """
+    members = [] if index is not None else None
     with tempfile.TemporaryDirectory() as tmpdir:
         zip_path = os.path.join(tmpdir, "filtered_app.zip")
-        zip_filtered_directory(input_dir, zip_path, included_files)
+        zip_filtered_directory(input_dir, zip_path, budget_kept_files(input_dir, included_files, fit), strip_mode, stats, prefetch, members, json_opts)
 
         with open(zip_path, "rb") as f:
             zip_data = f.read()
             encoded = base64.b64encode(zip_data).decode('utf-8')
 
-    with open(output_file, "a") as out:
-        write_directory_tree(out, included_files, input_dir)
+    with open(output_file, "a", encoding="utf-8") as out:
+        write_directory_tree(out, included_files, input_dir, tree_opts)
+        if fit is not None:
+            out.write(fit.note() + "\n\n")
+        if index is not None:
+            index.add_zip(input_dir, out.tell(), len(encoded), members)
         out.write(encoded)
         out.write("\n")
 
-def write_encoded_listing_tree_only(input_dir, output_file, included_files):
+def write_encoded_listing_tree_only(input_dir, output_file, included_files, tree_opts=None):
     """
     In encoded mode, if a root is tree-only, we do NOT add file contents to the ZIP,
     effectively giving only the directory tree. (We still show the tree for clarity.)
     """
-    with open(output_file, "a") as out:
-        write_directory_tree(out, included_files, input_dir)
+    with open(output_file, "a", encoding="utf-8") as out:
+        write_directory_tree(out, included_files, input_dir, tree_opts)
 
 def write_encoded_instructions(output_file):
     """
@@ -300,11 +535,34 @@ def write_encoded_instructions(output_file):
     4. If --language=none + --extension-list="json", you'll see .json files from the entire project (excluding package.json).
     5. Files matching --include-patterns will be included regardless of language mode.
     6. If --file-subset is used, ALL files in the subset will be included regardless of other filtering rules.
+    7. If --entry is used, only the files reachable from the entry files through imports/require() are included
+       (plus package.json, --root-files and --include-patterns matches).
     ''')
-    with open(output_file, "a") as out:
+    with open(output_file, "a", encoding="utf-8") as out:
         out.write(instructions)
         out.write("\n")
 
+def run_per_root(func, items, workers=DEFAULT_ROOT_WORKERS):
+    """
+    Return [func(item) for item in items], running up to 'workers' of them
+    at once (multi-directory roots are independent of each other). The
+    first failure is raised as soon as it happens, and roots that haven't
+    started yet are cancelled.
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    pool = ThreadPoolExecutor(max_workers=min(workers, len(items)))
+    try:
+        futures = [pool.submit(func, item) for item in items]
+        wait(futures, return_when=FIRST_EXCEPTION)
+        for fut in futures:
+            if fut.done() and fut.exception() is not None:
+                raise fut.exception()
+        return [fut.result() for fut in futures]
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
 def parse_options(arglist, start_index):
     """
     Parse global options (before we parse directories in multi-mode).
@@ -316,6 +574,18 @@ def parse_options(arglist, start_index):
         - file_subset (list or None)
         - root_files (list or None)
         - include_patterns (list or None)  <-- new addition
+        - tree_opts (dict): 'max_depth' / 'collapse_threshold' for the directory tree
+        - walk_workers (int): directories scanned concurrently during discovery
+        - entry_points (list or None): --entry files whose import closure is bundled
+        - import_cache (str or None): --import-cache JSON file for import scans
+        - strip_mode (None, 'all' or 'lines'): --strip / --strip=lines minification
+        - show_stats (bool): --stats
+        - prefetch (int): --prefetch, files read ahead while writing (0 disables)
+        - index_out (str or None): --index-out sidecar index file (see bundle_index.py)
+        - budget (int or None): --budget in bytes (see budget.py)
+        - json_opts (dict or None): --json 'mode' ('minify' / 'summary') and
+          --json-threshold 'threshold' in bytes (see json_stream.py)
+        - root_workers (int): --root-workers, multi-directory roots processed concurrently
     """
     ne = False
     ue = None
@@ -323,6 +593,18 @@ def parse_options(arglist, start_index):
     file_subset = None  # new variable
     root_files = []     # new variable for additional root-level files
     include_patterns = []  # new variable for glob patterns
+    tree_opts = {}  # --tree-max-depth / --tree-collapse
+    walk_workers = 1  # --walk-workers
+    entry_points = None  # --entry
+    import_cache = None  # --import-cache
+    strip_mode = None  # --strip / --strip=lines
+    show_stats = False  # --stats
+    prefetch = DEFAULT_PREFETCH  # --prefetch
+    index_out = None  # --index-out
+    budget = None  # --budget
+    json_mode = None  # --json
+    json_threshold = DEFAULT_SUMMARY_THRESHOLD  # --json-threshold
+    root_workers = DEFAULT_ROOT_WORKERS  # --root-workers
     i = start_index
     while i < len(arglist):
         item = arglist[i]
@@ -402,13 +684,159 @@ def parse_options(arglist, start_index):
             val = item.split("=", 1)[1]
             include_patterns = [pattern.strip() for pattern in val.split(",")]
             i += 1
+        elif item == "--tree-max-depth":
+            # e.g. --tree-max-depth 3
+            if i + 1 >= len(arglist):
+                print("Error: --tree-max-depth requires a number of directory levels.")
+                sys.exit(1)
+            tree_opts['max_depth'] = parse_count_option("--tree-max-depth", arglist[i+1])
+            i += 2
+        elif item.startswith("--tree-max-depth="):
+            # e.g. --tree-max-depth=3
+            val = item.split("=", 1)[1]
+            tree_opts['max_depth'] = parse_count_option("--tree-max-depth", val)
+            i += 1
+        elif item == "--tree-collapse":
+            # e.g. --tree-collapse 200  (directories with more files become '… (N files)')
+            if i + 1 >= len(arglist):
+                print("Error: --tree-collapse requires a file count threshold.")
+                sys.exit(1)
+            tree_opts['collapse_threshold'] = parse_count_option("--tree-collapse", arglist[i+1])
+            i += 2
+        elif item.startswith("--tree-collapse="):
+            # e.g. --tree-collapse=200
+            val = item.split("=", 1)[1]
+            tree_opts['collapse_threshold'] = parse_count_option("--tree-collapse", val)
+            i += 1
+        elif item == "--walk-workers":
+            # e.g. --walk-workers 16  (parallel directory scan for slow filesystems)
+            if i + 1 >= len(arglist):
+                print("Error: --walk-workers requires a number of threads.")
+                sys.exit(1)
+            walk_workers = parse_count_option("--walk-workers", arglist[i+1])
+            i += 2
+        elif item.startswith("--walk-workers="):
+            # e.g. --walk-workers=16
+            val = item.split("=", 1)[1]
+            walk_workers = parse_count_option("--walk-workers", val)
+            i += 1
+        elif item == "--root-workers":
+            # e.g. --root-workers 8  (multi-directory roots bundled concurrently; 1 = one at a time)
+            if i + 1 >= len(arglist):
+                print("Error: --root-workers requires a number of threads.")
+                sys.exit(1)
+            root_workers = parse_count_option("--root-workers", arglist[i+1])
+            i += 2
+        elif item.startswith("--root-workers="):
+            # e.g. --root-workers=8
+            val = item.split("=", 1)[1]
+            root_workers = parse_count_option("--root-workers", val)
+            i += 1
+        elif item == "--entry":
+            # e.g. --entry src/index.ts,app/page.tsx
+            if i + 1 >= len(arglist):
+                print("Error: --entry requires a comma-separated list of entry files.")
+                sys.exit(1)
+            entry_points = [e.strip() for e in arglist[i+1].split(",") if e.strip()]
+            i += 2
+        elif item.startswith("--entry="):
+            # e.g. --entry=src/index.ts,app/page.tsx
+            val = item.split("=", 1)[1]
+            entry_points = [e.strip() for e in val.split(",") if e.strip()]
+            i += 1
+        elif item == "--import-cache":
+            # e.g. --import-cache .bundler-imports.json
+            if i + 1 >= len(arglist):
+                print("Error: --import-cache requires a path to a cache file.")
+                sys.exit(1)
+            import_cache = arglist[i+1].strip()
+            i += 2
+        elif item.startswith("--import-cache="):
+            # e.g. --import-cache=.bundler-imports.json
+            import_cache = item.split("=", 1)[1].strip()
+            i += 1
+        elif item == "--strip":
+            # Remove comments, docstrings and blank lines from listed files
+            strip_mode = 'all'
+            i += 1
+        elif item.startswith("--strip="):
+            # e.g. --strip=lines  (keep line structure, so line numbers still match)
+            val = item.split("=", 1)[1].strip().lower()
+            if val not in ('all', 'lines'):
+                print(f"Error: --strip accepts 'all' or 'lines' (got '{val}').")
+                sys.exit(1)
+            strip_mode = val
+            i += 1
+        elif item == "--stats":
+            show_stats = True
+            i += 1
+        elif item == "--prefetch":
+            # e.g. --prefetch 16  (read-ahead depth; 0 reads one file at a time)
+            if i + 1 >= len(arglist):
+                print("Error: --prefetch requires a number of files.")
+                sys.exit(1)
+            prefetch = parse_count_option("--prefetch", arglist[i+1])
+            i += 2
+        elif item.startswith("--prefetch="):
+            # e.g. --prefetch=16
+            val = item.split("=", 1)[1]
+            prefetch = parse_count_option("--prefetch", val)
+            i += 1
+        elif item == "--index-out":
+            # e.g. --index-out out.txt.index.json  (byte offsets for unbundle.py)
+            if i + 1 >= len(arglist):
+                print("Error: --index-out requires a path for the index file.")
+                sys.exit(1)
+            index_out = arglist[i+1].strip()
+            i += 2
+        elif item.startswith("--index-out="):
+            # e.g. --index-out=out.txt.index.json
+            index_out = item.split("=", 1)[1].strip()
+            i += 1
+        elif item == "--budget":
+            # e.g. --budget 200k  or  --budget 48ktok  (keep the most important files that fit)
+            if i + 1 >= len(arglist):
+                print("Error: --budget requires a size (e.g. 200k or 48ktok).")
+                sys.exit(1)
+            budget = parse_budget_option(arglist[i+1])
+            i += 2
+        elif item.startswith("--budget="):
+            # e.g. --budget=200k
+            budget = parse_budget_option(item.split("=", 1)[1])
+            i += 1
+        elif item == "--json" or item.startswith("--json="):
+            # e.g. --json summary  or  --json=minify  (stream .json files instead of copying them)
+            if item == "--json":
+                if i + 1 >= len(arglist):
+                    print("Error: --json requires a mode (minify or summary).")
+                    sys.exit(1)
+                json_mode = arglist[i+1].strip().lower()
+                i += 2
+            else:
+                json_mode = item.split("=", 1)[1].strip().lower()
+                i += 1
+            if json_mode not in ("minify", "summary"):
+                print(f"Error: --json must be 'minify' or 'summary' (got '{json_mode}').")
+                sys.exit(1)
+        elif item == "--json-threshold":
+            # e.g. --json-threshold 5m  (--json summary only summarizes larger files)
+            if i + 1 >= len(arglist):
+                print("Error: --json-threshold requires a size (e.g. 500k or 5m).")
+                sys.exit(1)
+            json_threshold = parse_budget_option(arglist[i+1], "--json-threshold")
+            i += 2
+        elif item.startswith("--json-threshold="):
+            # e.g. --json-threshold=5m
+            json_threshold = parse_budget_option(item.split("=", 1)[1], "--json-threshold")
+            i += 1
         elif item.startswith("--"):
             # If this is something else, break (it might be directory-specific like --tree-only)
             break
         else:
             # Not an option, so break
             break
-    return i, ne, ue, lang, file_subset, root_files, include_patterns
+    json_opts = {'mode': json_mode, 'threshold': json_threshold} if json_mode else None
+    return i, ne, ue, lang, file_subset, root_files, include_patterns, tree_opts, walk_workers, entry_points, import_cache, strip_mode, show_stats, prefetch, index_out, budget, json_opts, root_workers
 
 def parse_directories_with_tree_only(arglist, start_index):
     """
@@ -431,13 +859,13 @@ def parse_directories_with_tree_only(arglist, start_index):
             i += 1
     return dirs_info
 
-if __name__ == "__main__":
-    args = sys.argv[1:]
+def main(argv):
+    args = list(argv)
     if len(args) < 2:
         print("Usage (single directory):")
-        print("   python bundler.py <input_directory> <output_text_file> [--no-encode] [--extension-list EXT_LIST] [--language LANG] [--tree-only] [--file-subset path_to_file] [--root-files rootfile1,rootfile2] [--include-patterns pattern1,pattern2]")
+        print("   python bundler.py <input_directory> <output_text_file> [--no-encode] [--extension-list EXT_LIST] [--language LANG] [--tree-only] [--file-subset path_to_file] [--root-files rootfile1,rootfile2] [--include-patterns pattern1,pattern2] [--tree-max-depth N] [--tree-collapse N] [--walk-workers N] [--entry file1,file2] [--import-cache path] [--strip[=lines]] [--stats] [--prefetch N] [--index-out path] [--budget SIZE] [--json minify|summary] [--json-threshold SIZE]")
         print("Usage (multiple directories):")
-        print("   python bundler.py <output_text_file> [--no-encode] [--extension-list EXT_LIST] [--language LANG] [--file-subset path_to_file] [--root-files rootfile1,rootfile2] [--include-patterns pattern1,pattern2]")
+        print("   python bundler.py <output_text_file> [--no-encode] [--extension-list EXT_LIST] [--language LANG] [--file-subset path_to_file] [--root-files rootfile1,rootfile2] [--include-patterns pattern1,pattern2] [--tree-max-depth N] [--tree-collapse N] [--walk-workers N] [--entry file1,file2] [--import-cache path] [--strip[=lines]] [--stats] [--prefetch N] [--index-out path] [--budget SIZE] [--json minify|summary] [--json-threshold SIZE] [--root-workers N]")
         print("       <dir1> [--tree-only] <dir2> [--tree-only] ...")
         sys.exit(1)
 
@@ -457,58 +885,110 @@ if __name__ == "__main__":
     file_subset = None
     root_files = []
     include_patterns = []
+    tree_opts = {}
+    walk_workers = 1
+    entry_points = None
+    import_cache = None
+    strip_mode = None
+    show_stats = False
+    prefetch = DEFAULT_PREFETCH
+    index_out = None
+    budget = None
+    json_opts = None
+    root_workers = DEFAULT_ROOT_WORKERS
 
     if might_be_multi_mode:
         # Multi-directory approach
         output_text_file = args[0]
-        idx, no_encode, user_extensions, language, file_subset, root_files, include_patterns = parse_options(args, 1)
+        idx, no_encode, user_extensions, language, file_subset, root_files, include_patterns, tree_opts, walk_workers, entry_points, import_cache, strip_mode, show_stats, prefetch, index_out, budget, json_opts, root_workers = parse_options(args, 1)
         dirs_info = parse_directories_with_tree_only(args, idx)
         if not dirs_info:
             print("Error: no input directories specified in multi-directory mode.")
             sys.exit(1)
 
-        # Overwrite the output file from scratch:
-        with open(output_text_file, "w"):
-            pass
+        # Check every root before doing any work, so a bad path fails fast
+        for (d, tree_only) in dirs_info:
+            if not os.path.isdir(d):
+                print(f"Error: {d} is not a directory.")
+                sys.exit(1)
 
-        saw_non_tree = False
+        stats = StripStats() if show_stats else None
+        index = BundleIndex() if index_out else None
+        saw_non_tree = any(not tree_only for (d, tree_only) in dirs_info)
 
-        if no_encode:
-            for (d, tree_only) in dirs_info:
-                if not os.path.isdir(d):
-                    print(f"Error: {d} is not a directory.")
-                    sys.exit(1)
-                included_files = get_included_files(d, user_extensions, language, file_subset, root_files, include_patterns)
+        # Roots are independent, so they are scanned concurrently (one at a
+        # time with --import-cache, whose file every root reads and rewrites).
+        # Every root's files are gathered first, so --budget can rank them together.
+        def gather_root(root):
+            return get_included_files(root[0], user_extensions, language, file_subset, root_files, include_patterns, walk_workers, entry_points, import_cache)
+
+        # Each root is then written to its own segment file, concurrently; the
+        # segments are concatenated in command-line order, so the output is
+        # byte-identical to writing the roots one after another, and the output
+        # file is only touched once every root has succeeded.
+        def write_root(job):
+            n, (d, tree_only, included_files) = job
+            segment = os.path.join(segment_dir, f"root-{n}.txt")
+            root_stats = StripStats() if stats is not None else None
+            root_index = BundleIndex() if index is not None else None
+            with open(segment, "w"):
+                pass
+            if no_encode:
                 if tree_only:
-                    write_direct_listings_tree_only(d, output_text_file, included_files)
+                    write_direct_listings_tree_only(d, segment, included_files, tree_opts)
                 else:
-                    saw_non_tree = True
-                    write_direct_listings(d, output_text_file, included_files)
+                    write_direct_listings(d, segment, included_files, tree_opts, strip_mode, root_stats, prefetch, root_index, fit, json_opts)
+            else:
+                if tree_only:
+                    write_encoded_listing_tree_only(d, segment, included_files, tree_opts)
+                else:
+                    write_encoded_listing(d, segment, included_files, tree_opts, strip_mode, root_stats, prefetch, root_index, fit, json_opts)
+            return segment, root_stats, root_index
+
+        with tempfile.TemporaryDirectory() as segment_dir:
+            try:
+                gathered = run_per_root(gather_root, dirs_info, root_workers if import_cache is None else 1)
+                roots = [(d, tree_only, included_files) for (d, tree_only), included_files in zip(dirs_info, gathered)]
+                fit = fit_roots_to_budget(roots, budget, no_encode, entry_points, import_cache) if budget is not None else None
+                segments = run_per_root(write_root, list(enumerate(roots)), root_workers)
+            except OSError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+
+            # Overwrite the output file from scratch:
+            with open(output_text_file, "wb") as out:
+                for segment, root_stats, root_index in segments:
+                    if index is not None:
+                        index.extend(root_index, out.tell())
+                    if stats is not None:
+                        stats.merge(root_stats)
+                    with open(segment, "rb") as f:
+                        shutil.copyfileobj(f, out)
+
+        if no_encode:
             if saw_non_tree:
                 write_direct_listings_instructions(output_text_file)
             print(f"Included files have been listed (or tree-only) in {output_text_file}.")
 
         else:
-            for (d, tree_only) in dirs_info:
-                if not os.path.isdir(d):
-                    print(f"Error: {d} is not a directory.")
-                    sys.exit(1)
-                included_files = get_included_files(d, user_extensions, language, file_subset, root_files, include_patterns)
-                if tree_only:
-                    write_encoded_listing_tree_only(d, output_text_file, included_files)
-                else:
-                    saw_non_tree = True
-                    write_encoded_listing(d, output_text_file, included_files)
             if saw_non_tree:
                 write_encoded_instructions(output_text_file)
             print(f"Filtered files have been bundled or listed as tree-only in {output_text_file}.")
             print("Copy/paste it into the chat environment and follow instructions at the bottom of that file.")
 
+        if fit is not None:
+            fit.report()
+        if index is not None:
+            index.write(index_out, output_text_file)
+            print(f"Byte-offset index written to {index_out} (extract files with unbundle.py).")
+        if stats is not None:
+            stats.report(output_text_file)
+
     else:
         # Single-directory usage
         input_directory = args[0]
         output_text_file = args[1]
-        opt_index, no_encode, user_extensions, language, file_subset, root_files, include_patterns = parse_options(args, 2)
+        opt_index, no_encode, user_extensions, language, file_subset, root_files, include_patterns, tree_opts, walk_workers, entry_points, import_cache, strip_mode, show_stats, prefetch, index_out, budget, json_opts, root_workers = parse_options(args, 2)
         tree_only = False
         if opt_index < len(args) and args[opt_index] == "--tree-only":
             tree_only = True
@@ -518,26 +998,50 @@ if __name__ == "__main__":
             print(f"Error: {input_directory} is not a directory.")
             sys.exit(1)
 
-        included_files = get_included_files(input_directory, user_extensions, language, file_subset, root_files, include_patterns)
+        included_files = get_included_files(input_directory, user_extensions, language, file_subset, root_files, include_patterns, walk_workers, entry_points, import_cache)
 
         # Overwrite the output file from scratch:
         with open(output_text_file, "w"):
             pass
 
+        stats = StripStats() if show_stats else None
+        index = BundleIndex() if index_out else None
+        fit = None
+        if budget is not None and not tree_only:
+            fit = fit_roots_to_budget([(input_directory, tree_only, included_files)], budget, no_encode, entry_points, import_cache)
         if no_encode:
             if tree_only:
-                write_direct_listings_tree_only(input_directory, output_text_file, included_files)
+                write_direct_listings_tree_only(input_directory, output_text_file, included_files, tree_opts)
                 print(f"Tree-only listing for {input_directory} has been written to {output_text_file}.")
             else:
-                write_direct_listings(input_directory, output_text_file, included_files)
+                write_direct_listings(input_directory, output_text_file, included_files, tree_opts, strip_mode, stats, prefetch, index, fit, json_opts)
                 write_direct_listings_instructions(output_text_file)
                 print(f"Included files have been listed directly in {output_text_file}.")
         else:
             if tree_only:
-                write_encoded_listing_tree_only(input_directory, output_text_file, included_files)
+                write_encoded_listing_tree_only(input_directory, output_text_file, included_files, tree_opts)
                 print(f"Tree-only listing (no file contents) for {input_directory} has been written to {output_text_file}.")
             else:
-                write_encoded_listing(input_directory, output_text_file, included_files)
+                write_encoded_listing(input_directory, output_text_file, included_files, tree_opts, strip_mode, stats, prefetch, index, fit, json_opts)
                 write_encoded_instructions(output_text_file)
                 print(f"Filtered files have been bundled + base64-encoded in {output_text_file}.")
                 print("Copy/paste it into the chat environment and follow instructions at the bottom of that file.")
+
+        if fit is not None:
+            fit.report()
+        if index is not None:
+            index.write(index_out, output_text_file)
+            print(f"Byte-offset index written to {index_out} (extract files with unbundle.py).")
+        if stats is not None:
+            stats.report(output_text_file)
+
+
+if __name__ == "__main__":
+    # With BUNDLER_DAEMON_SOCKET set, hand the run to a warm bundler daemon
+    # (see bundler_daemon.py); falls back to running here if none answers.
+    from bundler_client import forward_to_daemon
+    status = forward_to_daemon("app-bundler", sys.argv[1:])
+    if status is None:
+        main(sys.argv[1:])
+    else:
+        sys.exit(status)
@@ -0,0 +1,161 @@
+# src/budget.py
+#
+# --budget support shared by app-bundler.py and python_bundler.py.
+#
+# Instead of hand-editing --file-subset lists until a bundle fits, --budget
+# ranks every candidate file and greedily keeps the most important ones
+# until the budget is used up. Files that don't make it stay in the
+# directory tree (tree-only mention) but their contents are left out.
+# Entry points (import distance 0) are always kept, even when they alone
+# exceed the budget: a bundle without them is of no use.
+#
+# Ranking signals (each normalized to 0..1):
+#   - distance: 1 / (1 + import distance from the nearest entry point),
+#     when the bundle has entry points (python file roots, app-bundler --entry)
+#   - centrality: how many other candidates import the file (log-scaled)
+#   - recency: rank of the file's mtime among the candidates
+#   - size: a small preference for smaller files, so one huge file doesn't
+#     crowd out many useful ones
+#
+# Accounting never reads file contents: a file's cost is its os.stat() size
+# plus the caller's per-file header overhead. Token budgets are converted at
+# the usual ~4 bytes per token.
+
+import os
+import re
+import math
+import bisect
+
+BYTES_PER_TOKEN = 4
+
+_BUDGET_RE = re.compile(r'^(\d+(?:\.\d+)?)\s*([km]?)\s*(b|bytes|t|tok|tokens)?$')
+
+
+def parse_budget(value, option="--budget"):
+    """
+    Parse a --budget value into bytes. Accepts a byte count ('150000',
+    '150k', '2m') or a token count ('32000tok', '32ktok', '1mtokens'),
+    with k = 1000 and m = 1000000. Raises ValueError for anything else
+    (the message names `option`, so other size options can share this).
+    """
+    m = _BUDGET_RE.match(value.strip().lower())
+    if not m:
+        raise ValueError(f"{option} expects a size like 150k or 32ktok (got '{value}')")
+    amount = float(m.group(1)) * {'': 1, 'k': 1000, 'm': 1000000}[m.group(2)]
+    if m.group(3) in ('t', 'tok', 'tokens'):
+        amount *= BYTES_PER_TOKEN
+    return int(amount)
+
+
+class BudgetFit:
+    """
+    Result of fit_budget(): the kept paths (a set), the omitted paths (in
+    rank order) and the bytes used out of the budget.
+    """
+
+    def __init__(self, kept, omitted, used, budget):
+        self.kept = kept
+        self.omitted = omitted
+        self.used = used
+        self.budget = budget
+
+    def note(self):
+        """
+        One line for the bundle itself, right after the directory tree.
+        """
+        total = len(self.kept) + len(self.omitted)
+        return (f"Note: --budget kept the contents of {len(self.kept)} of {total} files; "
+                f"the other {len(self.omitted)} appear in the directory tree only.")
+
+    def report(self):
+        """
+        Console summary, printed after the bundle is written.
+        """
+        print(f"Budget: kept {len(self.kept)} files, ~{self.used:,} of {self.budget:,} bytes "
+              f"(~{self.used // BYTES_PER_TOKEN:,} of {self.budget // BYTES_PER_TOKEN:,} tokens); "
+              f"{len(self.omitted)} files listed in the tree only.")
+
+
+def rank_files(paths, distances=None, edges=None, sizes=None, mtimes=None):
+    """
+    Return paths ordered from most to least important.
+
+    - distances: {path: import distance from the nearest entry point}
+    - edges: {path: iterable of paths it imports}
+    - sizes / mtimes: {path: value}, from os.stat() when not given
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+    if sizes is None or mtimes is None:
+        sizes, mtimes = stat_files(paths)
+
+    candidates = set(paths)
+    in_degree = dict.fromkeys(paths, 0)
+    for src, deps in (edges or {}).items():
+        if src not in candidates:
+            continue
+        for dep in set(deps):
+            if dep in candidates and dep != src:
+                in_degree[dep] += 1
+    max_in = max(in_degree.values())
+
+    # Files with the same mtime share a rank (the number of older files), so
+    # ties are left to the final size/path ordering.
+    ages = sorted(mtimes[p] for p in paths)
+    recency = {p: (bisect.bisect_left(ages, mtimes[p]) / (len(paths) - 1) if len(paths) > 1 else 1.0)
+               for p in paths}
+    max_size = max(sizes.values()) or 1
+
+    def score(p):
+        central = math.log1p(in_degree[p]) / math.log1p(max_in) if max_in else 0.0
+        small = 1.0 - math.log1p(sizes[p]) / math.log1p(max_size)
+        if distances:
+            d = distances.get(p)
+            near = 1.0 / (1 + d) if d is not None else 0.0
+            return 0.45 * near + 0.25 * central + 0.2 * recency[p] + 0.1 * small
+        return 0.45 * central + 0.4 * recency[p] + 0.15 * small
+
+    return sorted(paths, key=lambda p: (-score(p), sizes[p], p))
+
+
+def stat_files(paths):
+    """
+    ({path: size}, {path: mtime}) from one os.stat() per file (0 if missing).
+    """
+    sizes = {}
+    mtimes = {}
+    for p in paths:
+        try:
+            st = os.stat(p)
+        except OSError:
+            sizes[p] = 0
+            mtimes[p] = 0
+            continue
+        sizes[p] = st.st_size
+        mtimes[p] = st.st_mtime
+    return sizes, mtimes
+
+
+def fit_budget(paths, budget, distances=None, edges=None, overhead=None):
+    """
+    Greedily keep the highest-ranked paths whose cost (size + overhead(path))
+    still fits in `budget` bytes; lower-ranked files that fit are still taken
+    after a bigger one is skipped. Entry points (distance 0) are kept first,
+    whatever they cost.
+    """
+    paths = list(paths)
+    sizes, mtimes = stat_files(paths)
+    kept = set()
+    omitted = []
+    used = 0
+    ranked = rank_files(paths, distances, edges, sizes, mtimes)
+    entries = {p for p in ranked if distances and distances.get(p) == 0}
+    for p in [p for p in ranked if p in entries] + [p for p in ranked if p not in entries]:
+        cost = sizes[p] + (overhead(p) if overhead is not None else 0)
+        if p in entries or used + cost <= budget:
+            kept.add(p)
+            used += cost
+        else:
+            omitted.append(p)
+    return BudgetFit(kept, omitted, used, budget)
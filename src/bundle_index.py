@@ -0,0 +1,133 @@
+# src/bundle_index.py
+#
+# Sidecar index for bundle outputs (--index-out), shared by app-bundler.py
+# and python_bundler.py and read back by unbundle.py.
+#
+# Without an index, getting one file back out of a multi-MB bundle means
+# scanning the whole text for "## File:" / "--- BEGIN FILE:" markers. The
+# index is a small JSON file recording, for every bundled file, where its
+# bytes are:
+#
+#   {
+#     "format": "bundle-index", "version": 1,
+#     "bundle": "out.txt", "bundle_size": 123456,
+#     "zips":    [{"root": "/abs/root", "offset": 1024, "length": 88000}],
+#     "entries": [
+#       {"root": "/abs/root", "path": "src/a.js",                      # plain-text listing:
+#        "offset": 2048, "length": 512, "sha256": "..."},              #   byte range in the bundle
+#       {"root": "/abs/root", "path": "src/b.js",                      # base64 ZIP member:
+#        "zip": 0, "length": 900, "sha256": "..."}                     #   found via the ZIP's central directory
+#     ]
+#   }
+#
+# Offsets and lengths are in bytes of the bundle file; sha256/length are
+# those of the file contents exactly as bundled (after --slice/--strip).
+
+import os
+import json
+import hashlib
+
+INDEX_FORMAT = "bundle-index"
+INDEX_VERSION = 1
+
+
+def member_record(arcname, data, length=None, sha256=None):
+    """
+    Index entry (without root/zip) for a file stored in a ZIP bundle. For a
+    member that was streamed into the ZIP, pass data=None with its length
+    and sha256 hex digest.
+    """
+    return {
+        "path": arcname.replace(os.sep, "/"),
+        "length": len(data) if data is not None else length,
+        "sha256": hashlib.sha256(data).hexdigest() if data is not None else sha256,
+    }
+
+
+class BundleIndex:
+    """
+    Collects index entries while a bundle is written.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.zips = []
+
+    def add_text(self, out, root, path, start, text):
+        """
+        Record a file whose text was just written to the text stream `out`,
+        starting at byte offset `start` (out.tell() before the write).
+        """
+        data = text.encode(out.encoding or "utf-8")
+        self.add_range(root, path, start, out.tell() - start, hashlib.sha256(data).hexdigest())
+
+    def add_range(self, root, path, offset, length, sha256):
+        """
+        Record a file written as `length` bytes at `offset` whose sha256 hex
+        digest was computed while it was written (e.g. streamed --json output).
+        """
+        self.entries.append({
+            "root": os.path.abspath(root),
+            "path": path.replace(os.sep, "/"),
+            "offset": offset,
+            "length": length,
+            "sha256": sha256,
+        })
+
+    def add_zip(self, root, offset, length, members):
+        """
+        Record a base64-encoded ZIP written at byte `offset` (`length` bytes of
+        base64 text) and the member_record()s of the files inside it.
+        """
+        zip_id = len(self.zips)
+        root = os.path.abspath(root)
+        self.zips.append({"root": root, "offset": offset, "length": length})
+        for member in members:
+            self.entries.append(dict(member, root=root, zip=zip_id))
+
+    def extend(self, other, offset):
+        """
+        Append the entries of another BundleIndex whose bundle text was
+        copied into this bundle at byte `offset` (e.g. a multi-directory
+        root written to its own segment file).
+        """
+        zip_base = len(self.zips)
+        for region in other.zips:
+            self.zips.append(dict(region, offset=region["offset"] + offset))
+        for entry in other.entries:
+            entry = dict(entry)
+            if "zip" in entry:
+                entry["zip"] += zip_base
+            else:
+                entry["offset"] += offset
+            self.entries.append(entry)
+
+    def write(self, index_path, bundle_path):
+        """
+        Write the index once the bundle is complete.
+        """
+        data = {
+            "format": INDEX_FORMAT,
+            "version": INDEX_VERSION,
+            "bundle": os.path.basename(bundle_path),
+            "bundle_size": os.path.getsize(bundle_path),
+            "zips": self.zips,
+            "entries": self.entries,
+        }
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+            f.write("\n")
+
+
+def load_index(index_path):
+    """
+    Read an index written by BundleIndex.write(). Raises ValueError if the
+    file isn't a bundle index this version understands.
+    """
+    with open(index_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get("format") != INDEX_FORMAT:
+        raise ValueError(f"{index_path} is not a bundle index")
+    if data.get("version") != INDEX_VERSION:
+        raise ValueError(f"{index_path} has unsupported index version {data.get('version')!r}")
+    return data
@@ -0,0 +1,103 @@
+# src/bundler_client.py
+#
+# Thin client for the bundler daemon (bundler_daemon.py).
+#
+# app-bundler.py and python_bundler.py call forward_to_daemon() before doing
+# any work: when the BUNDLER_DAEMON_SOCKET environment variable names the
+# daemon's Unix socket, the command line is forwarded there and the daemon
+# (whose directory index, import graph and file-content caches are already
+# warm) produces the exact same output file and messages a standalone run
+# would. If the variable is unset, or nothing answers on the socket, the
+# script simply runs itself as usual.
+#
+# This module only imports what it needs to talk to the socket, so it can
+# also be run directly as the cheapest possible client:
+#
+#   python3 src/bundler_client.py app-bundler <app-bundler arguments...>
+#   python3 src/bundler_client.py python_bundler <python_bundler arguments...>
+
+import os
+import sys
+import json
+import socket
+
+SOCKET_ENV = "BUNDLER_DAEMON_SOCKET"
+TOOLS = ("app-bundler", "python_bundler")
+
+
+def default_socket_path():
+    """
+    Socket used when BUNDLER_DAEMON_SOCKET is not set (per-user, in $TMPDIR).
+    """
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), f"bundler-daemon-{os.getuid()}.sock")
+
+
+def daemon_request(socket_path, request, timeout=None):
+    """
+    Send one JSON request to the daemon and return its JSON reply.
+    Raises OSError if the daemon can't be reached.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def forward_to_daemon(tool, argv, socket_path=None, quiet=False):
+    """
+    Run `tool argv` in the daemon. Returns the exit status after replaying the
+    daemon's stdout/stderr here, or None if no daemon is configured/reachable
+    (the caller then runs standalone; quiet=True suppresses the note saying so).
+    """
+    if socket_path is None:
+        socket_path = os.environ.get(SOCKET_ENV)
+        if not socket_path:
+            return None
+
+    request = {
+        "cmd": "run",
+        "tool": tool,
+        "argv": list(argv),
+        "cwd": os.getcwd(),
+        "umask": _current_umask(),
+    }
+    try:
+        reply = daemon_request(socket_path, request)
+    except (OSError, ValueError):
+        if not quiet:
+            sys.stderr.write(f"Note: no bundler daemon answering on {socket_path}; running standalone.\n")
+        return None
+
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stdout.flush()
+    sys.stderr.write(reply.get("stderr", ""))
+    return reply.get("status", 1)
+
+
+def _current_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in TOOLS:
+        print("Usage: python3 bundler_client.py {app-bundler|python_bundler} <arguments...>")
+        print(f"       (socket: ${SOCKET_ENV}, default {default_socket_path()})")
+        sys.exit(1)
+    path = os.environ.get(SOCKET_ENV) or default_socket_path()
+    status = forward_to_daemon(sys.argv[1], sys.argv[2:], path, quiet=True)
+    if status is None:
+        print(f"Error: no bundler daemon is running on {path}.")
+        print("Start one with: python3 src/bundler_daemon.py start")
+        sys.exit(1)
+    sys.exit(status)
@@ -0,0 +1,318 @@
+# src/bundler_daemon.py
+#
+# Optional long-lived bundler daemon.
+#
+# Every one-shot run of app-bundler.py / python_bundler.py pays for
+# interpreter startup, module imports, a full directory walk, re-parsing
+# every import and re-reading every file. When the same project is bundled
+# over and over (editor integrations, watch scripts, CI steps), nearly all
+# of that work is repeated on unchanged files.
+#
+# The daemon loads both bundlers once and keeps warm_cache.py enabled, so
+# across requests it reuses:
+#   - directory listings (fs_walk), re-read only when a directory's mtime changes
+#   - parsed Python imports and JS/TS import specifiers, per file
+#   - file contents, within a memory budget (--cache-mb, default 256)
+# Every cached entry is validated against a fresh stat() before use.
+#
+# Requests arrive on a Unix domain socket (see bundler_client.py). Each one
+# runs the bundler's normal main(argv) in the client's working directory and
+# umask, with stdout/stderr captured and sent back, so the output file and
+# messages are exactly those of a standalone run (both bundlers write their
+# output files as UTF-8 whatever the locale, so the daemon's locale can't
+# change the bytes; messages are re-encoded by the client's own stdout and
+# stderr). Requests run one at a time.
+# If any bundler source file changes, the modules are reloaded (and the
+# caches dropped) before the next request.
+#
+# Usage:
+#   python3 src/bundler_daemon.py start  [--socket PATH] [--cache-mb N]   (background)
+#   python3 src/bundler_daemon.py serve  [--socket PATH] [--cache-mb N]   (foreground)
+#   python3 src/bundler_daemon.py status [--socket PATH]
+#   python3 src/bundler_daemon.py stop   [--socket PATH]
+#
+# Then point the bundlers at it:
+#   export BUNDLER_DAEMON_SOCKET=<socket path printed by start>
+#   python3 src/app-bundler.py ...        (forwards to the daemon)
+
+import os
+import io
+import sys
+import json
+import time
+import signal
+import threading
+import traceback
+import socketserver
+import subprocess
+import importlib
+import importlib.util
+from contextlib import redirect_stdout, redirect_stderr
+
+from bundler_client import SOCKET_ENV, TOOLS, daemon_request, default_socket_path
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOL_FILES = {
+    "app-bundler": "app-bundler.py",
+    "python_bundler": "python_bundler.py",
+}
+
+
+class BundlerRuntime:
+    """
+    The loaded bundler modules plus the bookkeeping needed to reload them
+    when their sources change.
+    """
+
+    def __init__(self, cache_bytes):
+        self.cache_bytes = cache_bytes
+        self.tools = {}
+        self.signature = None
+        self.started = time.time()
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def _source_signature(self):
+        sig = []
+        for name in sorted(os.listdir(SRC_DIR)):
+            if name.endswith(".py"):
+                try:
+                    sig.append((name, os.stat(os.path.join(SRC_DIR, name)).st_mtime_ns))
+                except OSError:
+                    pass
+        return sig
+
+    def _load(self):
+        # Drop every module loaded from this directory (except ourselves and
+        # the client helpers we already hold) so edits are picked up.
+        keep = {__name__, "bundler_client"}
+        for mod_name, mod in list(sys.modules.items()):
+            mod_file = getattr(mod, "__file__", None)
+            if mod_name in keep or not mod_file:
+                continue
+            if os.path.dirname(os.path.abspath(mod_file)) == SRC_DIR:
+                del sys.modules[mod_name]
+
+        warm_cache = importlib.import_module("warm_cache")
+        warm_cache.enable(self.cache_bytes)
+
+        tools = {}
+        for tool, filename in TOOL_FILES.items():
+            # app-bundler.py isn't a valid module name, so load both by path.
+            mod_name = tool.replace("-", "_") + "_daemon"
+            spec = importlib.util.spec_from_file_location(mod_name, os.path.join(SRC_DIR, filename))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            tools[tool] = module
+        self.tools = tools
+
+    def ensure_loaded(self):
+        signature = self._source_signature()
+        if signature != self.signature:
+            self._load()
+            self.signature = signature
+
+    def run(self, tool, argv, cwd, umask):
+        """
+        Run one bundler command as if from `cwd`; returns (status, stdout, stderr).
+        """
+        with self.lock:
+            self.ensure_loaded()
+            self.requests += 1
+            out = io.StringIO()
+            err = io.StringIO()
+            old_cwd = os.getcwd()
+            old_umask = os.umask(umask) if umask is not None else None
+            try:
+                os.chdir(cwd)
+                with redirect_stdout(out), redirect_stderr(err):
+                    try:
+                        self.tools[tool].main(argv)
+                        status = 0
+                    except SystemExit as e:
+                        status = exit_status(e.code)
+                    except Exception:
+                        traceback.print_exc()
+                        status = 1
+            except OSError as e:
+                err.write(f"Error: bundler daemon can't run in {cwd}: {e}\n")
+                status = 1
+            finally:
+                os.chdir(old_cwd)
+                if old_umask is not None:
+                    os.umask(old_umask)
+            return status, out.getvalue(), err.getvalue()
+
+    def status(self):
+        warm_cache = sys.modules.get("warm_cache")
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "cache": warm_cache.stats() if warm_cache else {},
+        }
+
+
+def exit_status(code):
+    """
+    Map SystemExit.code to a process exit status the way the interpreter does
+    (a non-integer code is printed to stderr and means status 1).
+    """
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+        except ValueError:
+            return
+        runtime = self.server.runtime
+        cmd = request.get("cmd")
+        if cmd == "run" and request.get("tool") in TOOLS:
+            status, out, err = runtime.run(request["tool"], request.get("argv", []),
+                                           request.get("cwd", "/"), request.get("umask"))
+            reply = {"status": status, "stdout": out, "stderr": err}
+        elif cmd == "status":
+            reply = runtime.status()
+        elif cmd == "stop":
+            reply = {"stopping": True}
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            reply = {"status": 1, "stderr": f"Error: unknown bundler daemon request {cmd!r}.\n"}
+        self.wfile.write(json.dumps(reply).encode("utf-8"))
+
+
+class BundlerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def is_running(socket_path):
+    try:
+        daemon_request(socket_path, {"cmd": "status"}, timeout=2)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def serve(socket_path, cache_bytes):
+    if is_running(socket_path):
+        print(f"Error: a bundler daemon is already running on {socket_path}.")
+        sys.exit(1)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # stale socket from a daemon that didn't exit cleanly
+
+    runtime = BundlerRuntime(cache_bytes)
+    runtime.ensure_loaded()
+
+    old_umask = os.umask(0o177)  # socket is private to this user
+    try:
+        server = BundlerServer(socket_path, RequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.runtime = runtime
+
+    def on_sigterm(signum, frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+    print(f"Bundler daemon (pid {os.getpid()}) listening on {socket_path}")
+    print(f"Use it with: export {SOCKET_ENV}={socket_path}")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+def start(socket_path, cache_bytes):
+    if is_running(socket_path):
+        print(f"A bundler daemon is already running on {socket_path}.")
+        print(f"Use it with: export {SOCKET_ENV}={socket_path}")
+        return
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve",
+         "--socket", socket_path, "--cache-mb", str(cache_bytes // (1024 * 1024))],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        if is_running(socket_path):
+            print(f"Bundler daemon (pid {proc.pid}) started on {socket_path}")
+            print(f"Use it with: export {SOCKET_ENV}={socket_path}")
+            return
+        if proc.poll() is not None:
+            break
+        time.sleep(0.05)
+    print("Error: the bundler daemon did not start (try `serve` to see why).")
+    sys.exit(1)
+
+
+def main(argv):
+    usage = "Usage: python3 bundler_daemon.py {start|serve|status|stop} [--socket PATH] [--cache-mb N]"
+    if not argv or argv[0] not in ("start", "serve", "status", "stop"):
+        print(usage)
+        sys.exit(1)
+    command = argv[0]
+    socket_path = os.environ.get(SOCKET_ENV) or default_socket_path()
+    cache_mb = 256
+
+    i = 1
+    while i < len(argv):
+        if argv[i] == "--socket" and i + 1 < len(argv):
+            socket_path = argv[i + 1]
+            i += 2
+        elif argv[i] == "--cache-mb" and i + 1 < len(argv):
+            try:
+                cache_mb = int(argv[i + 1])
+            except ValueError:
+                cache_mb = -1
+            if cache_mb < 0:
+                print(f"Error: --cache-mb expects a non-negative integer, got '{argv[i + 1]}'.")
+                sys.exit(1)
+            i += 2
+        else:
+            print(usage)
+            sys.exit(1)
+    socket_path = os.path.abspath(socket_path)
+    cache_bytes = cache_mb * 1024 * 1024
+
+    if command == "serve":
+        serve(socket_path, cache_bytes)
+    elif command == "start":
+        start(socket_path, cache_bytes)
+    elif command == "status":
+        try:
+            info = daemon_request(socket_path, {"cmd": "status"}, timeout=5)
+        except (OSError, ValueError):
+            print(f"No bundler daemon is running on {socket_path}.")
+            sys.exit(1)
+        cache = info.get("cache", {})
+        print(f"Bundler daemon (pid {info.get('pid')}) on {socket_path}")
+        print(f"  uptime: {info.get('uptime')}s, requests served: {info.get('requests')}")
+        print(f"  cached files: {cache.get('cached_files', 0)} "
+              f"({cache.get('cached_bytes', 0)} of {cache.get('max_bytes', 0)} bytes), "
+              f"derived entries: {cache.get('derived_entries', 0)}")
+    elif command == "stop":
+        try:
+            daemon_request(socket_path, {"cmd": "stop"}, timeout=5)
+        except (OSError, ValueError):
+            print(f"No bundler daemon is running on {socket_path}.")
+            sys.exit(1)
+        print(f"Bundler daemon on {socket_path} is shutting down.")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,39 @@
+# src/cli_options.py
+#
+# Option value parsing shared by app-bundler.py, python_bundler.py and the
+# json_stream.py command line.
+#
+# Both bundlers parse their command lines by hand. These helpers turn one
+# option value into a number, or print "Error: ..." and exit with status 1,
+# the same way the rest of each bundler reports a bad command line.
+
+import sys
+
+from budget import parse_budget
+
+
+def parse_count_option(name, val):
+    """
+    Parse a non-negative integer option value, exiting with an error message
+    if it is not one.
+    """
+    try:
+        count = int(val.strip())
+    except ValueError:
+        count = -1
+    if count < 0:
+        print(f"Error: {name} requires a non-negative integer (got '{val}').")
+        sys.exit(1)
+    return count
+
+
+def parse_budget_option(val, option="--budget"):
+    """
+    Parse a --budget (or other size) value (see budget.parse_budget),
+    exiting with an error message if it is not valid.
+    """
+    try:
+        return parse_budget(val, option)
+    except ValueError as e:
+        print(f"Error: {e}.")
+        sys.exit(1)
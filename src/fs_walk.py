@@ -0,0 +1,126 @@
+# src/fs_walk.py
+#
+# Directory discovery shared by app-bundler.py and python_bundler.py.
+#
+# os.walk() reads one directory at a time. On network mounts and slow
+# container overlays each readdir is a round-trip, so discovery time is
+# dominated by latency rather than CPU. walk_files() scans independent
+# subtrees in parallel with a bounded thread pool (workers > 1), using the
+# type information already carried by os.scandir() DirEntry objects so no
+# extra stat() calls are made. With workers <= 1 it scans serially in the
+# calling thread.
+#
+# The result matches os.walk(top) (followlinks=False, errors ignored):
+#   - every non-directory entry (including symlinks to files) is a file
+#   - symlinks to directories are neither listed as files nor descended into
+#   - unreadable directories are silently skipped
+
+import os
+from fnmatch import fnmatch
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import warm_cache
+
+
+def path_matches_any(rel_path, patterns):
+    """
+    gitignore-style glob matching of a relative path (os.sep separated)
+    against patterns:
+      - 'build' or '*.egg-info' match that name at any depth
+      - 'tests/fixtures' matches that path suffix at any depth
+      - '/build' only matches at the top of the tree
+    """
+    rel_path = rel_path.replace(os.sep, '/')
+    for pattern in patterns:
+        if pattern.startswith('/'):
+            if fnmatch(rel_path, pattern[1:]):
+                return True
+        elif fnmatch(rel_path, pattern) or fnmatch(rel_path, '*/' + pattern):
+            return True
+    return False
+
+
+def list_directory(dir_path):
+    """
+    Unfiltered listing of one directory as (name, path, is_real_dir) tuples,
+    where is_real_dir is True only for non-symlink subdirectories and None
+    for symlinks to directories. Unreadable directories list as empty, and
+    so does one whose reading fails part-way (e.g. a stale NFS handle, or
+    the directory being removed mid-scan), as os.walk() skips it.
+    """
+    listing = []
+    try:
+        it = os.scandir(dir_path)
+    except OSError:
+        return listing
+    try:
+        with it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    try:
+                        if entry.is_symlink():
+                            is_dir = None
+                    except OSError:
+                        pass
+                listing.append((entry.name, entry.path, is_dir))
+    except OSError:
+        return []
+    return listing
+
+
+def scan_directory(dir_path, prune_dir=None, keep_file=None):
+    """
+    Read a single directory. Returns (file_paths, subdir_paths) where
+    file_paths are the files kept by keep_file(name) and subdir_paths are the
+    real (non-symlink) subdirectories not rejected by prune_dir(dir_path, name).
+
+    The raw listing goes through warm_cache, so in the daemon an unchanged
+    directory (same mtime) is not read again.
+    """
+    files = []
+    subdirs = []
+    for name, path, is_dir in warm_cache.derived("dir", dir_path, list_directory):
+        if is_dir is False:
+            if keep_file is None or keep_file(name):
+                files.append(path)
+        elif is_dir:
+            if prune_dir is not None and prune_dir(dir_path, name):
+                continue
+            subdirs.append(path)
+    return files, subdirs
+
+
+def walk_files(base_dir, workers=1, prune_dir=None, keep_file=None):
+    """
+    Return a sorted list of file paths (joined onto base_dir, as os.walk would
+    produce them) for every file under base_dir.
+
+    - workers: number of directories read concurrently (<= 1 means serial).
+    - prune_dir(parent_dir, name): return True to skip a subdirectory entirely.
+    - keep_file(name): return False to drop a file by name.
+    """
+    found = []
+    if workers is None or workers <= 1:
+        pending = [base_dir]
+        while pending:
+            files, subdirs = scan_directory(pending.pop(), prune_dir, keep_file)
+            found.extend(files)
+            pending.extend(subdirs)
+        found.sort()
+        return found
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {pool.submit(scan_directory, base_dir, prune_dir, keep_file)}
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                files, subdirs = fut.result()
+                found.extend(files)
+                for sub in subdirs:
+                    running.add(pool.submit(scan_directory, sub, prune_dir, keep_file))
+    found.sort()
+    return found
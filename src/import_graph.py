@@ -0,0 +1,185 @@
+# src/import_graph.py
+#
+# --graph-out support for python_bundler.py.
+#
+# find_local_dependencies() walks the import graph to compute the closure,
+# but only the resulting set of files used to survive. With --graph-out the
+# walk records the graph itself and writes it as JSON (or Graphviz DOT when
+# the path ends in .dot):
+#
+#   {
+#     "format": "python-import-graph", "version": 1,
+#     "base_dir": "/abs/project",
+#     "nodes": [{"path": "pkg/util.py", "size": 2048, "parse_ms": 0.41,
+#                "source": "project root", "depth": 1, "listed": true}],
+#     "edges": [{"from": "main.py", "to": "pkg/util.py",
+#                "kind": "from", "module": "pkg.util", "line": 3}],
+#     "unresolved": [{"from": "main.py", "module": "requests",
+#                     "kind": "absolute", "line": 1, "reason": "not found locally"}]
+#   }
+#
+# - node source: how the file got into the closure ('entry point',
+#   'directory scan', 'project root' / 'importer directory' for the base an
+#   import was resolved against, 'package __init__')
+# - parse_ms: time spent getting the file's imports (parse, or a warm-cache
+#   hit in the bundler daemon); null for files that were never parsed
+# - depth: import distance from the nearest entry point (file roots only)
+# - listed: whether the file's contents are in the bundle (after --slice /
+#   --budget)
+# - edge kind: 'absolute' (import x), 'from' (from x import y) or
+#   'relative' (from . import y, from .x import y); an import of a local
+#   package (from pkg import util) is an edge to its __init__.py
+# - unresolved reason: 'stdlib', or 'not found locally' (third-party
+#   packages, or local modules the resolver can't find)
+#
+# Paths are relative to the bundle's base directory (multi-root bundles may
+# have '../' paths, as in the bundle itself).
+
+import os
+import sys
+import json
+
+GRAPH_FORMAT = "python-import-graph"
+GRAPH_VERSION = 1
+
+STDLIB_MODULES = frozenset(getattr(sys, "stdlib_module_names", ())) | frozenset(sys.builtin_module_names)
+
+EDGE_STYLES = {"absolute": "solid", "from": "solid", "relative": "dashed"}
+
+
+class ImportGraph:
+    """
+    Nodes, edges and unresolved imports collected while the bundler
+    resolves imports, keyed by absolute path.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.edges = []
+        self.unresolved = []
+        self._edge_keys = set()
+
+    def add_node(self, path, source, depth=None):
+        """
+        Add a file (the first source recorded for it wins) and keep the
+        smallest depth seen.
+        """
+        node = self.nodes.get(path)
+        if node is None:
+            node = self.nodes[path] = {"source": source, "depth": depth, "parse_ms": None}
+        elif depth is not None and (node["depth"] is None or depth < node["depth"]):
+            node["depth"] = depth
+        return node
+
+    def set_parse_time(self, path, seconds):
+        self.add_node(path, "project root")["parse_ms"] = round(seconds * 1000, 3)
+
+    def set_error(self, path, message):
+        self.add_node(path, "directory scan")["error"] = message
+
+    def add_edge(self, src, dst, kind, module, line, source):
+        """
+        Record that src imports dst; 'source' is the resolution source used
+        if dst is new to the graph.
+        """
+        self.add_node(dst, source)
+        key = (src, dst, kind)
+        if key not in self._edge_keys:
+            self._edge_keys.add(key)
+            self.edges.append((src, dst, kind, module, line))
+
+    def add_unresolved(self, src, module, kind, line):
+        reason = "stdlib" if module.split(".")[0] in STDLIB_MODULES else "not found locally"
+        self.unresolved.append((src, module, kind, line, reason))
+
+    def to_dict(self, base_dir, listed_files=None):
+        """
+        The JSON document described at the top of this file.
+        """
+        listed = set(listed_files) if listed_files is not None else set(self.nodes)
+
+        def rel(path):
+            return os.path.relpath(path, start=base_dir).replace(os.sep, "/")
+
+        nodes = []
+        for path in sorted(self.nodes):
+            node = self.nodes[path]
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = None
+            record = {
+                "path": rel(path),
+                "size": size,
+                "parse_ms": node["parse_ms"],
+                "source": node["source"],
+                "depth": node["depth"],
+                "listed": path in listed,
+            }
+            if "error" in node:
+                record["error"] = node["error"]
+            nodes.append(record)
+        return {
+            "format": GRAPH_FORMAT,
+            "version": GRAPH_VERSION,
+            "base_dir": os.path.abspath(base_dir),
+            "nodes": nodes,
+            "edges": [
+                {"from": rel(src), "to": rel(dst), "kind": kind, "module": module, "line": line}
+                for src, dst, kind, module, line in self.edges
+            ],
+            "unresolved": [
+                {"from": rel(src), "module": module, "kind": kind, "line": line, "reason": reason}
+                for src, module, kind, line, reason in self.unresolved
+            ],
+        }
+
+    def write(self, graph_path, base_dir, listed_files=None):
+        """
+        Write the graph as JSON, or as DOT if graph_path ends in '.dot'.
+        """
+        data = self.to_dict(base_dir, listed_files)
+        with open(graph_path, "w", encoding="utf-8") as f:
+            if graph_path.lower().endswith(".dot"):
+                write_dot(f, data)
+            else:
+                json.dump(data, f, indent=1)
+                f.write("\n")
+        return data
+
+
+def _dot_quote(text):
+    return '"' + str(text).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def write_dot(f, data):
+    """
+    Graphviz rendering of to_dict()'s data: one box per file (size and parse
+    time in the label, files left out of the bundle greyed), relative
+    imports dashed, unresolved imports as comments at the end.
+    """
+    f.write("digraph imports {\n")
+    f.write("  rankdir=LR;\n")
+    f.write("  node [shape=box, fontname=\"monospace\", fontsize=10];\n")
+    for node in data["nodes"]:
+        label = node["path"]
+        details = []
+        if node["size"] is not None:
+            details.append(f"{node['size']:,} B")
+        if node["parse_ms"] is not None:
+            details.append(f"{node['parse_ms']:.2f} ms")
+        if details:
+            label += "\n" + ", ".join(details)
+        attrs = [f"label={_dot_quote(label)}", f"tooltip={_dot_quote(node['source'])}"]
+        if not node["listed"]:
+            attrs.append("style=dashed, fontcolor=gray50, color=gray50")
+        f.write(f"  {_dot_quote(node['path'])} [{', '.join(attrs)}];\n")
+    for edge in data["edges"]:
+        style = EDGE_STYLES.get(edge["kind"], "solid")
+        f.write(f"  {_dot_quote(edge['from'])} -> {_dot_quote(edge['to'])} "
+                f"[style={style}, tooltip={_dot_quote(edge['kind'] + ': ' + edge['module'])}];\n")
+    if data["unresolved"]:
+        f.write("  // unresolved imports (from, module, kind, line, reason):\n")
+        for item in data["unresolved"]:
+            f.write(f"  //   {item['from']}: {item['module']} ({item['kind']}, line {item['line']}, {item['reason']})\n")
+    f.write("}\n")
@@ -0,0 +1,534 @@
+# src/js_imports.py
+#
+# Entry-point mode for app-bundler.py (--entry).
+#
+# python_bundler.py starts from an entry file and includes only what it
+# reaches; this module gives app-bundler.py the same ability for JS/TS.
+# It has three parts:
+#
+#   1. scan_specifiers(): a small single-pass lexer that skips comments,
+#      strings, template literals and regex literals, and reports the module
+#      specifiers of
+#          import x from 'a'      import 'a'       import('a')
+#          export * from 'a'      export { x } from 'a'
+#          require('a')           import x = require('a')
+#      without building an AST.
+#   2. ImportResolver: maps a specifier to a file the way Node and TypeScript
+#      do -- relative paths, tsconfig/jsconfig "baseUrl" and "paths" aliases,
+#      extension probing (including TS's './x.js' -> './x.ts'), directory
+#      index files and a local package.json "main"/"module"/"types" field.
+#   3. JsImportGraph: walks the dependency closure from the entry points and
+#      caches scans (validated by mtime/size) and resolutions; the scan cache
+#      can be persisted to a JSON file between runs (--import-cache).
+
+import os
+import json
+
+import warm_cache
+
+SCRIPT_EXTENSIONS = ('.ts', '.tsx', '.mts', '.cts', '.js', '.jsx', '.mjs', '.cjs')
+# Probe order used for extensionless specifiers (TypeScript first, then JS).
+PROBE_EXTENSIONS = ('.ts', '.tsx', '.d.ts', '.js', '.jsx', '.mjs', '.cjs', '.json')
+# TypeScript lets './x.js' refer to './x.ts' (and friends).
+JS_TO_TS = {
+    '.js': ('.ts', '.tsx'),
+    '.jsx': ('.tsx',),
+    '.mjs': ('.mts',),
+    '.cjs': ('.cts',),
+}
+
+# After these tokens a '/' starts a regex literal rather than a division.
+_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete',
+                   'void', 'throw', 'case', 'do', 'else', 'yield', 'await'}
+_IDENT_START = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_$')
+_IDENT_CHARS = _IDENT_START | set('0123456789')
+_DIGITS = set('0123456789')
+
+
+def _tokens(src):
+    """
+    Yield ('id', name), ('num', text), ('str', value) or ('p', char) tokens,
+    skipping whitespace, comments, template literals and regex literals.
+    A '/' after a number, identifier or closing bracket is a division.
+
+    Quoted strings stop at a newline, so stray quotes in JSX text (e.g.
+    <p>Don't</p>) can only confuse a single line.
+    """
+    i = 0
+    n = len(src)
+    prev = None  # previous significant token, for regex detection
+    while i < n:
+        c = src[i]
+        if c in ' \t\r\n':
+            i += 1
+        elif c == '/' and src.startswith('//', i):
+            j = src.find('\n', i)
+            i = n if j < 0 else j + 1
+        elif c == '/' and src.startswith('/*', i):
+            j = src.find('*/', i + 2)
+            i = n if j < 0 else j + 2
+        elif c == '"' or c == "'":
+            j = i + 1
+            buf = []
+            while j < n and src[j] != c and src[j] != '\n':
+                if src[j] == '\\' and j + 1 < n:
+                    buf.append(src[j + 1])
+                    j += 2
+                else:
+                    buf.append(src[j])
+                    j += 1
+            prev = ('str', ''.join(buf))
+            yield prev
+            i = j + 1
+        elif c == '`':
+            i = _skip_template(src, i + 1)
+            prev = ('str', None)
+            yield prev
+        elif c == '/' and (prev is None
+                           or (prev[0] == 'p' and prev[1] not in ')]}')
+                           or (prev[0] == 'id' and prev[1] in _REGEX_KEYWORDS)):
+            i = _skip_regex(src, i + 1)
+            prev = ('str', None)
+        elif c in _IDENT_START:
+            j = i + 1
+            while j < n and src[j] in _IDENT_CHARS:
+                j += 1
+            prev = ('id', src[i:j])
+            yield prev
+            i = j
+        elif c in _DIGITS or (c == '.' and i + 1 < n and src[i + 1] in _DIGITS):
+            j = _number_end(src, i)
+            prev = ('num', src[i:j])
+            yield prev
+            i = j
+        else:
+            prev = ('p', c)
+            yield prev
+            i += 1
+
+
+def _number_end(src, i):
+    """
+    Index just past a numeric literal starting at i: decimal with '.',
+    exponent and '_' separators, or 0x/0o/0b, with an optional 'n' (BigInt).
+    """
+    n = len(src)
+    j = i
+    hex_digits = src.startswith(('0x', '0X'), i)
+    while j < n:
+        c = src[j]
+        if c in 'eE' and not hex_digits and j + 1 < n and src[j + 1] in '+-':
+            j += 2
+        elif c in _IDENT_CHARS or c == '.':
+            j += 1
+        else:
+            break
+    return j
+
+
+def _skip_template(src, i):
+    """
+    Skip a template literal body starting just after the opening backtick,
+    including nested ${ ... } expressions. Returns the index after the
+    closing backtick.
+    """
+    n = len(src)
+    while i < n:
+        c = src[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            return i + 1
+        elif c == '$' and src.startswith('${', i):
+            i += 2
+            depth = 1
+            while i < n and depth:
+                c = src[i]
+                if c == '{':
+                    depth += 1
+                elif c == '}':
+                    depth -= 1
+                elif c == '`':
+                    i = _skip_template(src, i + 1) - 1
+                elif c == '"' or c == "'":
+                    j = i + 1
+                    while j < n and src[j] != c and src[j] != '\n':
+                        j += 2 if src[j] == '\\' else 1
+                    i = j
+                i += 1
+        else:
+            i += 1
+    return n
+
+
+def _skip_regex(src, i):
+    """
+    Skip a regex literal body starting just after the opening '/'.
+    """
+    n = len(src)
+    in_class = False
+    while i < n:
+        c = src[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            return i
+        if in_class:
+            if c == ']':
+                in_class = False
+        elif c == '[':
+            in_class = True
+        elif c == '/':
+            i += 1
+            while i < n and src[i] in _IDENT_CHARS:
+                i += 1
+            return i
+        i += 1
+    return n
+
+
+def scan_specifiers(src):
+    """
+    Return the list of module specifiers imported by a JS/TS source text,
+    in source order (duplicates removed).
+    """
+    specs = []
+    seen = set()
+
+    def add(spec):
+        if spec and spec not in seen:
+            seen.add(spec)
+            specs.append(spec)
+
+    toks = list(_tokens(src))
+    n = len(toks)
+    for k, tok in enumerate(toks):
+        if tok[0] != 'id':
+            continue
+        if k > 0 and toks[k - 1] == ('p', '.'):
+            continue  # obj.import / obj.require
+        word = tok[1]
+        if word == 'require' or word == 'import':
+            # require('x') / import('x')
+            if k + 2 < n and toks[k + 1] == ('p', '(') and toks[k + 2][0] == 'str':
+                add(toks[k + 2][1])
+                continue
+        if word == 'import':
+            # import 'x'
+            if k + 1 < n and toks[k + 1][0] == 'str':
+                add(toks[k + 1][1])
+                continue
+            _scan_from_clause(toks, k + 1, add)
+        elif word == 'export':
+            # Only re-exports have a from-clause: export * / export { } / export type { }
+            j = k + 1
+            if j < n and toks[j] == ('id', 'type'):
+                j += 1
+            if j < n and toks[j] in (('p', '*'), ('p', '{')):
+                _scan_from_clause(toks, j, add)
+    return specs
+
+
+def _scan_file(path):
+    return scan_specifiers(warm_cache.read_text(path, errors='replace'))
+
+
+def _scan_from_clause(toks, j, add):
+    """
+    From position j, skip an import/export binding list (identifiers, braces,
+    commas, '*', 'as', 'type') and report the string after 'from', if any.
+    """
+    n = len(toks)
+    while j < n:
+        kind, val = toks[j]
+        if kind == 'id' and val == 'from':
+            if j + 1 < n and toks[j + 1][0] == 'str':
+                add(toks[j + 1][1])
+            return
+        if kind == 'id' or (kind == 'p' and val in '{},*'):
+            j += 1
+            continue
+        return
+
+
+def _strip_jsonc(text):
+    """
+    Remove // and /* */ comments and trailing commas from tsconfig-style JSON.
+    """
+    out = []
+    i = 0
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c == '"':
+            j = i + 1
+            while j < n and text[j] != '"':
+                j += 2 if text[j] == '\\' else 1
+            out.append(text[i:j + 1])
+            i = j + 1
+        elif text.startswith('//', i):
+            j = text.find('\n', i)
+            i = n if j < 0 else j
+        elif text.startswith('/*', i):
+            j = text.find('*/', i + 2)
+            i = n if j < 0 else j + 2
+        else:
+            out.append(c)
+            i += 1
+    stripped = ''.join(out)
+    # Trailing commas: ",}" / ",]" with optional whitespace in between.
+    result = []
+    for idx, ch in enumerate(stripped):
+        if ch == ',':
+            rest = stripped[idx + 1:idx + 200].lstrip()
+            if rest[:1] in ('}', ']'):
+                continue
+        result.append(ch)
+    return ''.join(result)
+
+
+def load_tsconfig(project_dir):
+    """
+    Return (base_url_dir or None, paths dict) from tsconfig.json or
+    jsconfig.json in project_dir, following relative "extends".
+    """
+    for name in ('tsconfig.json', 'jsconfig.json'):
+        path = os.path.join(project_dir, name)
+        if os.path.isfile(path):
+            return _read_tsconfig(path, set())
+    return None, {}
+
+
+def _read_tsconfig(path, seen):
+    path = os.path.abspath(path)
+    if path in seen:
+        return None, {}
+    seen.add(path)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.loads(_strip_jsonc(f.read()))
+    except (OSError, ValueError):
+        return None, {}
+
+    base_url, paths = None, {}
+    extends = data.get('extends')
+    if isinstance(extends, str) and extends.startswith('.'):
+        parent = os.path.join(os.path.dirname(path), extends)
+        if not parent.endswith('.json'):
+            parent += '.json'
+        base_url, paths = _read_tsconfig(parent, seen)
+
+    options = data.get('compilerOptions') or {}
+    if isinstance(options.get('baseUrl'), str):
+        base_url = os.path.normpath(os.path.join(os.path.dirname(path), options['baseUrl']))
+    if isinstance(options.get('paths'), dict):
+        paths = options['paths']
+        if base_url is None:
+            # TS 4.1+: paths without baseUrl are relative to the tsconfig itself
+            base_url = os.path.dirname(path)
+    return base_url, paths
+
+
+class ImportResolver:
+    """
+    Resolve module specifiers to files under project_dir.
+    Results (including misses) are memoized per (directory, specifier).
+    """
+
+    def __init__(self, project_dir):
+        self.project_dir = os.path.abspath(project_dir)
+        self.base_url, self.paths = load_tsconfig(self.project_dir)
+        self._cache = {}
+        self._isfile_cache = {}
+
+    def _isfile(self, path):
+        hit = self._isfile_cache.get(path)
+        if hit is None:
+            hit = os.path.isfile(path)
+            self._isfile_cache[path] = hit
+        return hit
+
+    def resolve(self, spec, from_dir):
+        key = (from_dir, spec)
+        if key in self._cache:
+            return self._cache[key]
+        result = self._resolve(spec, from_dir)
+        self._cache[key] = result
+        return result
+
+    def _resolve(self, spec, from_dir):
+        spec = spec.split('?', 1)[0].split('#', 1)[0]
+        if not spec:
+            return None
+        if spec.startswith('./') or spec.startswith('../') or spec in ('.', '..'):
+            return self._probe(os.path.join(from_dir, spec))
+        if spec.startswith('/'):
+            return self._probe(os.path.join(self.project_dir, spec.lstrip('/')))
+
+        # tsconfig "paths" aliases, e.g. "@/*": ["src/*"]
+        for pattern, targets in self._matching_paths(spec):
+            for target in targets:
+                if not isinstance(target, str):
+                    continue
+                hit = self._probe(os.path.join(self.base_url, target.replace('*', pattern, 1)))
+                if hit:
+                    return hit
+        # Bare specifiers relative to baseUrl (non-relative imports in TS)
+        if self.base_url:
+            hit = self._probe(os.path.join(self.base_url, spec))
+            if hit:
+                return hit
+        return None  # a package from node_modules (or unresolvable)
+
+    def _matching_paths(self, spec):
+        """
+        Yield (wildcard_match, targets) for tsconfig paths entries matching
+        spec, exact patterns first, then the longest prefix first.
+        """
+        if not self.paths or self.base_url is None:
+            return
+        if spec in self.paths:
+            yield '', self.paths[spec]
+        wildcards = []
+        for pattern, targets in self.paths.items():
+            if '*' not in pattern:
+                continue
+            prefix, suffix = pattern.split('*', 1)
+            if spec.startswith(prefix) and spec.endswith(suffix) and len(spec) >= len(prefix) + len(suffix):
+                wildcards.append((len(prefix), spec[len(prefix):len(spec) - len(suffix)], targets))
+        for _, match, targets in sorted(wildcards, key=lambda w: -w[0]):
+            yield match, targets
+
+    def _probe(self, candidate):
+        """
+        Node/TypeScript file probing: exact file, TS sibling of a .js
+        specifier, appended extensions, then directory package.json/index.
+        """
+        candidate = os.path.normpath(candidate)
+        if self._isfile(candidate):
+            return candidate
+        root, ext = os.path.splitext(candidate)
+        for ts_ext in JS_TO_TS.get(ext, ()):
+            if self._isfile(root + ts_ext):
+                return root + ts_ext
+        for probe_ext in PROBE_EXTENSIONS:
+            if self._isfile(candidate + probe_ext):
+                return candidate + probe_ext
+        if os.path.isdir(candidate):
+            pkg_json = os.path.join(candidate, 'package.json')
+            if self._isfile(pkg_json):
+                try:
+                    with open(pkg_json, 'r', encoding='utf-8') as f:
+                        pkg = json.load(f)
+                except (OSError, ValueError):
+                    pkg = {}
+                for field in ('types', 'module', 'main'):
+                    entry = pkg.get(field)
+                    if isinstance(entry, str):
+                        hit = self._probe_file(os.path.join(candidate, entry))
+                        if hit:
+                            return hit
+            for probe_ext in PROBE_EXTENSIONS:
+                index = os.path.join(candidate, 'index' + probe_ext)
+                if self._isfile(index):
+                    return index
+        return None
+
+    def _probe_file(self, candidate):
+        candidate = os.path.normpath(candidate)
+        if self._isfile(candidate):
+            return candidate
+        for probe_ext in PROBE_EXTENSIONS:
+            if self._isfile(candidate + probe_ext):
+                return candidate + probe_ext
+        return None
+
+
+class JsImportGraph:
+    """
+    Dependency closure of JS/TS entry points under one project directory.
+
+    scan_cache maps absolute path -> [mtime_ns, size, specifiers]; it is
+    reused across calls and, with cache_path, across runs.
+    """
+
+    def __init__(self, project_dir, cache_path=None):
+        self.project_dir = os.path.abspath(project_dir)
+        self.resolver = ImportResolver(self.project_dir)
+        self.cache_path = cache_path
+        self.scan_cache = {}
+        self.edges = {}  # path -> [resolved dependency paths]
+        if cache_path:
+            self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == 1:
+            self.scan_cache = data.get('files', {})
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'files': self.scan_cache}, f)
+
+    def specifiers(self, path):
+        """
+        Specifiers imported by path, from cache when mtime and size match.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return []
+        cached = self.scan_cache.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        specs = warm_cache.derived('js-specifiers', path, _scan_file)
+        self.scan_cache[path] = [st.st_mtime_ns, st.st_size, specs]
+        return specs
+
+    def closure(self, entry_paths):
+        """
+        Breadth-first walk from entry_paths (absolute). Returns a dict
+        {absolute path: import distance from the nearest entry point} for
+        every reachable file inside the project directory (node_modules
+        excluded). Non-script files (CSS, JSON, ...) are included but not
+        scanned.
+        """
+        distances = {}
+        frontier = []
+        for p in entry_paths:
+            p = os.path.abspath(p)
+            if p not in distances:
+                distances[p] = 0
+                frontier.append(p)
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for path in frontier:
+                deps = []
+                if path.endswith(SCRIPT_EXTENSIONS):
+                    from_dir = os.path.dirname(path)
+                    for spec in self.specifiers(path):
+                        dep = self.resolver.resolve(spec, from_dir)
+                        if dep is None or not self._in_project(dep):
+                            continue
+                        deps.append(dep)
+                        if dep not in distances:
+                            distances[dep] = depth
+                            next_frontier.append(dep)
+                self.edges[path] = deps
+            frontier = next_frontier
+        return distances
+
+    def _in_project(self, path):
+        rel = os.path.relpath(path, self.project_dir)
+        if rel.startswith('..'):
+            return False
+        return 'node_modules' not in rel.split(os.sep)
@@ -0,0 +1,395 @@
+# src/json_stream.py
+#
+# Streaming JSON handling for app-bundler.py's --json option.
+#
+# Generated JSON artifacts (schema dumps, ASTs such as ddl-ast.json) can be
+# tens of MB. Reading them whole and pasting them into a bundle is slow and
+# mostly noise, so --json processes each .json file incrementally, holding
+# at most a chunk of the file (plus the current token) in memory:
+#
+#   - minify:  copy the tokens with all whitespace and // or /* */ comments
+#              removed (strings are never modified)
+#   - summary: for files above a size threshold, describe the structure
+#              instead of including it: every key path (array elements
+#              collapse to '[]'), the types seen there, how often, array
+#              lengths and the first few distinct scalar values; smaller
+#              files are minified
+#
+# Run directly, it writes one file's minified JSON or summary to stdout:
+#   python3 json_stream.py {minify|summary} <json_file> [--json-threshold SIZE]
+#
+# iter_tokens() is the shared tokenizer. It is lenient: anything that isn't
+# JSON is passed through as an 'invalid' token, so minify never loses data
+# and summary can say where the file stopped being valid JSON.
+
+import os
+import re
+import sys
+import json
+
+from cli_options import parse_budget_option
+
+CHUNK_SIZE = 1 << 16
+LONG_STRING = 1 << 16  # longer strings are yielded in pieces
+DEFAULT_SUMMARY_THRESHOLD = 1000000
+SAMPLE_COUNT = 3
+SAMPLE_CHARS = 40
+MAX_PATHS = 2000
+
+_SPACE = re.compile(r'[ \t\r\n]+')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+_STRING_REST = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?')
+_LITERAL = re.compile(r'true|false|null')
+_INVALID = re.compile(r'[^ \t\r\n"{}\[\]:,/]+')
+_IDENTIFIER = re.compile(r'[A-Za-z_$][A-Za-z0-9_$]*')
+_PUNCTUATION = '{}[]:,'
+# Fast path: whitespace plus one complete ordinary token, matched in C.
+_TOKEN = re.compile(r'[ \t\r\n]*(?:(?P<string>"(?:[^"\\]|\\.)*")|(?P<punct>[{}\[\]:,])'
+                    r'|(?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)|(?P<literal>true|false|null))', re.S)
+
+
+class _ChunkReader:
+    """
+    Sliding window over a text file: buf[pos:] is unread, 'consumed' counts
+    the characters already dropped from the front (for error positions).
+    """
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.consumed = 0
+        self.eof = False
+
+    def more(self):
+        """
+        Append the next chunk to the unread part; sets eof when there is none.
+        """
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return
+        self.consumed += self.pos
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+
+def _safe_split(buf, start, end):
+    """
+    End of a string piece that doesn't split a backslash escape.
+    """
+    backslashes = 0
+    while end - backslashes - 1 >= start and buf[end - backslashes - 1] == '\\':
+        backslashes += 1
+    return end - 1 if backslashes % 2 else end
+
+
+def iter_tokens(f, chunk_size=CHUNK_SIZE):
+    """
+    Yield (kind, text, more, offset) tokens from a text file object, where
+    kind is one of '{', '}', '[', ']', ':', ',', 'string', 'number',
+    'literal' or 'invalid', and offset is the token's character position.
+    Whitespace and comments are skipped. Strings longer than LONG_STRING
+    come in pieces: every piece but the last has more=True.
+    """
+    r = _ChunkReader(f, chunk_size)
+    in_string = False
+    while True:
+        buf, pos = r.buf, r.pos
+        if pos >= len(buf):
+            if r.eof:
+                return
+            r.more()
+            continue
+        offset = r.consumed + pos
+
+        if not in_string:
+            # Ordinary tokens in bulk; stop short of the buffer end, where a
+            # number or literal might continue in the next chunk.
+            limit = len(buf) if r.eof else len(buf) - 3
+            match = _TOKEN.scanner(buf, pos).match
+            end = pos
+            m = match()
+            while m is not None and m.end() <= limit:
+                kind = m.lastgroup
+                text = m.group(kind)
+                yield (text if kind == 'punct' else kind), text, False, r.consumed + m.start(kind)
+                end = m.end()
+                m = match()
+            if end > pos:
+                r.pos = end
+                continue
+
+        if in_string:
+            m = _STRING_REST.match(buf, pos)
+            if m:
+                in_string = False
+                r.pos = m.end()
+                yield 'string', m.group(), False, offset
+            elif r.eof:
+                r.pos = len(buf)
+                yield 'invalid', buf[pos:], False, offset
+            else:
+                end = _safe_split(buf, pos, len(buf))
+                r.pos = end
+                if end > pos:
+                    yield 'string', buf[pos:end], True, offset
+                r.more()
+            continue
+
+        c = buf[pos]
+        if c in ' \t\r\n':
+            r.pos = _SPACE.match(buf, pos).end()
+        elif c in _PUNCTUATION:
+            r.pos = pos + 1
+            yield c, c, False, offset
+        elif c == '"':
+            m = _STRING.match(buf, pos)
+            if m:
+                r.pos = m.end()
+                yield 'string', m.group(), False, offset
+            elif r.eof:
+                r.pos = len(buf)
+                yield 'invalid', buf[pos:], False, offset
+            elif len(buf) - pos > LONG_STRING:
+                end = _safe_split(buf, pos, len(buf))
+                in_string = True
+                r.pos = end
+                yield 'string', buf[pos:end], True, offset
+            else:
+                r.more()
+        elif c == '/':
+            if pos + 1 >= len(buf) and not r.eof:
+                r.more()
+                continue
+            nxt = buf[pos + 1] if pos + 1 < len(buf) else ''
+            if nxt == '/':
+                end = buf.find('\n', pos)
+                if end < 0 and not r.eof:
+                    r.more()
+                else:
+                    r.pos = len(buf) if end < 0 else end
+            elif nxt == '*':
+                end = buf.find('*/', pos + 2)
+                if end < 0 and not r.eof:
+                    r.more()
+                elif end < 0:
+                    r.pos = len(buf)
+                    yield 'invalid', buf[pos:], False, offset
+                else:
+                    r.pos = end + 2
+            else:
+                r.pos = pos + 1
+                yield 'invalid', c, False, offset
+        else:
+            m = _NUMBER.match(buf, pos) or _LITERAL.match(buf, pos)
+            if not r.eof and len(buf) - pos < 64 and (m is None or len(buf) - m.end() < 3):
+                r.more()  # token may continue in the next chunk ('1.' -> '1.5e+3')
+                continue
+            if m is not None:
+                r.pos = m.end()
+                yield ('number' if c in '-0123456789' else 'literal'), m.group(), False, offset
+            else:
+                m = _INVALID.match(buf, pos)
+                r.pos = m.end()
+                yield 'invalid', m.group(), False, offset
+
+
+def minify_stream(f, write, chunk_size=CHUNK_SIZE):
+    """
+    Write f's JSON to write() without whitespace or comments, in pieces of
+    about chunk_size characters. Non-JSON text is passed through.
+    """
+    pending = []
+    size = 0
+    prev_bare = False
+    for kind, text, more, _ in iter_tokens(f, chunk_size):
+        bare = kind in ('number', 'literal', 'invalid')
+        if bare and prev_bare:
+            pending.append(' ')  # keep '1 2' (e.g. JSON lines) from becoming '12'
+        prev_bare = bare
+        pending.append(text)
+        size += len(text)
+        if size >= chunk_size:
+            write(''.join(pending))
+            pending = []
+            size = 0
+    if pending:
+        write(''.join(pending))
+
+
+class _PathStats:
+    __slots__ = ('types', 'count', 'min_len', 'max_len', 'total_len', 'arrays', 'samples')
+
+    def __init__(self):
+        self.types = {}
+        self.count = 0
+        self.min_len = None
+        self.max_len = 0
+        self.total_len = 0
+        self.arrays = 0
+        self.samples = []
+
+    def add_length(self, length):
+        self.arrays += 1
+        self.total_len += length
+        self.max_len = max(self.max_len, length)
+        self.min_len = length if self.min_len is None else min(self.min_len, length)
+
+    def describe(self, path):
+        types = sorted(self.types.items(), key=lambda kv: -kv[1])
+        line = f"{path}  {'|'.join(t for t, _ in types)}  x{self.count:,}"
+        if self.arrays == 1:
+            line += f"  length {self.max_len:,}"
+        elif self.arrays > 1:
+            line += f"  lengths {self.min_len:,}..{self.max_len:,} (avg {self.total_len / self.arrays:,.1f})"
+        if self.samples:
+            line += "  e.g. " + ", ".join(self.samples)
+        return line
+
+
+def _sample(text):
+    return text if len(text) <= SAMPLE_CHARS else text[:SAMPLE_CHARS] + '…'
+
+
+def _key_name(raw):
+    if raw.endswith('"') and len(raw) >= 2:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            pass
+    return _sample(raw[1:])
+
+
+def summarize_stream(f, write, file_size=None, threshold=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream f's JSON and write() a structural summary: one line per key path
+    ('$' is the document, '.key' / '["odd key"]' object members, '[]' array
+    elements) with its types, number of occurrences, array lengths and up
+    to SAMPLE_COUNT distinct scalar values. At most MAX_PATHS paths are kept.
+    """
+    paths = {}
+    capped = False
+    stack = []  # [kind, path, expecting_key, key, length]
+    problem = None
+    continuing = False  # inside a long string we've already accounted for
+
+    def record(kind, sample=None):
+        nonlocal capped
+        if not stack:
+            path = '$'
+        else:
+            frame = stack[-1]
+            if frame[0] == 'array':
+                frame[4] += 1
+                path = frame[1] + '[]'
+            else:
+                key = frame[3] or ''
+                path = frame[1] + ('.' + key if _IDENTIFIER.fullmatch(key) else '[' + json.dumps(key) + ']')
+        stats = paths.get(path)
+        if stats is None:
+            if len(paths) >= MAX_PATHS:
+                capped = True
+            else:
+                stats = paths[path] = _PathStats()
+        if stats is not None:
+            stats.count += 1
+            stats.types[kind] = stats.types.get(kind, 0) + 1
+            if sample is not None and len(stats.samples) < SAMPLE_COUNT and sample not in stats.samples:
+                stats.samples.append(sample)
+        return path
+
+    for kind, text, more, offset in iter_tokens(f, chunk_size):
+        if continuing:
+            continuing = more
+            continue
+        if kind == 'string':
+            continuing = more
+            frame = stack[-1] if stack else None
+            if frame is not None and frame[0] == 'object' and frame[2]:
+                frame[3] = _key_name(text)
+                frame[2] = False
+            else:
+                record('string', _sample(text))
+        elif kind in ('number', 'literal'):
+            name = 'number' if kind == 'number' else ('null' if text == 'null' else 'boolean')
+            record(name, _sample(text))
+        elif kind == '{':
+            stack.append(['object', record('object'), True, None, 0])
+        elif kind == '[':
+            stack.append(['array', record('array'), False, None, 0])
+        elif kind in '}]':
+            if not stack:
+                problem = f"unmatched '{kind}' at character {offset:,}"
+                break
+            frame = stack.pop()
+            if frame[0] == 'array' and frame[1] in paths:
+                paths[frame[1]].add_length(frame[4])
+        elif kind == ',':
+            if stack and stack[-1][0] == 'object':
+                stack[-1][2] = True
+        elif kind == 'invalid':
+            problem = f"not valid JSON at character {offset:,}"
+            break
+    if problem is None and stack:
+        problem = "unexpected end of file"
+
+    header = "JSON structure summary (streamed"
+    if file_size is not None:
+        header += f"; file is {file_size:,} bytes"
+        if threshold is not None:
+            header += f", above the {threshold:,}-byte --json-threshold"
+    write(header + "):\n")
+    write("path  types  occurrences  [array lengths]  [sample values]\n")
+    for path, stats in paths.items():
+        write(stats.describe(path) + "\n")
+    if capped:
+        write(f"Note: only the first {MAX_PATHS:,} distinct paths are shown.\n")
+    if problem is not None:
+        write(f"Note: {problem}; the summary covers the file up to that point.\n")
+
+
+def json_action(size, mode, threshold=DEFAULT_SUMMARY_THRESHOLD):
+    """
+    What --json does with a file of `size` bytes: mode 'summary' summarizes
+    files larger than threshold bytes and minifies the rest; mode 'minify'
+    minifies all. Returns 'summary' or 'minify'.
+    """
+    return 'summary' if mode == 'summary' and size > threshold else 'minify'
+
+
+def write_json(path, mode, write, threshold=DEFAULT_SUMMARY_THRESHOLD, size=None):
+    """
+    --json for one file (see json_action()). Returns 'summary' or 'minify'
+    (what was written).
+    """
+    if size is None:
+        size = os.path.getsize(path)
+    action = json_action(size, mode, threshold)
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        if action == 'summary':
+            summarize_stream(f, write, size, threshold)
+        else:
+            minify_stream(f, write)
+    return action
+
+
+def main(argv):
+    usage = "Usage: python3 json_stream.py {minify|summary} <json_file> [--json-threshold SIZE]"
+    if len(argv) not in (2, 4) or argv[0] not in ('minify', 'summary') or (len(argv) == 4 and argv[2] != '--json-threshold'):
+        print(usage)
+        sys.exit(1)
+    threshold = DEFAULT_SUMMARY_THRESHOLD
+    if len(argv) == 4:
+        threshold = parse_budget_option(argv[3], "--json-threshold")
+    if not os.path.isfile(argv[1]):
+        print(f"Error: {argv[1]} is not a file.")
+        sys.exit(1)
+    write_json(argv[1], argv[0], sys.stdout.write, threshold)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,133 @@
+# src/path_trie.py
+#
+# Shared directory-tree support for app-bundler.py and python_bundler.py.
+#
+# Both bundlers used to build a nested dict with one entry per path component
+# and then render it recursively, building and extend()-ing lists of lines at
+# every level. On trees with 100k+ files (especially in --tree-only mode) that
+# means a dict per directory, a full copy of every rendered line per level of
+# nesting, and the whole tree held in memory twice before anything is written.
+#
+# PathTrie keeps one small node per directory (files stored as a plain list of
+# interned names, plus a running file count for summaries) and
+# iter_tree_lines() walks it with an explicit stack, yielding each line so the
+# caller can write it straight to the output.
+
+import os
+import sys
+from heapq import merge
+
+TEE = "├── "
+ELBOW = "└── "
+PIPE = "│   "
+SPACE = "    "
+
+
+class PathTrie:
+    """
+    Compact trie of relative file paths.
+
+    Each node represents a directory:
+      - dirs: dict of child directory name -> PathTrie
+      - files: list of file names directly inside this directory
+      - file_count: total number of files at or below this directory
+
+    Path components are interned, so the repeated names that dominate large
+    trees (src, components, index.ts, __init__.py, ...) are stored once.
+    """
+
+    __slots__ = ("dirs", "files", "file_count")
+
+    def __init__(self):
+        self.dirs = {}
+        self.files = []
+        self.file_count = 0
+
+    def add(self, rel_path, sep=os.sep):
+        """
+        Insert a single relative file path (e.g. 'src/components/Button.tsx').
+        """
+        parts = rel_path.split(sep)
+        node = self
+        node.file_count += 1
+        for part in parts[:-1]:
+            part = sys.intern(part)
+            child = node.dirs.get(part)
+            if child is None:
+                child = PathTrie()
+                node.dirs[part] = child
+            child.file_count += 1
+            node = child
+        node.files.append(sys.intern(parts[-1]))
+
+    @classmethod
+    def from_paths(cls, rel_paths, sep=os.sep):
+        trie = cls()
+        for p in rel_paths:
+            trie.add(p, sep)
+        return trie
+
+
+def summary_label(file_count):
+    """
+    Text used in place of a collapsed directory's contents.
+    """
+    noun = "file" if file_count == 1 else "files"
+    return f"… ({file_count} {noun})"
+
+
+def _sorted_entries(node, dirs_first):
+    """
+    Return [(name, child_node_or_None), ...] for one directory level.
+    dirs_first=True lists directories before files (app-bundler style);
+    dirs_first=False interleaves them by name (python_bundler style).
+    """
+    dir_entries = [(name, node.dirs[name]) for name in sorted(node.dirs)]
+    file_entries = [(name, None) for name in sorted(node.files)]
+    if dirs_first:
+        return dir_entries + file_entries
+    return list(merge(dir_entries, file_entries, key=lambda e: e[0]))
+
+
+def iter_tree_lines(trie, dirs_first=True, max_depth=None, collapse_threshold=None):
+    """
+    Yield the lines of a directory tree (without the root label), one at a time.
+
+    Options:
+      - dirs_first: list directories before files at each level.
+      - max_depth: only descend this many directory levels below the root;
+        deeper directories are shown as a single '… (N files)' line.
+      - collapse_threshold: any directory holding more than this many files
+        (recursively) is shown as a single '… (N files)' line.
+
+    Only the sibling list of each directory on the current path is held in
+    memory, so rendering cost is proportional to the number of lines written.
+    """
+    if max_depth is not None and max_depth <= 0:
+        if trie.file_count:
+            yield ELBOW + summary_label(trie.file_count)
+        return
+
+    # Each stack frame: [entries, next_index, prefix, depth]
+    stack = [[_sorted_entries(trie, dirs_first), 0, "", 1]]
+    while stack:
+        frame = stack[-1]
+        entries, i, prefix, depth = frame
+        if i >= len(entries):
+            stack.pop()
+            continue
+        frame[1] = i + 1
+
+        name, child = entries[i]
+        is_last = i == len(entries) - 1
+        yield prefix + (ELBOW if is_last else TEE) + name
+        if child is None:
+            continue
+
+        child_prefix = prefix + (SPACE if is_last else PIPE)
+        if (max_depth is not None and depth >= max_depth) or (
+            collapse_threshold is not None and child.file_count > collapse_threshold
+        ):
+            yield child_prefix + ELBOW + summary_label(child.file_count)
+        else:
+            stack.append([_sorted_entries(child, dirs_first), 0, child_prefix, depth + 1])
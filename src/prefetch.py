@@ -0,0 +1,81 @@
+# src/prefetch.py
+#
+# Read-ahead pipeline shared by the bundlers' writers.
+#
+# Every writer used to open -> read -> write -> close one file at a time, so
+# disk (or network mount) latency and output writes never overlapped.
+# prefetch_files() keeps up to `depth` reads in flight on a small thread
+# pool while the caller writes the current file. Results are yielded in the
+# original order of `paths`, so output stays deterministic, and at most
+# depth + 1 file contents are held in memory at once.
+
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import warm_cache
+
+DEFAULT_PREFETCH = 8
+
+
+def prefetch_files(paths, reader, depth=DEFAULT_PREFETCH):
+    """
+    Yield (path, reader(path)) for each path, in order, reading up to
+    `depth` files ahead in background threads. depth <= 0 reads inline.
+    Exceptions raised by reader propagate when that path is reached.
+    """
+    if depth is None or depth <= 0:
+        for path in paths:
+            yield path, reader(path)
+        return
+
+    it = iter(paths)
+    window = deque()
+    with ThreadPoolExecutor(max_workers=depth) as pool:
+        try:
+            for path in it:
+                window.append((path, pool.submit(reader, path)))
+                if len(window) >= depth:
+                    break
+            while window:
+                path, fut = window.popleft()
+                data = fut.result()
+                nxt = next(it, None)
+                if nxt is not None:
+                    window.append((nxt, pool.submit(reader, nxt)))
+                yield path, data
+        finally:
+            # Consumer stopped early (or a read failed): drop queued reads.
+            for _, fut in window:
+                fut.cancel()
+
+
+def read_text(path):
+    """
+    Reader for plain-text listings (UTF-8, undecodable bytes replaced).
+    """
+    return warm_cache.read_text(path, errors="replace")
+
+
+def read_for_zip(path):
+    """
+    Reader for ZIP writers: (os.stat result, raw bytes), so the consumer can
+    build the ZipInfo without another stat() round-trip.
+    """
+    return warm_cache.read_bytes(path)
+
+
+def zipinfo_from_stat(st, arcname):
+    """
+    Equivalent of zipfile.ZipInfo.from_file() for a regular file whose stat
+    result is already known.
+    """
+    arcname = os.path.normpath(os.path.splitdrive(arcname)[1])
+    while arcname[0] in (os.sep, os.altsep):
+        arcname = arcname[1:]
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[0:6])
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.file_size = st.st_size
+    return zinfo
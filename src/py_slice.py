@@ -0,0 +1,522 @@
+# src/py_slice.py
+#
+# Symbol-level "tree-shaking" for python_bundler.py (--slice).
+#
+# find_local_dependencies() works at whole-file granularity: a single
+# `from utils import slugify` pulls in every line of utils.py. ModuleSlicer
+# builds a def/use graph of the top-level statements of the local modules in
+# the closure and keeps only what is reachable from the entry point(s):
+#
+#   - the entry module itself is kept whole (it is the program)
+#   - every name a kept statement uses is resolved to the top-level
+#     statement(s) that bind it: a def/class/assignment in the same module,
+#     or an import, which is then followed into the imported local module
+#     (`from m import a`, `import m` + `m.a`, `import pkg.mod` + `pkg.mod.a`,
+#     `from . import m` + `m.a`, and `from m import *`)
+#   - a local module used as a plain value (not just `m.attr`) is kept whole
+#   - a statement that binds nothing (`REG["k"] = g`, `C.x = 5`,
+#     `logging.basicConfig(...)`) is kept when it uses a name bound by a kept
+#     statement of its module, since it sets up state the kept code relies on
+#   - statements sharing a physical line (`a = 1; b = 2`) are kept or
+#     elided together
+#
+# Unreachable statements are replaced by a one-line marker comment so the
+# reader can see where code was elided. The analysis is deliberately
+# conservative: any identifier that appears anywhere inside a kept statement
+# counts as a use, even if it is actually a local variable.
+
+import ast
+import os
+
+ELIDED_MARKER = "# [bundler] elided {span}: {what}\n"
+
+
+class _Statement:
+    """
+    One top-level statement of a module.
+      - first/last: 1-based line span (decorators included)
+      - binds: names this statement binds at module level
+      - uses: (root_name, attr_tuple) for every name/attribute chain it reads
+      - label: short description used in elision markers
+    """
+
+    __slots__ = ("first", "last", "binds", "uses", "label")
+
+    def __init__(self, first, last, binds, uses, label):
+        self.first = first
+        self.last = last
+        self.binds = binds
+        self.uses = uses
+        self.label = label
+
+
+class _ModuleInfo:
+    """
+    Parsed view of one module:
+      - statements: list of _Statement
+      - defs: name -> [statement index] for non-import bindings
+      - imports: name -> [(statement index, target)] where target is one of
+            ('file', path)                 the name is a local module
+            ('dotted', dotted_module)      `import a.b.c` binding 'a'
+            ('symbol', path, attr)         `from m import attr`
+            None                           not a local module
+      - star_imports: [(statement index, path)] for `from m import *`
+      - nested_imports: statement index -> {name: [(statement index, target)]}
+            for imports inside a def/class body (local to it)
+      - line_groups: statement index -> indices of the statements sharing
+            a physical line with it (itself included)
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.statements = []
+        self.defs = {}
+        self.imports = {}
+        self.star_imports = []
+        self.nested_imports = {}
+        self.line_groups = {}
+        self.has_docstring = False
+
+
+def _attribute_chain(node):
+    """
+    For a.b.c return ('a', ('b', 'c')); None if the chain isn't rooted in a Name.
+    """
+    attrs = []
+    while isinstance(node, ast.Attribute):
+        attrs.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        return node.id, tuple(reversed(attrs))
+    return None
+
+
+class _UseCollector(ast.NodeVisitor):
+    """
+    Collect every name/attribute chain read anywhere inside a statement.
+    """
+
+    def __init__(self):
+        self.uses = set()
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self.uses.add((node.id, ()))
+
+    def visit_Attribute(self, node):
+        chain = _attribute_chain(node)
+        if chain is not None:
+            self.uses.add(chain)
+        else:
+            self.generic_visit(node)
+
+
+def _bound_names(stmt):
+    """
+    Names bound at module level by a top-level statement. Compound statements
+    (if/try/with/for) bind whatever their bodies bind; nested function and
+    class bodies are not descended into.
+    """
+    names = set()
+    pending = [stmt]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+            continue
+        if isinstance(node, ast.Lambda):
+            continue
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name == "*":
+                    continue
+                names.add(alias.asname or alias.name.split(".")[0])
+            continue
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        pending.extend(ast.iter_child_nodes(node))
+    return names
+
+
+def _import_nodes(stmt):
+    """
+    (module_level, nested) import nodes of a top-level statement, in source
+    order. Imports inside if/try/with blocks bind module-level names; those
+    inside a function or class body only bind names local to it.
+    """
+    module_level = []
+    nested = []
+    pending = [(stmt, False)]
+    while pending:
+        node, inside = pending.pop()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            (nested if inside else module_level).append(node)
+            continue
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            inside = True
+        pending.extend((child, inside) for child in ast.iter_child_nodes(node))
+    position = lambda n: (n.lineno, n.col_offset)
+    return sorted(module_level, key=position), sorted(nested, key=position)
+
+
+def _label(stmt, binds):
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return f"def {stmt.name}"
+    if isinstance(stmt, ast.ClassDef):
+        return f"class {stmt.name}"
+    if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+        return "import " + ", ".join(sorted(binds)) if binds else "import *"
+    if binds:
+        return ", ".join(sorted(binds))
+    return "statement"
+
+
+def _read_utf8(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _is_docstring(stmt):
+    return (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant)
+            and isinstance(stmt.value.value, str))
+
+
+class ModuleSlicer:
+    """
+    Accumulates reachable top-level statements across one or more entry
+    points, then renders each module with unreachable statements elided.
+
+    Typical use:
+        slicer = ModuleSlicer()
+        slicer.add_entry(entry_point, project_root, module_files)
+        for path in slicer.retained_files(module_files):
+            text = slicer.render(path)
+    """
+
+    def __init__(self, read_text=None):
+        self._read_text = read_text or _read_utf8  # e.g. SourceStore.read_text
+        self._infos = {}        # (path, project_root) -> _ModuleInfo or None
+        self._by_path = {}      # path -> first successfully parsed _ModuleInfo
+        self._kept = {}         # path -> set of kept statement indices
+        self._whole = set()     # paths kept without slicing
+        self._referenced = set()  # paths named by a kept import
+
+    # ---------------------------------------------------------------
+    # Parsing
+    # ---------------------------------------------------------------
+    def _module_path(self, dotted, base_dir, module_files):
+        """
+        Map a dotted module name to a local file in module_files:
+        base_dir/a/b.py, falling back to base_dir/a/b/__init__.py.
+        """
+        rel = dotted.replace(".", os.sep)
+        for candidate in (rel + ".py", os.path.join(rel, "__init__.py")):
+            path = os.path.abspath(os.path.join(base_dir, candidate))
+            if path in module_files:
+                return path
+        return None
+
+    def _info(self, path, project_root, module_files):
+        key = (path, project_root)
+        if key in self._infos:
+            return self._infos[key]
+        try:
+            source = self._read_text(path)
+            tree = ast.parse(source, filename=path)
+        except (OSError, SyntaxError, ValueError):
+            # Can't analyze it: keep it as-is rather than guess.
+            self._whole.add(path)
+            self._infos[key] = None
+            return None
+
+        info = _ModuleInfo(path, source)
+        info.has_docstring = bool(tree.body) and _is_docstring(tree.body[0])
+        current_dir = os.path.dirname(path)
+        for idx, stmt in enumerate(tree.body):
+            first = stmt.lineno
+            for deco in getattr(stmt, "decorator_list", []):
+                first = min(first, deco.lineno)
+            binds = _bound_names(stmt)
+            collector = _UseCollector()
+            collector.visit(stmt)
+            info.statements.append(
+                _Statement(first, stmt.end_lineno, binds, collector.uses, _label(stmt, binds))
+            )
+
+            import_nodes, nested_nodes = _import_nodes(stmt)
+            for node in import_nodes:
+                self._record_import(info, idx, node, current_dir, project_root, module_files)
+            if nested_nodes:
+                nested = info.nested_imports[idx] = {}
+                for node in nested_nodes:
+                    self._record_import(info, idx, node, current_dir, project_root, module_files, nested)
+            import_bound = set()
+            for node in import_nodes:
+                for alias in node.names:
+                    import_bound.add(alias.asname or alias.name.split(".")[0])
+            for name in binds - import_bound:
+                info.defs.setdefault(name, []).append(idx)
+
+        # Statements whose line spans overlap share a physical line.
+        group = []
+        group_last = 0
+        for idx, stmt in enumerate(info.statements):
+            if group and stmt.first > group_last:
+                for member in group:
+                    info.line_groups[member] = group
+                group = []
+            group.append(idx)
+            group_last = max(group_last, stmt.last)
+        for member in group:
+            info.line_groups[member] = group
+
+        self._infos[key] = info
+        self._by_path.setdefault(path, info)
+        return info
+
+    def _record_import(self, info, idx, node, current_dir, project_root, module_files, imports=None):
+        """
+        Record the names an import binds in 'imports' (info.imports unless
+        given, e.g. a nested_imports entry).
+        """
+        if imports is None:
+            imports = info.imports
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    path = self._module_path(alias.name, project_root, module_files)
+                    target = ("file", path) if path else None
+                    imports.setdefault(alias.asname, []).append((idx, target))
+                else:
+                    root = alias.name.split(".")[0]
+                    imports.setdefault(root, []).append((idx, ("dotted", alias.name)))
+            return
+
+        # ImportFrom: resolve the source module relative to the package for
+        # `from .m import x`, else against project_root like the bundler does.
+        if node.level:
+            base_dir = current_dir
+            for _ in range(node.level - 1):
+                base_dir = os.path.dirname(base_dir)
+        else:
+            base_dir = project_root
+        source_path = None
+        if node.module:
+            source_path = self._module_path(node.module, base_dir, module_files)
+            if source_path is None and node.level:
+                source_path = self._module_path(node.module, project_root, module_files)
+        package_dir = os.path.join(base_dir, *node.module.split(".")) if node.module else base_dir
+
+        for alias in node.names:
+            if alias.name == "*":
+                if source_path:
+                    info.star_imports.append((idx, source_path))
+                continue
+            bound = alias.asname or alias.name
+            submodule = self._module_path(alias.name, package_dir, module_files)
+            if submodule:
+                target = ("file", submodule)
+            elif source_path:
+                target = ("symbol", source_path, alias.name)
+            else:
+                target = None
+            imports.setdefault(bound, []).append((idx, target))
+
+    # ---------------------------------------------------------------
+    # Reachability
+    # ---------------------------------------------------------------
+    def add_entry(self, entry_point, project_root, module_files):
+        """
+        Mark everything reachable from entry_point (kept whole) among
+        module_files (absolute paths, e.g. from find_local_dependencies).
+        """
+        entry_point = os.path.abspath(entry_point)
+        project_root = os.path.abspath(project_root)
+        module_files = set(module_files)
+        worklist = []
+
+        def keep(path, idx):
+            kept = self._kept.setdefault(path, set())
+            if idx in kept:
+                return
+            info = self._info(path, project_root, module_files)
+            for member in info.line_groups.get(idx, [idx]):
+                if member not in kept:
+                    kept.add(member)
+                    worklist.append((path, member))
+
+        def keep_module(path):
+            info = self._info(path, project_root, module_files)
+            if info is None:
+                return
+            for idx in range(len(info.statements)):
+                keep(path, idx)
+
+        def resolve(path, name, attrs, seen):
+            """Keep whatever binds `name` in module `path`, following imports."""
+            if path is None or path not in module_files:
+                return
+            if (path, name, attrs) in seen:
+                return
+            seen.add((path, name, attrs))
+            info = self._info(path, project_root, module_files)
+            if info is None:
+                return
+            found = False
+            for idx in info.defs.get(name, []):
+                keep(path, idx)
+                found = True
+            for idx, target in info.imports.get(name, []):
+                keep(path, idx)
+                found = True
+                follow(target, name, attrs, seen)
+            if not found:
+                for idx, star_path in info.star_imports:
+                    keep(path, idx)
+                    resolve(star_path, name, attrs, seen)
+
+        def use_module(path, attrs, seen):
+            if path is None:
+                return
+            self._referenced.add(path)
+            if attrs:
+                resolve(path, attrs[0], attrs[1:], seen)
+            else:
+                keep_module(path)
+
+        def follow(target, name, attrs, seen):
+            if target is None:
+                return
+            kind = target[0]
+            if kind == "file":
+                use_module(target[1], attrs, seen)
+            elif kind == "symbol":
+                self._referenced.add(target[1])
+                resolve(target[1], target[2], attrs, seen)
+            elif kind == "dotted":
+                # `import a.b.c` binds 'a'; match the longest local module
+                # prefix of a.<attrs...>, then treat the rest as attributes.
+                chain = (name,) + attrs
+                for n in range(len(chain), 0, -1):
+                    path = self._module_path(".".join(chain[:n]), project_root, module_files)
+                    if path:
+                        use_module(path, chain[n:], seen)
+                        break
+
+        def drain():
+            while worklist:
+                path, idx = worklist.pop()
+                info = self._info(path, project_root, module_files)
+                nested = info.nested_imports.get(idx, {})
+                for name, attrs in info.statements[idx].uses:
+                    for _, target in nested.get(name, []):
+                        follow(target, name, attrs, set())
+                    resolve(path, name, attrs, set())
+
+        def keep_setup_statements():
+            """
+            Keep statements that bind nothing but use a name some kept
+            statement of their module binds; True if any were added.
+            """
+            added = False
+            for path in [p for p in self._kept if p in module_files]:
+                info = self._info(path, project_root, module_files)
+                if info is None:
+                    continue
+                kept = self._kept[path]
+                bound = set()
+                for idx in kept:
+                    bound |= info.statements[idx].binds
+                for idx, stmt in enumerate(info.statements):
+                    if idx in kept or stmt.binds:
+                        continue
+                    if any(name in bound for name, _ in stmt.uses):
+                        keep(path, idx)
+                        added = True
+            return added
+
+        keep_module(entry_point)
+        self._whole.add(entry_point)
+        drain()
+        while keep_setup_statements():
+            drain()
+
+    def keep_whole(self, paths):
+        """
+        Keep these files unsliced (e.g. files from directory roots).
+        """
+        self._whole.update(paths)
+
+    # ---------------------------------------------------------------
+    # Output
+    # ---------------------------------------------------------------
+    def retained_files(self, module_files):
+        """
+        The subset of module_files that still has something to show: any
+        kept statement, a kept import pointing at it, or a package
+        __init__.py above such a file.
+        """
+        retained = {p for p in module_files
+                    if p in self._whole or self._kept.get(p) or p in self._referenced}
+        dirs = {os.path.dirname(p) for p in retained}
+        for p in module_files:
+            if os.path.basename(p) == "__init__.py":
+                pkg_dir = os.path.dirname(p)
+                if any(d == pkg_dir or d.startswith(pkg_dir + os.sep) for d in dirs):
+                    retained.add(p)
+        return retained
+
+    def render(self, path):
+        """
+        Return the sliced source text of path (the full text if it is kept
+        whole or could not be analyzed).
+        """
+        info = self._by_path.get(path)
+        if path in self._whole or info is None:
+            if info is not None:
+                return info.source
+            return self._read_text(path)
+
+        kept = self._kept.get(path, set())
+        statements = info.statements
+        if info.has_docstring:
+            kept = kept | {0}
+        lines = info.source.splitlines(keepends=True)
+        out = []
+        emitted = 0         # last source line written (1-based)
+        elided = []         # statements waiting for a marker
+
+        def flush_elided():
+            if not elided:
+                return
+            what = ", ".join(s.label for s in elided)
+            first, last = elided[0].first, elided[-1].last
+            span = f"line {first}" if first == last else f"lines {first}-{last}"
+            out.append(ELIDED_MARKER.format(span=span, what=what))
+            elided.clear()
+
+        # Header (shebang, encoding cookie, leading comments) is always kept.
+        first_line = statements[0].first if statements else len(lines) + 1
+        out.extend(lines[:first_line - 1])
+        emitted = first_line - 1
+
+        # Statements sharing a physical line are emitted (or elided) together:
+        # the line goes out whole if any of them is kept.
+        for idx, stmt in enumerate(statements):
+            group = info.line_groups.get(idx, [idx])
+            if idx != group[0]:
+                continue
+            last = max(statements[member].last for member in group)
+            if any(member in kept for member in group):
+                flush_elided()
+                out.extend(lines[emitted:last])
+            else:
+                elided.extend(statements[member] for member in group)
+            emitted = last
+        flush_elided()
+        text = "".join(out)
+        if text and not text.endswith("\n"):
+            text += "\n"
+        return text
+
@@ -6,20 +6,42 @@ import sys
 import base64
 import zipfile
 import tempfile
+import time
 import ast
+from collections import deque
 from textwrap import dedent
 
-def find_local_dependencies(entry_point, project_root):
+from budget import fit_budget
+from bundle_index import BundleIndex, member_record
+from cli_options import parse_budget_option, parse_count_option
+from fs_walk import path_matches_any, walk_files
+from import_graph import ImportGraph
+from path_trie import PathTrie, iter_tree_lines
+from prefetch import DEFAULT_PREFETCH, prefetch_files, read_for_zip, zipinfo_from_stat
+from py_slice import ModuleSlicer
+from source_store import SourceStore, decode_source, detect_source_encoding
+from source_strip import StripStats, strip_source
+import warm_cache
+
+def find_local_dependencies(entry_point, project_root, distances=None, edges=None, graph=None, store=None):
     """
     Recursively find local Python files imported by the entry point.
     Only includes files that physically exist in the project root directory.
+
+    The walk is breadth-first; for --budget ranking, pass dicts as
+    'distances' (file -> import distance from the entry point) and/or
+    'edges' (file -> set of local files it imports) to have them filled in.
+    For --graph-out, pass an ImportGraph to record the walk itself. With a
+    SourceStore, the files read here are kept for the writers.
     """
     visited = set()
-    to_visit = [os.path.abspath(entry_point)]
+    to_visit = deque([(os.path.abspath(entry_point), 0)])
     included_files = set()
+    if graph is not None:
+        graph.add_node(os.path.abspath(entry_point), "entry point", 0)
 
     while to_visit:
-        current_file = to_visit.pop()
+        current_file, depth = to_visit.popleft()
         if current_file in visited:
             continue
         visited.add(current_file)
@@ -29,46 +51,92 @@ def find_local_dependencies(entry_point, project_root):
             continue
 
         included_files.add(current_file)
-        new_deps = extract_local_imports(current_file, project_root)
+        new_deps = extract_local_imports(current_file, project_root, graph, store)
+        if graph is not None:
+            graph.add_node(current_file, "project root", depth)
+        if distances is not None:
+            distances[current_file] = min(depth, distances.get(current_file, depth))
+        if edges is not None:
+            edges[current_file] = new_deps
         for dep in new_deps:
             if dep not in visited:
-                to_visit.append(dep)
+                to_visit.append((dep, depth + 1))
 
     # Include __init__.py files for packages
-    included_files = included_files.union(
-        find_init_files_for_packages(included_files, project_root)
-    )
+    init_files = find_init_files_for_packages(included_files, project_root)
+    if graph is not None:
+        for init_file in sorted(init_files):
+            graph.add_node(init_file, "package __init__")
+    included_files = included_files.union(init_files)
     
     return included_files
 
-def extract_local_imports(py_file, project_root):
+def parse_import_names(py_file, store=None):
     """
-    Parse the Python file's AST to find local imports. 
-    We only include files that exist within project_root.
+    Module names imported by a Python file, in AST order, as
+    (name, is_relative, kind, line) tuples. is_relative means the name is
+    resolved against the file's own directory; kind is 'absolute'
+    (import x), 'from' (from x import y) or 'relative' (from . import y,
+    from .x import y). Only depends on the file itself, so in the daemon
+    the result is cached until the file changes. The source is decoded per
+    PEP 263 (see source_store.py), read through 'store' if given.
     """
-    local_deps = set()
-    with open(py_file, "r", encoding="utf-8") as f:
-        tree = ast.parse(f.read(), filename=py_file)
+    if store is not None:
+        source = store.read_text(py_file)
+    else:
+        source = decode_source(warm_cache.read_bytes(py_file)[1])
+    tree = ast.parse(source, filename=py_file)
 
-    current_dir = os.path.dirname(py_file)
+    names = []
     for node in ast.walk(tree):
         if isinstance(node, ast.Import):
             for alias in node.names:
-                dep_file = guess_local_module_path(alias.name, project_root)
-                if dep_file:
-                    local_deps.add(dep_file)
+                names.append((alias.name, False, 'absolute', node.lineno))
         elif isinstance(node, ast.ImportFrom):
+            kind = 'relative' if node.level else 'from'
             # node.module might be None for "from . import foo"
             if node.module is not None:
-                dep_file = guess_local_module_path(node.module, project_root)
-                if dep_file:
-                    local_deps.add(dep_file)
+                names.append((node.module, False, kind, node.lineno))
             else:
-                # Relative import from the current directory
                 for alias in node.names:
-                    dep_file = guess_local_module_path(alias.name, current_dir, is_relative=True)
-                    if dep_file and dep_file.startswith(os.path.abspath(project_root)):
-                        local_deps.add(dep_file)
+                    names.append((alias.name, True, kind, node.lineno))
+    return names
+
+def extract_local_imports(py_file, project_root, graph=None, store=None):
+    """
+    Parse the Python file's AST to find local imports. 
+    We only include files that exist within project_root.
+    With an ImportGraph (--graph-out), every import is recorded as an edge
+    or as unresolved, along with the time spent parsing the file.
+    """
+    local_deps = set()
+    current_dir = os.path.dirname(py_file)
+    started = time.perf_counter()
+    names = warm_cache.derived("py-imports", py_file, lambda path: parse_import_names(path, store))
+    if graph is not None:
+        graph.set_parse_time(py_file, time.perf_counter() - started)
+    for name, is_relative, kind, line in names:
+        if not is_relative:
+            dep_file = guess_local_module_path(name, project_root)
+            source = "project root"
+        else:
+            # Relative import from the current directory
+            dep_file = guess_local_module_path(name, current_dir, is_relative=True)
+            if dep_file and not dep_file.startswith(os.path.abspath(project_root)):
+                dep_file = None
+            source = "importer directory"
+        if dep_file:
+            local_deps.add(dep_file)
+            if graph is not None:
+                graph.add_edge(py_file, dep_file, kind, name, line, source)
+        elif graph is not None:
+            # A local package (from pkg import util): the import runs its
+            # __init__.py, so draw the edge there instead of calling it unresolved.
+            init_file = guess_local_package_init(name, current_dir if is_relative else project_root)
+            if init_file and init_file.startswith(os.path.abspath(project_root)):
+                graph.add_edge(py_file, init_file, kind, name, line, "package __init__")
+            else:
+                graph.add_unresolved(py_file, name, kind, line)
     return local_deps
 
 def guess_local_module_path(module_name, base_path, is_relative=False):
@@ -86,6 +154,16 @@ def guess_local_module_path(module_name, base_path, is_relative=False):
         return os.path.abspath(candidate)
     return None
 
+def guess_local_package_init(module_name, base_path):
+    """
+    The __init__.py of a package like 'mypkg' or 'mypkg.sub' under base_path,
+    or None if there is no such package.
+    """
+    candidate = os.path.join(base_path, module_name.replace('.', os.sep), '__init__.py')
+    if os.path.isfile(candidate):
+        return os.path.abspath(candidate)
+    return None
+
 def find_init_files_for_packages(included_files, project_root):
     """
     If a directory is a Python package, ensure its __init__.py is included.
@@ -107,68 +185,163 @@ def find_init_files_for_packages(included_files, project_root):
 
     return init_files
 
-def find_all_py_files(base_dir):
+# Directories/files skipped when a source path is a directory (see --exclude,
+# --no-default-excludes). Matching rules are in fs_walk.path_matches_any.
+DEFAULT_EXCLUDE_PATTERNS = [
+    '.git', '.hg', '.svn',
+    '.venv', 'venv', 'site-packages',
+    '__pycache__', '.mypy_cache', '.pytest_cache', '.ruff_cache', '.tox', '.nox',
+    'build', 'dist', '*.egg-info', 'node_modules',
+    'tests/fixtures', 'test/fixtures',
+]
+
+def find_all_py_files(base_dir, walk_workers=1, exclude_patterns=None, extra_extensions=None):
     """
     Recursively find ALL Python files (ending in *.py) in the specified base_dir.
+
+    - exclude_patterns: globs for directories/files to skip (None means
+      DEFAULT_EXCLUDE_PATTERNS). Excluded directories are pruned during the
+      walk, so virtualenvs and caches are never even read.
+    - extra_extensions: companion extensions (e.g. ['pyi', 'sql', 'json'])
+      collected from the same scan.
+    - walk_workers > 1 scans that many directories concurrently (see fs_walk.py).
     """
+    if exclude_patterns is None:
+        exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+    suffixes = (".py",) + tuple("." + ext.lower().lstrip(".") for ext in (extra_extensions or []))
+
+    def prune_dir(parent, name):
+        rel_dir = os.path.relpath(os.path.join(parent, name), start=base_dir)
+        return path_matches_any(rel_dir, exclude_patterns)
+
+    def keep_file(name):
+        return name.lower().endswith(suffixes)
+
     included_files = set()
-    for root, dirs, files in os.walk(base_dir):
-        for filename in files:
-            if filename.endswith(".py"):
-                full_path = os.path.join(root, filename)
-                included_files.add(os.path.abspath(full_path))
+    for path in walk_files(base_dir, walk_workers, prune_dir=prune_dir if exclude_patterns else None, keep_file=keep_file):
+        if exclude_patterns and path_matches_any(os.path.relpath(path, start=base_dir), exclude_patterns):
+            continue
+        included_files.add(os.path.abspath(path))
     return included_files
 
-def zip_files(file_paths, zip_path, base_dir):
+def zip_files(file_paths, zip_path, base_dir, slicer=None, strip_mode=None, stats=None, prefetch=DEFAULT_PREFETCH, members=None, store=None):
+    """
+    ZIP the given files (arcnames relative to base_dir). With a ModuleSlicer
+    (--slice) and/or --strip, each file's transformed text is stored instead
+    of the file itself, encoded back in the file's own PEP 263 encoding so
+    its coding cookie stays true.
+
+    Files are read up to 'prefetch' ahead in background threads (see
+    prefetch.py) while the current one is compressed. If 'members' is a
+    list, an --index-out record of each stored file is appended to it.
+    With a SourceStore, files already read for parsing aren't read again,
+    and each one is released once it is in the ZIP.
+    """
+    file_paths = list(file_paths)
+    reader = store.read_bytes if store is not None else read_for_zip
     with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for f in file_paths:
+        for f, (st, raw) in prefetch_files(file_paths, reader, prefetch):
             arcname = os.path.relpath(f, start=base_dir)
-            zipf.write(f, arcname)
-
-def build_directory_tree(file_paths, project_root):
+            if slicer is not None or strip_mode is not None or stats is not None:
+                text = transform_file_text(f, decode_source(raw), slicer, strip_mode, stats)
+                raw = text.encode(detect_source_encoding(raw), "replace")
+            zipf.writestr(zipinfo_from_stat(st, arcname), raw, compress_type=zipfile.ZIP_DEFLATED)
+            if members is not None:
+                members.append(member_record(arcname, raw))
+            if store is not None:
+                store.release(f)
+
+def read_source(fpath):
     """
-    Build a directory tree representation as text, explicitly showing
-    the name of the root directory (e.g. ./schemas instead of just '.').
+    Reader used by the plain-text listings (see prefetch_files) when there
+    is no SourceStore; decodes the same way (PEP 263, see source_store.py).
     """
-    rel_paths = [os.path.relpath(p, start=project_root) for p in file_paths]
-    rel_paths = sorted(rel_paths)
-
-    # Build hierarchical dict
-    tree = {}
-    for p in rel_paths:
-        parts = p.split(os.sep)
-        d = tree
-        for part in parts[:-1]:
-            d = d.setdefault(part, {})
-        d[parts[-1]] = None
-
-    def format_tree(d, prefix=""):
-        lines = []
-        entries = sorted(d.keys())
-        for i, entry in enumerate(entries):
-            connector = "└── " if i == len(entries) - 1 else "├── "
-            if isinstance(d[entry], dict):
-                lines.append(prefix + connector + entry)
-                extension = "    " if i == len(entries) - 1 else "│   "
-                lines.extend(format_tree(d[entry], prefix + extension))
-            else:
-                lines.append(prefix + connector + entry)
-        return lines
+    return decode_source(warm_cache.read_bytes(fpath)[1])
 
+def transform_file_text(fpath, original, slicer=None, strip_mode=None, stats=None):
+    """
+    Return one included file's text as it should appear in the bundle:
+    sliced when --slice is active, minified with --strip ('all' or 'lines'),
+    and counted for --stats.
+    """
+    text = slicer.render(fpath) if slicer is not None else original
+    if strip_mode is not None:
+        text = strip_source(text, fpath, keep_lines=(strip_mode == 'lines'))
+    if stats is not None:
+        stats.add(original, text)
+    return text
+
+def write_file_listings(out, file_paths, base_dir, slicer=None, strip_mode=None, stats=None, prefetch=DEFAULT_PREFETCH, index=None, store=None):
+    """
+    Write the '--- BEGIN FILE / --- END FILE' blocks for the given files
+    (sorted), reading up to 'prefetch' files ahead while writing. With an
+    --index-out BundleIndex, the byte range of each file's text is recorded.
+    With a SourceStore, files are read through it and released once written.
+    """
+    reader = store.read_text if store is not None else read_source
+    for fpath, original in prefetch_files(sorted(file_paths), reader, prefetch):
+        rel_path = os.path.relpath(fpath, start=base_dir)
+        out.write(f"--- BEGIN FILE: {rel_path} ---\n")
+        text = transform_file_text(fpath, original, slicer, strip_mode, stats)
+        if index is not None:
+            start = out.tell()
+        out.write(text)
+        if index is not None:
+            index.add_text(out, base_dir, rel_path, start, text)
+        out.write(f"\n--- END FILE: {rel_path} ---\n\n")
+        if store is not None:
+            store.release(fpath)
+
+def directory_tree_label(project_root):
+    """
+    Label for the top of a directory tree, e.g. './schemas' instead of '.'.
+    """
     # Use the basename of the project_root to label the directory tree
     root_label = os.path.basename(os.path.normpath(project_root))
     # If the basename is empty (unlikely but can happen if project_root is '/'), default to '.'
     if not root_label:
-        root_label = '.'
-    else:
-        # Prepend "./" to match the style of your example
-        root_label = f"./{root_label}"
+        return '.'
+    # Prepend "./" to match the style of your example
+    return f"./{root_label}"
+
+def iter_directory_tree(file_paths, project_root, tree_opts=None):
+    """
+    Yield the lines of the directory tree (label first) one at a time.
+    The paths go into a compact PathTrie (shared with app-bundler.py), so large
+    trees can be streamed straight to the output file.
 
-    lines = [root_label]
-    lines.extend(format_tree(tree))
-    return "\n".join(lines)
+    tree_opts may contain 'max_depth' and/or 'collapse_threshold'.
+    """
+    if tree_opts is None:
+        tree_opts = {}
+    tree = PathTrie()
+    for p in file_paths:
+        tree.add(os.path.relpath(p, start=project_root))
+
+    yield directory_tree_label(project_root)
+    yield from iter_tree_lines(tree, dirs_first=False,
+                               max_depth=tree_opts.get('max_depth'),
+                               collapse_threshold=tree_opts.get('collapse_threshold'))
+
+def build_directory_tree(file_paths, project_root, tree_opts=None):
+    """
+    Build a directory tree representation as text, explicitly showing
+    the name of the root directory (e.g. ./schemas instead of just '.').
+    """
+    return "\n".join(iter_directory_tree(file_paths, project_root, tree_opts))
 
-def build_multi_root_listing(roots_files):
+def write_directory_tree(out, file_paths, project_root, tree_opts=None):
+    """
+    Stream the directory tree to 'out' (same text as build_directory_tree).
+    """
+    first = True
+    for line in iter_directory_tree(file_paths, project_root, tree_opts):
+        if not first:
+            out.write("\n")
+        out.write(line)
+        first = False
+
+def build_multi_root_listing(roots_files, tree_opts=None):
     """
     Build a textual listing showing, for each root:
       - A full directory tree if it is the first root
@@ -187,7 +360,7 @@ def build_multi_root_listing(roots_files):
         # Sort by directory structure to keep things consistent
         if idx == 0:
             # First root: show full directory tree
-            tree_text = build_directory_tree(files_set, project_root)
+            tree_text = build_directory_tree(files_set, project_root, tree_opts)
             output_lines.append(f"Root #{idx+1}: {root_path} (Full listing)\n{tree_text}\n")
             # Mark origin
             for f in files_set:
@@ -208,7 +381,7 @@ def build_multi_root_listing(roots_files):
 
             # Build tree for newly introduced files
             if new_files:
-                tree_text = build_directory_tree(new_files, project_root)
+                tree_text = build_directory_tree(new_files, project_root, tree_opts)
                 output_lines.append(
                     f"Root #{idx+1}: {root_path}\n"
                     f"New modules introduced:\n{tree_text}\n"
@@ -231,7 +404,60 @@ def build_multi_root_listing(roots_files):
 
     return "\n".join(output_lines)
 
-if __name__ == "__main__":
+def directory_import_edges(file_paths, project_root, edges=None, graph=None, store=None):
+    """
+    Fill 'edges' (file -> set of local files it imports) for the .py files of
+    a directory root, for --budget centrality, and/or record them in an
+    ImportGraph for --graph-out. Files that don't parse simply have no edges
+    (directory roots never required them to parse).
+    """
+    file_paths = sorted(file_paths)
+    if graph is not None:
+        for f in file_paths:
+            graph.add_node(f, "directory scan")
+    for f in file_paths:
+        if not f.endswith(".py") or (edges is not None and f in edges):
+            continue
+        try:
+            deps = extract_local_imports(f, project_root, graph, store)
+        except (SyntaxError, ValueError, UnicodeDecodeError) as e:
+            deps = set()
+            if graph is not None:
+                graph.set_error(f, f"{type(e).__name__}: {e}")
+        if edges is not None:
+            edges[f] = deps
+
+def fit_files_to_budget(file_paths, budget, base_dir, no_encode, distances=None, edges=None):
+    """
+    --budget: keep the most important files that fit (see budget.py). In
+    --no-encode mode each file's BEGIN/END FILE markers count too.
+    """
+    def overhead(path):
+        if not no_encode:
+            return 0
+        rel_path = os.path.relpath(path, start=base_dir)
+        return len(f"--- BEGIN FILE: {rel_path} ---\n") + len(f"\n--- END FILE: {rel_path} ---\n\n")
+    return fit_budget(file_paths, budget, distances, edges, overhead)
+
+def pop_option_value(args, name):
+    """
+    Remove '--name VALUE' or '--name=VALUE' from args (in place) and return VALUE,
+    or None if the option is absent. Exits with an error if VALUE is missing.
+    """
+    for i, item in enumerate(args):
+        if item == name:
+            if i + 1 >= len(args):
+                print(f"Error: {name} requires a value.")
+                sys.exit(1)
+            value = args[i + 1]
+            del args[i:i + 2]
+            return value
+        if item.startswith(name + "="):
+            del args[i]
+            return item.split("=", 1)[1]
+    return None
+
+def main(argv):
     # Usage: 
     #   python3 python_bundler.py [--no-encode] <source_path> <output_text_file>
     #
@@ -240,13 +466,42 @@ if __name__ == "__main__":
     #
     # where each <source_path_i> can be either:
     #   - a Python file: we parse imports to find local deps
-    #   - a directory: we collect *all* .py files in that directory
-
-    if len(sys.argv) < 3:
-        print("Usage: python3 python_bundler.py [--no-encode] <source_path> [<source_path2> ...] <output_text_file>")
+    #   - a directory: we collect *all* .py files in that directory, skipping
+    #     virtualenvs, caches, VCS and build output (see DEFAULT_EXCLUDE_PATTERNS)
+    #
+    # --slice: for file roots, emit only the top-level functions, classes and
+    # constants reachable from the entry point (plus the imports they need);
+    # elided code is marked with "# [bundler] elided lines ..." comments.
+    #
+    # --strip removes comments, docstrings and blank lines from the listed
+    # files (--strip=lines keeps line numbers intact); --stats reports the
+    # byte savings of --slice/--strip.
+    #
+    # Directory tree options (both modes):
+    #   --tree-max-depth N   only show N directory levels, summarize deeper ones
+    #   --tree-collapse N    summarize directories with more than N files as "… (N files)"
+    #
+    # Discovery option for directory roots:
+    #   --walk-workers N     scan N directories concurrently (slow/network filesystems)
+    #   --exclude PATTERNS   extra globs to skip, e.g. 'migrations,*_pb2.py' (repeatable)
+    #   --no-default-excludes  also scan .venv, site-packages, __pycache__, .git, build/, ...
+    #   --include-ext EXTS   also collect companion files, e.g. 'pyi,sql,json'
+    #
+    # I/O option:
+    #   --prefetch N         read N files ahead while writing the bundle (default 8, 0 = off)
+    #   --budget SIZE        keep only the most important files whose contents fit in SIZE
+    #                        bytes (150k, 2m) or tokens (32ktok); the rest are tree-only
+    #   --index-out PATH     also write a JSON index of each file's byte offset, length and
+    #                        sha256, so unbundle.py can extract files without scanning the bundle
+    #   --graph-out PATH     also write the import graph (files with size, parse time and how
+    #                        they were resolved; imports by kind; unresolved imports) as JSON,
+    #                        or as Graphviz DOT if PATH ends in .dot (see import_graph.py)
+
+    if len(argv) < 2:
+        print("Usage: python3 python_bundler.py [--no-encode] [--slice] [--strip[=lines]] [--stats] [--tree-max-depth N] [--tree-collapse N] [--walk-workers N] [--prefetch N] [--budget SIZE] [--index-out PATH] [--graph-out PATH] [--exclude PATTERNS] [--no-default-excludes] [--include-ext EXTS] <source_path> [<source_path2> ...] <output_text_file>")
         sys.exit(1)
 
-    args = sys.argv[1:]
+    args = list(argv)
     no_encode = False
 
     # Check for --no-encode
@@ -254,11 +509,95 @@ if __name__ == "__main__":
         no_encode = True
         args.remove("--no-encode")
 
-    # After removing --no-encode, we need at least 2 arguments:
+    # Check for --slice (symbol-level tree-shaking of file roots, see py_slice.py)
+    slice_modules = False
+    if "--slice" in args:
+        slice_modules = True
+        args.remove("--slice")
+
+    # --strip / --strip=lines: remove comments, docstrings and blank lines
+    # (--strip=lines keeps the line structure); --stats: report byte savings
+    strip_mode = None
+    for item in list(args):
+        if item == "--strip":
+            strip_mode = 'all'
+            args.remove(item)
+        elif item.startswith("--strip="):
+            strip_mode = item.split("=", 1)[1].strip().lower()
+            if strip_mode not in ('all', 'lines'):
+                print(f"Error: --strip accepts 'all' or 'lines' (got '{strip_mode}').")
+                sys.exit(1)
+            args.remove(item)
+    show_stats = False
+    if "--stats" in args:
+        show_stats = True
+        args.remove("--stats")
+    stats = StripStats() if show_stats else None
+
+    # Directory tree options: --tree-max-depth N, --tree-collapse N
+    tree_opts = {}
+    max_depth = pop_option_value(args, "--tree-max-depth")
+    if max_depth is not None:
+        tree_opts['max_depth'] = parse_count_option("--tree-max-depth", max_depth)
+    collapse_threshold = pop_option_value(args, "--tree-collapse")
+    if collapse_threshold is not None:
+        tree_opts['collapse_threshold'] = parse_count_option("--tree-collapse", collapse_threshold)
+
+    # Discovery option for directory roots: --walk-workers N
+    walk_workers = 1
+    walk_workers_value = pop_option_value(args, "--walk-workers")
+    if walk_workers_value is not None:
+        walk_workers = parse_count_option("--walk-workers", walk_workers_value)
+
+    # Directory-root scan options:
+    #   --exclude PATTERNS       extra comma-separated globs to skip (repeatable)
+    #   --no-default-excludes    don't skip .venv, site-packages, __pycache__, .git, build/, ...
+    #   --include-ext EXTS       companion extensions to collect too, e.g. pyi,sql,json
+    exclude_patterns = list(DEFAULT_EXCLUDE_PATTERNS)
+    if "--no-default-excludes" in args:
+        exclude_patterns = []
+        args.remove("--no-default-excludes")
+    while True:
+        exclude_value = pop_option_value(args, "--exclude")
+        if exclude_value is None:
+            break
+        exclude_patterns.extend(p.strip() for p in exclude_value.split(",") if p.strip())
+    extra_extensions = []
+    include_ext_value = pop_option_value(args, "--include-ext")
+    if include_ext_value is not None:
+        extra_extensions = [e.strip().lower().lstrip(".") for e in include_ext_value.split(",") if e.strip()]
+
+    # Read-ahead depth for file contents: --prefetch N (0 disables)
+    prefetch = DEFAULT_PREFETCH
+    prefetch_value = pop_option_value(args, "--prefetch")
+    if prefetch_value is not None:
+        prefetch = parse_count_option("--prefetch", prefetch_value)
+
+    # Sidecar byte-offset index for unbundle.py: --index-out PATH
+    index_out = pop_option_value(args, "--index-out")
+    index = BundleIndex() if index_out else None
+
+    # Size budget for the bundle's file contents: --budget SIZE (e.g. 200k, 48ktok)
+    budget = None
+    budget_value = pop_option_value(args, "--budget")
+    if budget_value is not None:
+        budget = parse_budget_option(budget_value)
+    distances = {} if budget is not None else None
+    edges = {} if budget is not None else None
+    fit = None
+
+    # Import graph export: --graph-out graph.json (or graph.dot)
+    graph_out = pop_option_value(args, "--graph-out")
+    graph = ImportGraph() if graph_out else None
+
+    # Each file is read once: the parser, --slice and the writers share it
+    store = SourceStore()
+
+    # After removing the options, we need at least 2 arguments:
     #   single-root mode: <source_path> <output_text_file>
     #   multi-root mode:  <source_path_1> <source_path_2> ... <source_path_n> <output_text_file>
     if len(args) < 2:
-        print("Usage: python3 python_bundler.py [--no-encode] <source_path> [<source_path2> ...] <output_text_file>")
+        print("Usage: python3 python_bundler.py [--no-encode] [--slice] [--strip[=lines]] [--stats] [--tree-max-depth N] [--tree-collapse N] [--walk-workers N] [--prefetch N] [--budget SIZE] [--index-out PATH] [--graph-out PATH] [--exclude PATTERNS] [--no-default-excludes] [--include-ext EXTS] <source_path> [<source_path2> ...] <output_text_file>")
         sys.exit(1)
 
     # The last argument is always the output text file
@@ -275,13 +614,28 @@ if __name__ == "__main__":
         # Single-root gather
         if os.path.isdir(source_path):
             project_root = os.path.abspath(source_path)
-            included_files = find_all_py_files(project_root)
+            included_files = find_all_py_files(project_root, walk_workers, exclude_patterns, extra_extensions)
         else:
             project_root = os.path.dirname(os.path.abspath(source_path))
-            included_files = find_local_dependencies(source_path, project_root)
-
-        # Build directory tree for the single root
-        directory_tree = build_directory_tree(included_files, project_root)
+            included_files = find_local_dependencies(source_path, project_root, distances, edges, graph, store)
+        if graph is not None and os.path.isdir(source_path):
+            directory_import_edges(included_files, project_root, edges, graph, store)
+
+        # --slice: keep only the top-level definitions reachable from the entry point
+        slicer = None
+        if slice_modules and os.path.isfile(source_path):
+            slicer = ModuleSlicer(store.read_text)
+            slicer.add_entry(source_path, project_root, included_files)
+            included_files = slicer.retained_files(included_files)
+
+        # --budget: every included file stays in the tree, only the kept ones are listed
+        listed_files = included_files
+        if budget is not None:
+            if os.path.isdir(source_path):
+                directory_import_edges(included_files, project_root, edges, store=store)
+            fit = fit_files_to_budget(included_files, budget, project_root, no_encode, distances, edges)
+            listed_files = [f for f in included_files if f in fit.kept]
+        graph_base = project_root
 
         # Decide output mode
         if no_encode:
@@ -289,26 +643,29 @@ if __name__ == "__main__":
             # --no-encode mode: plain text listings, no instructions
             # ----------------------------------------------------
             with open(output_text_file, "w", encoding="utf-8") as out:
-                # Write the directory tree at the top
-                out.write(directory_tree)
+                # Stream the directory tree at the top
+                write_directory_tree(out, included_files, project_root, tree_opts)
                 out.write("\n\n")
+                if fit is not None:
+                    out.write(fit.note() + "\n\n")
 
                 # For each included file, write a header and its contents
-                for fpath in sorted(included_files):
-                    rel_path = os.path.relpath(fpath, start=project_root)
-                    out.write(f"--- BEGIN FILE: {rel_path} ---\n")
-                    with open(fpath, "r", encoding="utf-8") as fin:
-                        out.write(fin.read())
-                    out.write(f"\n--- END FILE: {rel_path} ---\n\n")
+                write_file_listings(out, listed_files, project_root, slicer, strip_mode, stats, prefetch, index, store)
 
             print(f"All included files have been written as plain text to {output_text_file}.")
         else:
             # ----------------------------------------------------
             # Original behavior: ZIP + Base64 + instructions
             # ----------------------------------------------------
+            # Build directory tree for the single root (embedded in the instructions)
+            directory_tree = build_directory_tree(included_files, project_root, tree_opts)
+            if fit is not None:
+                directory_tree += "\n\n" + fit.note()
+
+            members = [] if index is not None else None
             with tempfile.TemporaryDirectory() as tmpdir:
                 zip_path = os.path.join(tmpdir, "filtered_app.zip")
-                zip_files(included_files, zip_path, project_root)
+                zip_files(listed_files, zip_path, project_root, slicer, strip_mode, stats, prefetch, members, store)
 
                 with open(zip_path, "rb") as f:
                     zip_data = f.read()
@@ -333,6 +690,8 @@ if __name__ == "__main__":
             ''')
 
             with open(output_text_file, "w", encoding="utf-8") as out:
+                if index is not None:
+                    index.add_zip(project_root, out.tell(), len(encoded), members)
                 out.write(encoded)
                 out.write(instructions)
 
@@ -365,16 +724,45 @@ if __name__ == "__main__":
 
             if os.path.isdir(spath):
                 this_project_root = os.path.abspath(spath)
-                these_files = find_all_py_files(this_project_root)
+                these_files = find_all_py_files(this_project_root, walk_workers, exclude_patterns, extra_extensions)
             else:
                 this_project_root = os.path.dirname(os.path.abspath(spath))
-                these_files = find_local_dependencies(spath, this_project_root)
+                these_files = find_local_dependencies(spath, this_project_root, distances, edges, graph, store)
+            if graph is not None and os.path.isdir(spath):
+                directory_import_edges(these_files, this_project_root, edges, graph, store)
 
             roots_files.append((spath, these_files, this_project_root))
             all_included_files.update(these_files)
 
+        # --slice: file roots are sliced from their entry point, directory roots kept whole
+        slicer = None
+        if slice_modules:
+            slicer = ModuleSlicer(store.read_text)
+            for spath, these_files, this_project_root in roots_files:
+                if os.path.isfile(spath):
+                    slicer.add_entry(spath, this_project_root, these_files)
+                else:
+                    slicer.keep_whole(these_files)
+            roots_files = [
+                (spath, slicer.retained_files(these_files), this_project_root)
+                for spath, these_files, this_project_root in roots_files
+            ]
+            all_included_files = set().union(*(files for _, files, _ in roots_files))
+
+        # --budget: rank all roots' files together; the listing still shows every file
+        listed_files = all_included_files
+        if budget is not None:
+            for spath, these_files, this_project_root in roots_files:
+                if os.path.isdir(spath):
+                    directory_import_edges(these_files, this_project_root, edges, store=store)
+            fit = fit_files_to_budget(all_included_files, budget, main_project_root, no_encode, distances, edges)
+            listed_files = [f for f in all_included_files if f in fit.kept]
+        graph_base = main_project_root
+
         # Build the multi-root textual listing
-        multi_root_listing = build_multi_root_listing(roots_files)
+        multi_root_listing = build_multi_root_listing(roots_files, tree_opts)
+        if fit is not None:
+            multi_root_listing += "\n\n" + fit.note()
 
         # Decide how to output
         if no_encode:
@@ -389,22 +777,18 @@ if __name__ == "__main__":
                 out.write("\n\n")
 
                 # For each included file (unique), write a header and its contents
-                # We'll sort them to have consistent order
-                for fpath in sorted(all_included_files):
-                    rel_path = os.path.relpath(fpath, start=main_project_root)
-                    out.write(f"--- BEGIN FILE: {rel_path} ---\n")
-                    with open(fpath, "r", encoding="utf-8") as fin:
-                        out.write(fin.read())
-                    out.write(f"\n--- END FILE: {rel_path} ---\n\n")
+                # (sorted to have consistent order)
+                write_file_listings(out, listed_files, main_project_root, slicer, strip_mode, stats, prefetch, index, store)
 
             print(f"All included files (from multiple roots) have been written as plain text to {output_text_file}.")
         else:
             # ----------------------------------------------------
             # ZIP + Base64 + instructions
             # ----------------------------------------------------
+            members = [] if index is not None else None
             with tempfile.TemporaryDirectory() as tmpdir:
                 zip_path = os.path.join(tmpdir, "filtered_app.zip")
-                zip_files(all_included_files, zip_path, main_project_root)
+                zip_files(listed_files, zip_path, main_project_root, slicer, strip_mode, stats, prefetch, members, store)
 
                 with open(zip_path, "rb") as f:
                     zip_data = f.read()
@@ -429,6 +813,8 @@ if __name__ == "__main__":
             ''')
 
             with open(output_text_file, "w", encoding="utf-8") as out:
+                if index is not None:
+                    index.add_zip(main_project_root, out.tell(), len(encoded), members)
                 out.write(encoded)
                 out.write(instructions)
 
@@ -436,3 +822,26 @@ if __name__ == "__main__":
             print("Only the locally coded files have been included in the output.")
             print("Copy the entire contents of that file and paste it into the chat environment.")
             print("Follow the instructions at the bottom of the file to interpret and improve the code.")
+
+    if fit is not None:
+        fit.report()
+    if index is not None:
+        index.write(index_out, output_text_file)
+        print(f"Byte-offset index written to {index_out} (extract files with unbundle.py).")
+    if graph is not None:
+        data = graph.write(graph_out, graph_base, listed_files)
+        print(f"Import graph written to {graph_out} ({len(data['nodes'])} files, "
+              f"{len(data['edges'])} imports, {len(data['unresolved'])} unresolved).")
+    if stats is not None:
+        stats.report(output_text_file)
+
+
+if __name__ == "__main__":
+    # With BUNDLER_DAEMON_SOCKET set, hand the run to a warm bundler daemon
+    # (see bundler_daemon.py); falls back to running here if none answers.
+    from bundler_client import forward_to_daemon
+    status = forward_to_daemon("python_bundler", sys.argv[1:])
+    if status is None:
+        main(sys.argv[1:])
+    else:
+        sys.exit(status)
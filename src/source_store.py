@@ -0,0 +1,100 @@
+# src/source_store.py
+#
+# Per-run store of Python source contents for python_bundler.py.
+#
+# A file root's modules used to be read twice: once to parse their imports
+# (and again by --slice), then again by the writers -- the second time as
+# strict UTF-8, so a latin-1 module with a proper "# -*- coding: ... -*-"
+# line parsed fine and then crashed the bundle. SourceStore reads each file
+# once and keeps its bytes until the writer that emits it calls release(),
+# so parsing, slicing and writing all share one read:
+#
+#   - decoding follows PEP 263 (tokenize.detect_encoding): a UTF-8 BOM or an
+#     encoding cookie in the first two lines, UTF-8 otherwise; bytes that
+#     don't decode are replaced (U+FFFD) instead of aborting the run
+#   - newlines are translated like open(path, "r") does
+#   - held bytes are capped at max_bytes; past that, the oldest files are
+#     dropped and simply read again when needed
+#
+# Reads go through warm_cache, so in the bundler daemon unchanged files
+# still come from its cache.
+
+import io
+import threading
+import tokenize
+from collections import OrderedDict
+
+import warm_cache
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def detect_source_encoding(data):
+    """
+    PEP 263 encoding of a source file's bytes ('utf-8-sig' when it starts
+    with a BOM); 'utf-8' if the declared encoding is invalid or unknown.
+    """
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    except SyntaxError:
+        return "utf-8"
+    return encoding
+
+
+def decode_source(data):
+    """
+    Decode a source file's bytes per PEP 263, with universal newlines.
+    """
+    text = data.decode(detect_source_encoding(data), "replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class SourceStore:
+    """
+    Holds each file's (stat, bytes) from its first read until release().
+    Safe to use from the prefetch threads.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.reads = 0
+        self._held = OrderedDict()  # path -> (stat, bytes)
+        self._held_bytes = 0
+        self._lock = threading.Lock()
+
+    def read_bytes(self, path):
+        """
+        Return (os.stat result, file bytes), reading the file only if it
+        isn't held.
+        """
+        with self._lock:
+            hit = self._held.get(path)
+        if hit is not None:
+            return hit
+        st, data = warm_cache.read_bytes(path)
+        with self._lock:
+            self.reads += 1
+            if path not in self._held and len(data) <= self.max_bytes:
+                self._held[path] = (st, data)
+                self._held_bytes += len(data)
+                while self._held_bytes > self.max_bytes:
+                    _, (_, evicted) = self._held.popitem(last=False)
+                    self._held_bytes -= len(evicted)
+        return st, data
+
+    def read_text(self, path):
+        """
+        The file's text, decoded with decode_source().
+        """
+        return decode_source(self.read_bytes(path)[1])
+
+    def release(self, path):
+        """
+        Forget a file once it has been written to the bundle.
+        """
+        with self._lock:
+            held = self._held.pop(path, None)
+            if held is not None:
+                self._held_bytes -= len(held[1])
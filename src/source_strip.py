@@ -0,0 +1,422 @@
+# src/source_strip.py
+#
+# Optional comment/whitespace minification (--strip) for both bundlers.
+#
+# A large share of the bytes in our bundles are comments, docstrings and
+# blank lines. strip_source() removes them in a single pass per file:
+#
+#   - .py:            tokenize-based; drops comments and docstrings (a
+#                     docstring that is the only statement of its block is
+#                     kept so the code stays valid)
+#   - JS/TS family:   a small lexer that copies strings, template literals
+#                     and regex literals verbatim and drops // and /* */
+#                     comments (/*! ... */ license comments are kept)
+#   - CSS/SCSS/LESS:  the same lexer with /* */ comments (plus // for SCSS/LESS;
+#                     an unquoted url(...) is copied verbatim so the '//' in
+#                     url(http://...) or url(//cdn...) isn't taken as one)
+#   - .json:          whitespace outside strings is removed
+#
+# String literals are never modified. With keep_lines=True ('--strip=lines')
+# the line structure is preserved: removed comments leave their lines in
+# place (only trailing whitespace is trimmed) so line numbers still match
+# the original file. Any file that fails to tokenize is returned unchanged.
+#
+# StripStats accumulates before/after byte counts for --stats.
+
+import io
+import os
+import tokenize
+
+JS_EXTENSIONS = {'.js', '.mjs', '.cjs', '.jsx', '.ts', '.tsx', '.mts', '.cts'}
+JSX_EXTENSIONS = {'.jsx', '.tsx'}
+CSS_EXTENSIONS = {'.css'}
+CSS_LINE_COMMENT_EXTENSIONS = {'.scss', '.less'}
+
+_FSTRING_START = {getattr(tokenize, name) for name in ('FSTRING_START', 'TSTRING_START') if hasattr(tokenize, name)}
+_FSTRING_END = {getattr(tokenize, name) for name in ('FSTRING_END', 'TSTRING_END') if hasattr(tokenize, name)}
+
+# A '/' after one of these characters (or at the start) begins a regex literal.
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete',
+                   'void', 'throw', 'case', 'do', 'else', 'yield', 'await'}
+_WORD_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$')
+
+
+def strip_source(text, filename, keep_lines=False):
+    """
+    Return text with comments/docstrings/blank lines removed according to
+    the file's extension. Unknown file types are returned unchanged.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.py':
+        return strip_python(text, keep_lines)
+    if ext in JS_EXTENSIONS:
+        return strip_c_like(text, keep_lines, line_comments=True, regexes=True,
+                            templates=True, jsx=ext in JSX_EXTENSIONS)
+    if ext in CSS_EXTENSIONS:
+        return strip_c_like(text, keep_lines, line_comments=False)
+    if ext in CSS_LINE_COMMENT_EXTENSIONS:
+        return strip_c_like(text, keep_lines, line_comments=True, urls=True)
+    if ext == '.json':
+        return text if keep_lines else compact_json(text)
+    return text
+
+
+# -------------------------------------------------------------------
+# Python
+# -------------------------------------------------------------------
+def strip_python(text, keep_lines=False):
+    """
+    Drop comments and docstrings using the tokenize module; blank lines are
+    removed too unless keep_lines is set. Lines inside multi-line strings
+    are left exactly as they are.
+    """
+    removals = []          # ((srow, scol), (erow, ecol)) spans to blank out
+    protected = set()      # rows spanned by a multi-line string (left untouched)
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(text).readline))
+    except (tokenize.TokenError, SyntaxError):
+        return text
+
+    significant = (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE,
+                   tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING)
+    prev_kind = tokenize.NEWLINE  # start of file behaves like a new statement
+    fstring_starts = []  # Python 3.12+ tokenizes f-strings as START/MIDDLE/END
+    for idx, tok in enumerate(tokens):
+        kind = tok.type
+        if kind in _FSTRING_START:
+            fstring_starts.append(tok.start[0])
+        elif kind in _FSTRING_END and fstring_starts:
+            protected.update(range(fstring_starts.pop(), tok.end[0] + 1))
+        if kind == tokenize.COMMENT:
+            if not _is_kept_comment(tok):
+                removals.append((tok.start, tok.end))
+            continue
+        if kind == tokenize.STRING:
+            if prev_kind in (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT) \
+                    and _docstring_removable(tokens, idx):
+                removals.append((tok.start, tok.end))
+            elif tok.end[0] > tok.start[0]:
+                protected.update(range(tok.start[0], tok.end[0] + 1))
+        if kind not in (tokenize.COMMENT, tokenize.NL):
+            prev_kind = kind if kind in significant else tokenize.OP
+
+    lines = text.splitlines(keepends=True)
+    for (srow, scol), (erow, ecol) in reversed(removals):
+        if srow == erow:
+            line = lines[srow - 1]
+            lines[srow - 1] = line[:scol] + line[ecol:]
+        else:
+            lines[srow - 1] = lines[srow - 1][:scol] + "\n"
+            for row in range(srow + 1, erow):
+                lines[row - 1] = "\n"
+            lines[erow - 1] = lines[erow - 1][ecol:]
+
+    out = []
+    for row, line in enumerate(lines, start=1):
+        if row in protected:
+            out.append(line)
+            continue
+        stripped = line.rstrip()
+        if stripped or keep_lines:
+            out.append(stripped + "\n")
+    return "".join(out)
+
+
+def _is_kept_comment(tok):
+    """
+    Shebang, PEP 263 encoding cookie and '# [bundler]' marker comments
+    (e.g. --slice elisions) are kept.
+    """
+    if tok.string.startswith('# [bundler]'):
+        return True
+    row = tok.start[0]
+    if row == 1 and tok.string.startswith('#!'):
+        return True
+    return row <= 2 and 'coding' in tok.string and ('coding:' in tok.string or 'coding=' in tok.string)
+
+
+def _docstring_removable(tokens, idx):
+    """
+    A STRING at statement start is a docstring-like expression statement if
+    the next significant token ends the statement. It can only be dropped if
+    another statement follows in the same block.
+    """
+    j = idx + 1
+    while j < len(tokens) and tokens[j].type == tokenize.COMMENT:
+        j += 1
+    if j >= len(tokens) or tokens[j].type != tokenize.NEWLINE:
+        return False  # e.g. "abc".join(...) or implicit concatenation
+    j += 1
+    while j < len(tokens) and tokens[j].type in (tokenize.NL, tokenize.COMMENT):
+        j += 1
+    if j >= len(tokens):
+        return True
+    # A DEDENT (or end of file) right after means the block would be empty,
+    # unless this is the module level where an empty body is fine.
+    if tokens[j].type in (tokenize.DEDENT, tokenize.ENDMARKER):
+        return tokens[idx].start[1] == 0
+    return True
+
+
+# -------------------------------------------------------------------
+# JS / TS / CSS
+# -------------------------------------------------------------------
+def strip_c_like(text, keep_lines=False, line_comments=True, regexes=False, templates=False, jsx=False,
+                 urls=False):
+    """
+    Remove /* */ (and optionally //) comments, copying string, template and
+    regex literals verbatim. In JSX files '//' only starts a comment at the
+    beginning of a line or after one of ';{}(),=', so URLs in JSX text
+    survive. With urls set (SCSS/LESS), unquoted url(...) tokens are copied
+    verbatim as well.
+    """
+    out = []
+    cur = []          # pieces of the current output line
+    i = 0
+    n = len(text)
+    last_sig = ''     # last significant character written (for regex detection)
+    last_word = ''    # last identifier written (for regex detection)
+
+    def end_line():
+        line = "".join(cur).rstrip()
+        if line or keep_lines:
+            out.append(line + "\n")
+        cur.clear()
+
+    while i < n:
+        c = text[i]
+        if c == '\n':
+            end_line()
+            i += 1
+        elif c == '/' and text.startswith('/*', i):
+            j = text.find('*/', i + 2)
+            j = n if j < 0 else j + 2
+            comment = text[i:j]
+            if comment.startswith('/*!'):
+                cur.append(comment)
+            else:
+                newlines = comment.count('\n')
+                if not newlines:
+                    # One separator replaces the comment and the blanks around
+                    # it; indentation before it at the start of a line is kept.
+                    at_indent = all(piece.isspace() for piece in cur)
+                    if not at_indent:
+                        while cur and cur[-1] in (' ', '\t'):
+                            cur.pop()
+                    while j < n and text[j] in ' \t':
+                        j += 1
+                    if not at_indent and j < n and text[j] not in '\r\n':
+                        cur.append(' ')
+                elif keep_lines:
+                    for _ in range(newlines):
+                        end_line()
+                else:
+                    # Keep one line break so JS automatic semicolon insertion
+                    # sees the same statement boundary.
+                    end_line()
+            i = j
+        elif c == '/' and line_comments and text.startswith('//', i) and (
+                not jsx or _jsx_comment_allowed(cur)):
+            j = text.find('\n', i)
+            i = n if j < 0 else j
+        elif c == '"' or c == "'":
+            j = i + 1
+            while j < n and text[j] != c and text[j] != '\n':
+                j += 2 if text[j] == '\\' else 1
+            j = min(j + 1, n) if j < n and text[j] == c else j
+            cur.append(text[i:j])
+            last_sig, last_word = c, ''
+            i = j
+        elif c == '`' and templates:
+            j = _template_end(text, i + 1)
+            cur.append(text[i:j])
+            last_sig, last_word = '`', ''
+            i = j
+        elif c == '/' and regexes and (last_sig == '' or last_sig in _REGEX_PRECEDERS
+                                       or last_word in _REGEX_KEYWORDS):
+            j = _regex_end(text, i + 1)
+            cur.append(text[i:j])
+            last_sig, last_word = '/', ''
+            i = j
+        elif c in _WORD_CHARS:
+            j = i + 1
+            while j < n and text[j] in _WORD_CHARS:
+                j += 1
+            if urls and text[i:j].lower() == 'url':
+                j = _css_url_end(text, j)
+            cur.append(text[i:j])
+            last_sig, last_word = text[j - 1], text[i:j]
+            i = j
+        else:
+            cur.append(c)
+            if not c.isspace():
+                last_sig, last_word = c, ''
+            i += 1
+    if cur:
+        end_line()
+    result = "".join(out)
+    if not text.endswith("\n") and result.endswith("\n"):
+        result = result[:-1]
+    return result
+
+
+def _css_url_end(text, i):
+    """
+    Index just past the ')' of an unquoted url( ... ) whose '(' is at i, or
+    i itself if there is none on this line (quoted urls are ordinary
+    strings).
+    """
+    if not text.startswith('(', i):
+        return i
+    j = i + 1
+    while j < len(text) and text[j] in ' \t':
+        j += 1
+    if j < len(text) and text[j] in '"\'':
+        return i
+    while j < len(text) and text[j] not in ')\n':
+        j += 2 if text[j] == '\\' else 1
+    return j + 1 if j < len(text) and text[j] == ')' else i
+
+
+def _jsx_comment_allowed(cur):
+    before = "".join(cur).rstrip(' \t')
+    return not before or before[-1] in ';{}(),='
+
+
+def _template_end(text, i):
+    """
+    Index just past the closing backtick of a template literal whose body
+    starts at i (nested ${ ... } expressions and templates included).
+    """
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            return i + 1
+        elif text.startswith('${', i):
+            i += 2
+            depth = 1
+            while i < n and depth:
+                c = text[i]
+                if c == '{':
+                    depth += 1
+                elif c == '}':
+                    depth -= 1
+                elif c == '`':
+                    i = _template_end(text, i + 1) - 1
+                elif c == '"' or c == "'":
+                    j = i + 1
+                    while j < n and text[j] != c and text[j] != '\n':
+                        j += 2 if text[j] == '\\' else 1
+                    i = j
+                i += 1
+        else:
+            i += 1
+    return n
+
+
+def _regex_end(text, i):
+    """
+    Index just past a regex literal (flags included) whose body starts at i.
+    """
+    n = len(text)
+    in_class = False
+    while i < n:
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            return i
+        if in_class:
+            if c == ']':
+                in_class = False
+        elif c == '[':
+            in_class = True
+        elif c == '/':
+            i += 1
+            while i < n and text[i] in _WORD_CHARS:
+                i += 1
+            return i
+        i += 1
+    return n
+
+
+# -------------------------------------------------------------------
+# JSON
+# -------------------------------------------------------------------
+def compact_json(text):
+    """
+    Remove whitespace outside strings. Files with comments (JSONC, e.g.
+    tsconfig.json) are returned unchanged.
+    """
+    out = []
+    i = 0
+    n = len(text)
+    start = 0
+    while i < n:
+        c = text[i]
+        if c == '"':
+            j = i + 1
+            while j < n and text[j] != '"':
+                j += 2 if text[j] == '\\' else 1
+            i = j + 1
+        elif c in ' \t\r\n':
+            out.append(text[start:i])
+            while i < n and text[i] in ' \t\r\n':
+                i += 1
+            start = i
+        elif c == '/':
+            return text
+        else:
+            i += 1
+    out.append(text[start:])
+    result = "".join(out)
+    if text.endswith("\n"):
+        result += "\n"
+    return result
+
+
+# -------------------------------------------------------------------
+# --stats
+# -------------------------------------------------------------------
+class StripStats:
+    """
+    Byte counts of file contents before and after --strip (and --slice),
+    reported by --stats.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def add(self, original, written):
+        self.add_bytes(len(original.encode('utf-8')), len(written.encode('utf-8')))
+
+    def add_bytes(self, bytes_in, bytes_out):
+        """
+        Count a file whose sizes are already known (e.g. streamed JSON).
+        """
+        self.files += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+    def merge(self, other):
+        """
+        Add the counts of another StripStats (e.g. from a concurrently written root).
+        """
+        self.files += other.files
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+
+    def report(self, output_file=None):
+        saved = self.bytes_in - self.bytes_out
+        pct = (100.0 * saved / self.bytes_in) if self.bytes_in else 0.0
+        print(f"Stats: {self.files} files, {self.bytes_in:,} bytes of source -> "
+              f"{self.bytes_out:,} bytes written ({saved:,} bytes / {pct:.1f}% saved)")
+        if output_file and os.path.isfile(output_file):
+            print(f"Stats: output file {output_file} is {os.path.getsize(output_file):,} bytes")
@@ -0,0 +1,267 @@
+# src/unbundle.py
+#
+# Extract files from an app-bundler.py / python_bundler.py output using the
+# sidecar index written with --index-out (see bundle_index.py).
+#
+# The bundle is memory-mapped and only the bytes of the requested files are
+# touched, so pulling one file out of a multi-MB bundle costs about as much
+# as that file:
+#   - plain-text (--no-encode) bundles: each file is a byte range in the bundle
+#   - base64 ZIP bundles: a small read-only file object decodes just the base64
+#     blocks zipfile asks for, so the ZIP's own central directory locates each
+#     member and only that member is decoded and decompressed
+#
+# Usage:
+#   python3 unbundle.py <bundle_file> --list
+#   python3 unbundle.py <bundle_file> <file> [<file> ...]            (contents to stdout)
+#   python3 unbundle.py <bundle_file> [<file> ...] --out-dir DIR     (all files if none named)
+#
+# Options:
+#   --index PATH   index file (default: <bundle_file>.index.json)
+#   --no-verify    skip the sha256 check of extracted files
+#
+# Files are named by their path in the bundle; when the bundle has several
+# roots, prefix the root directory's name (e.g. 'web/src/app.ts').
+
+import io
+import os
+import sys
+import mmap
+import base64
+import hashlib
+import zipfile
+
+from bundle_index import load_index
+
+
+class Base64Region(io.RawIOBase):
+    """
+    Seekable, read-only view of the bytes encoded by a single-line base64
+    region of a buffer (e.g. an mmap). Only the 4-character groups covering
+    each read are decoded.
+    """
+
+    def __init__(self, buf, offset, length):
+        self._buf = buf
+        self._offset = offset
+        self._groups = length // 4
+        padding = 0
+        if length >= 4:
+            tail = bytes(buf[offset + length - 2:offset + length])
+            padding = tail.count(b"=")
+        self._size = self._groups * 3 - padding
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += self._size
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, b):
+        end = min(self._pos + len(b), self._size)
+        if end <= self._pos:
+            return 0
+        first = self._pos // 3
+        last = (end + 2) // 3
+        start = self._offset + 4 * first
+        decoded = base64.b64decode(self._buf[start:self._offset + 4 * last])
+        skip = self._pos - 3 * first
+        n = end - self._pos
+        b[:n] = decoded[skip:skip + n]
+        self._pos = end
+        return n
+
+
+class Bundle:
+    """
+    An indexed bundle: resolves names to index entries and reads their bytes.
+    """
+
+    def __init__(self, bundle_path, index):
+        self.index = index
+        self._file = open(bundle_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size != index.get("bundle_size"):
+            self._file.close()
+            raise ValueError(f"{bundle_path} has changed since its index was written "
+                             f"({size} bytes, index expects {index.get('bundle_size')})")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._zips = {}
+        roots = []
+        for entry in index["entries"]:
+            if entry["root"] not in roots:
+                roots.append(entry["root"])
+        self.multi_root = len(roots) > 1
+
+    def close(self):
+        for zf in self._zips.values():
+            zf.close()
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def name(self, entry):
+        """
+        Name of an entry as shown by --list and accepted on the command line.
+        """
+        if self.multi_root:
+            return os.path.basename(entry["root"]) + "/" + entry["path"]
+        return entry["path"]
+
+    def find(self, requested):
+        """
+        Return the entries for a requested name (exact name first, then the
+        path within any root). Raises KeyError with a message if there's none
+        or the name is ambiguous.
+        """
+        wanted = requested.replace(os.sep, "/")
+        if wanted.startswith("./"):
+            wanted = wanted[2:]
+        matches = [e for e in self.index["entries"] if self.name(e) == wanted]
+        if not matches:
+            matches = [e for e in self.index["entries"] if e["path"] == wanted]
+        if not matches:
+            raise KeyError(f"{requested} is not in the bundle (see --list).")
+        if len(matches) > 1:
+            names = ", ".join(self.name(e) for e in matches)
+            raise KeyError(f"{requested} is ambiguous; use one of: {names}")
+        return matches[0]
+
+    def read(self, entry):
+        if "zip" in entry:
+            zf = self._zips.get(entry["zip"])
+            if zf is None:
+                region = self.index["zips"][entry["zip"]]
+                zf = zipfile.ZipFile(Base64Region(self._map, region["offset"], region["length"]))
+                self._zips[entry["zip"]] = zf
+            return zf.read(entry["path"])
+        return bytes(self._map[entry["offset"]:entry["offset"] + entry["length"]])
+
+
+def safe_output_path(out_dir, name):
+    """
+    Join a bundled path onto out_dir the way zipfile.extract() does: drop
+    leading '/' and any '.'/'..' components, so nothing lands outside out_dir
+    (python_bundler's multi-root paths can start with '../').
+    """
+    parts = [p for p in name.split("/") if p not in ("", ".", "..")]
+    return os.path.join(out_dir, *parts)
+
+
+def main(argv):
+    usage = "Usage: python3 unbundle.py <bundle_file> [--index PATH] [--list] [--out-dir DIR] [--no-verify] [<file> ...]"
+    args = list(argv)
+    index_path = None
+    out_dir = None
+    list_only = False
+    verify = True
+
+    names = []
+    i = 0
+    while i < len(args):
+        item = args[i]
+        if item in ("--index", "--out-dir"):
+            if i + 1 >= len(args):
+                print(f"Error: {item} requires a path.")
+                sys.exit(1)
+            if item == "--index":
+                index_path = args[i + 1]
+            else:
+                out_dir = args[i + 1]
+            i += 2
+            continue
+        if item.startswith("--index="):
+            index_path = item.split("=", 1)[1]
+        elif item.startswith("--out-dir="):
+            out_dir = item.split("=", 1)[1]
+        elif item == "--list":
+            list_only = True
+        elif item == "--no-verify":
+            verify = False
+        elif item.startswith("--"):
+            print(f"Error: unknown option {item}.")
+            print(usage)
+            sys.exit(1)
+        else:
+            names.append(item)
+        i += 1
+
+    if not names:
+        print(usage)
+        sys.exit(1)
+    bundle_path = names.pop(0)
+    if index_path is None:
+        index_path = bundle_path + ".index.json"
+    if not os.path.isfile(bundle_path):
+        print(f"Error: {bundle_path} is not a file.")
+        sys.exit(1)
+    if not os.path.isfile(index_path):
+        print(f"Error: no index found at {index_path}. Re-run the bundler with --index-out {index_path}.")
+        sys.exit(1)
+
+    try:
+        bundle = Bundle(bundle_path, load_index(index_path))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    try:
+        if list_only:
+            for entry in bundle.index["entries"]:
+                kind = "zip" if "zip" in entry else "text"
+                print(f"{entry['length']:>10}  {kind:<4}  {bundle.name(entry)}")
+            return
+
+        if names:
+            try:
+                entries = [bundle.find(n) for n in names]
+            except KeyError as e:
+                print(f"Error: {e.args[0]}")
+                sys.exit(1)
+        elif out_dir is not None:
+            entries = bundle.index["entries"]
+        else:
+            print("Error: name the files to extract, or use --out-dir DIR to extract all of them.")
+            sys.exit(1)
+
+        for entry in entries:
+            try:
+                data = bundle.read(entry)
+            except (KeyError, zipfile.BadZipFile, ValueError) as e:
+                print(f"Error: can't read {bundle.name(entry)} from the bundle: {e}")
+                sys.exit(1)
+            if verify and hashlib.sha256(data).hexdigest() != entry["sha256"]:
+                print(f"Error: {bundle.name(entry)} does not match its sha256 in the index.")
+                sys.exit(1)
+            if out_dir is None:
+                sys.stdout.buffer.write(data)
+                continue
+            target = safe_output_path(out_dir, bundle.name(entry))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(data)
+
+        if out_dir is not None:
+            print(f"Extracted {len(entries)} file(s) from {bundle_path} into {out_dir}.")
+        else:
+            sys.stdout.buffer.flush()
+    finally:
+        bundle.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,130 @@
+# src/warm_cache.py
+#
+# Process-wide caches that stay warm across requests in the bundler daemon
+# (bundler_daemon.py). In a normal one-shot run the caches are disabled and
+# every helper here simply does the work directly.
+#
+# Everything is keyed by path and validated against a fresh os.stat() on
+# each use (mtime, ctime, size and inode), so a changed file or directory
+# is re-read and nothing stale is ever returned:
+#
+#   - read_bytes()/read_text(): file contents, bounded by a byte budget
+#     (least recently used entries are evicted first)
+#   - derived(kind, path, compute): any value computed from one file or
+#     directory -- directory listings (fs_walk), Python import lists
+#     (python_bundler), JS/TS import specifiers (js_imports)
+
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_lock = threading.Lock()
+_contents = None       # OrderedDict path -> (stat_key, bytes), when enabled
+_contents_bytes = 0
+_max_bytes = DEFAULT_MAX_BYTES
+_derived = None        # dict (kind, path) -> (stat_key, value), when enabled
+
+
+def enable(max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Turn the caches on (done once by the daemon at startup).
+    """
+    global _contents, _contents_bytes, _max_bytes, _derived
+    with _lock:
+        _contents = OrderedDict()
+        _contents_bytes = 0
+        _max_bytes = max_bytes
+        _derived = {}
+
+
+def is_enabled():
+    return _derived is not None
+
+
+def stats():
+    """
+    Summary used by `bundler_daemon.py status`.
+    """
+    with _lock:
+        return {
+            "enabled": _derived is not None,
+            "cached_files": len(_contents) if _contents is not None else 0,
+            "cached_bytes": _contents_bytes,
+            "max_bytes": _max_bytes,
+            "derived_entries": len(_derived) if _derived is not None else 0,
+        }
+
+
+def _stat_key(st):
+    return (st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino)
+
+
+def read_bytes(path):
+    """
+    Return (os.stat result, file bytes).
+    """
+    global _contents_bytes
+    if _contents is None:
+        with open(path, "rb") as f:
+            return os.fstat(f.fileno()), f.read()
+
+    st = os.stat(path)
+    key = _stat_key(st)
+    with _lock:
+        hit = _contents.get(path)
+        if hit is not None and hit[0] == key:
+            _contents.move_to_end(path)
+            return st, hit[1]
+
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+
+    if len(data) <= _max_bytes // 4:
+        with _lock:
+            old = _contents.pop(path, None)
+            if old is not None:
+                _contents_bytes -= len(old[1])
+            _contents[path] = (_stat_key(st), data)
+            _contents_bytes += len(data)
+            while _contents_bytes > _max_bytes and _contents:
+                _, (_, evicted) = _contents.popitem(last=False)
+                _contents_bytes -= len(evicted)
+    return st, data
+
+
+def read_text(path, errors="strict"):
+    """
+    Read a UTF-8 text file the way open(path, "r", encoding="utf-8") does,
+    including universal-newline translation.
+    """
+    if _contents is None:
+        with open(path, "r", encoding="utf-8", errors=errors) as f:
+            return f.read()
+    _, data = read_bytes(path)
+    text = data.decode("utf-8", errors)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def derived(kind, path, compute):
+    """
+    Return compute(path), reusing the previous result for (kind, path) while
+    the path's stat is unchanged. If the path can't be stat'ed, compute() is
+    called uncached (and may raise as usual).
+    """
+    if _derived is None:
+        return compute(path)
+    try:
+        key = _stat_key(os.stat(path))
+    except OSError:
+        return compute(path)
+    hit = _derived.get((kind, path))
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    value = compute(path)
+    _derived[(kind, path)] = (key, value)
+    return value
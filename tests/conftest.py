@@ -0,0 +1,9 @@
+# tests/conftest.py
+#
+# The bundler modules live in src/ and import each other by name (the way
+# the scripts run), so put src/ on the path for the tests.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
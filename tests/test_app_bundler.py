@@ -0,0 +1,103 @@
+# tests/test_app_bundler.py
+
+import os
+import subprocess
+import sys
+
+APP_BUNDLER = os.path.join(os.path.dirname(__file__), os.pardir, "src", "app-bundler.py")
+
+
+def bundle(project, *args):
+    out = project / "out.txt"
+    result = subprocess.run([sys.executable, APP_BUNDLER, str(project), str(out), "--no-encode", *args],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return [line[len("## File: "):] for line in out.read_text(encoding="utf-8").splitlines()
+            if line.startswith("## File: ")]
+
+
+def make_project(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "package.json").write_text('{"name": "x"}\n')
+    (tmp_path / "src" / "index.js").write_text(
+        "import logo from './logo.png';\nimport './app.css';\nimport { f } from './lib.cjs';\n")
+    (tmp_path / "src" / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00")
+    (tmp_path / "src" / "app.css").write_text(".a {}\n")
+    (tmp_path / "src" / "lib.cjs").write_text("exports.f = 1;\n")
+    return tmp_path
+
+
+def test_entry_closure_skips_assets(tmp_path):
+    project = make_project(tmp_path)
+    assert bundle(project, "--entry", "./src/index.js") == [
+        "package.json", "src/app.css", "src/index.js", "src/lib.cjs"]
+
+
+def test_entry_closure_follows_extension_list(tmp_path):
+    project = make_project(tmp_path)
+    assert bundle(project, "--entry", "src/index.js", "--extension-list", "js") == [
+        "package.json", "src/index.js"]
+
+
+def test_file_subset_takes_precedence_over_entry(tmp_path):
+    project = make_project(tmp_path)
+    subset = tmp_path / "subset.txt"
+    subset.write_text("src/app.css\n")
+    assert bundle(project, "--entry", "src/index.js", "--file-subset", str(subset)) == ["src/app.css"]
+
+
+def test_output_is_utf8_whatever_the_locale(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.js").write_text('export const s = "caf\xe9 ☕";\n', encoding="utf-8")
+    out = tmp_path / "out.txt"
+    env = dict(os.environ, LC_ALL="C", PYTHONCOERCECLOCALE="0", PYTHONUTF8="0")
+    result = subprocess.run([sys.executable, APP_BUNDLER, str(tmp_path), str(out), "--no-encode"],
+                            capture_output=True, text=True, env=env)
+    assert result.returncode == 0, result.stdout + result.stderr
+    text = out.read_text(encoding="utf-8")
+    assert '"caf\xe9 ☕"' in text and "└── src" in text
+
+
+def make_roots(tmp_path, count=5):
+    roots = []
+    for n in range(count):
+        root = tmp_path / f"root{n}"
+        (root / "src" / "lib").mkdir(parents=True)
+        (root / "package.json").write_text(f'{{"name": "root{n}"}}\n')
+        for k in range(n + 2):
+            (root / "src" / f"m{k}.js").write_text(f"// module {k}\nexport const v{k} = {n * k}; /* x */\n")
+        (root / "src" / "lib" / "style.css").write_text(f".r{n} {{ color: red; }}\n")
+        roots.append(root.name)
+    return roots
+
+
+def test_root_workers_output_is_byte_identical(tmp_path):
+    roots = make_roots(tmp_path)
+    dirs = [roots[0], roots[1], "--tree-only", roots[2], roots[3], "--tree-only", roots[4]]
+    for extra in ([], ["--no-encode"], ["--strip", "--stats", "--no-encode"]):
+        outputs = []
+        for workers in ("1", "4"):
+            out = f"out{workers}.txt"
+            result = subprocess.run([sys.executable, APP_BUNDLER, out, "--root-workers", workers,
+                                     "--index-out", out + ".idx", *extra, *dirs],
+                                    capture_output=True, text=True, cwd=str(tmp_path))
+            assert result.returncode == 0, result.stdout + result.stderr
+            index = (tmp_path / (out + ".idx")).read_text(encoding="utf-8").replace(out, "OUT")
+            stdout = result.stdout.replace(out, "OUT")
+            outputs.append(((tmp_path / out).read_bytes(), index, stdout))
+        assert outputs[0] == outputs[1]
+
+
+def test_failing_root_leaves_existing_output_unchanged(tmp_path):
+    roots = make_roots(tmp_path, 3)
+    # A symlink loop can be listed but not read, so the root fails while being written.
+    os.symlink("loop.js", tmp_path / roots[1] / "src" / "loop.js")
+    out = tmp_path / "out.txt"
+    out.write_bytes(b"previous bundle\n")
+    for workers in ("1", "4"):
+        result = subprocess.run([sys.executable, APP_BUNDLER, str(out), "--root-workers", workers,
+                                 *[str(tmp_path / r) for r in roots]],
+                                capture_output=True, text=True)
+        assert result.returncode == 1
+        assert result.stdout.startswith("Error: ") and "loop.js" in result.stdout
+        assert out.read_bytes() == b"previous bundle\n"
@@ -0,0 +1,96 @@
+# tests/test_budget.py
+
+import os
+
+import pytest
+
+from budget import BYTES_PER_TOKEN, fit_budget, parse_budget, rank_files
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("150000", 150000),
+    ("150k", 150000),
+    ("150K", 150000),
+    ("1.5k", 1500),
+    ("2m", 2000000),
+    ("10 kb", 10000),
+    ("300bytes", 300),
+    (" 64k ", 64000),
+    ("32000tok", 32000 * BYTES_PER_TOKEN),
+    ("32ktok", 32000 * BYTES_PER_TOKEN),
+    ("1mtokens", 1000000 * BYTES_PER_TOKEN),
+    ("8kt", 8000 * BYTES_PER_TOKEN),
+])
+def test_parse_budget(value, expected):
+    assert parse_budget(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "k", "abc", "-5", "10g", "5kk", "1.k", "10 tok s"])
+def test_parse_budget_errors(value):
+    with pytest.raises(ValueError) as e:
+        parse_budget(value, "--json-threshold")
+    assert str(e.value) == f"--json-threshold expects a size like 150k or 32ktok (got '{value}')"
+
+
+def test_rank_by_distance_then_centrality_recency_and_size():
+    paths = ["entry", "near", "far", "unreached"]
+    sizes = dict.fromkeys(paths, 100)
+    mtimes = {"entry": 1, "near": 2, "far": 3, "unreached": 4}
+    distances = {"entry": 0, "near": 1, "far": 2}
+    assert rank_files(paths, distances, sizes=sizes, mtimes=mtimes) == ["entry", "near", "far", "unreached"]
+
+    # Without entry points: imported-by-many first, then the most recent, then the smaller.
+    paths = ["old_hub", "new", "old_small", "old_big", "a", "b"]
+    sizes = {"old_hub": 500, "new": 500, "old_small": 10, "old_big": 5000, "a": 500, "b": 500}
+    mtimes = {"old_hub": 1, "new": 9, "old_small": 1, "old_big": 1, "a": 5, "b": 5}
+    edges = {"a": ["old_hub"], "b": ["old_hub", "old_hub"], "new": ["old_hub", "missing"]}
+    ranked = rank_files(paths, edges=edges, sizes=sizes, mtimes=mtimes)
+    assert ranked[0] == "old_hub"
+    assert ranked[1] == "new"
+    assert ranked.index("old_small") < ranked.index("old_big")
+
+
+def test_ties_break_by_size_then_path():
+    paths = ["b", "a", "c", "d"]
+    sizes = {"a": 100, "b": 100, "c": 100, "d": 100}
+    mtimes = dict.fromkeys(paths, 7)
+    assert rank_files(paths, sizes=sizes, mtimes=mtimes) == ["a", "b", "c", "d"]
+
+    # Equal scores with distances too (same distance, no edges, same mtime and size).
+    distances = dict.fromkeys(paths, 1)
+    assert rank_files(paths, distances, sizes=sizes, mtimes=mtimes) == ["a", "b", "c", "d"]
+    assert rank_files([], distances) == []
+
+
+def make_files(tmp_path, sizes):
+    paths = {}
+    for n, (name, size) in enumerate(sizes.items()):
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        os.utime(path, (1000 + n, 1000 + n))
+        paths[name] = str(path)
+    return paths
+
+
+def test_fit_keeps_smaller_files_after_skipping_a_big_one(tmp_path):
+    paths = make_files(tmp_path, {"entry.py": 100, "big.py": 1000, "small.py": 50, "tiny.py": 10})
+    distances = {paths["entry.py"]: 0, paths["big.py"]: 1, paths["small.py"]: 2, paths["tiny.py"]: 3}
+    fit = fit_budget(paths.values(), 200, distances, overhead=lambda p: 10)
+    assert fit.kept == {paths["entry.py"], paths["small.py"], paths["tiny.py"]}
+    assert fit.omitted == [paths["big.py"]]
+    assert fit.used == 110 + 60 + 20
+    assert fit.note() == ("Note: --budget kept the contents of 3 of 4 files; "
+                          "the other 1 appear in the directory tree only.")
+
+
+def test_entry_files_are_always_kept(tmp_path):
+    paths = make_files(tmp_path, {"main.py": 5000, "cli.py": 3000, "util.py": 10})
+    distances = {paths["main.py"]: 0, paths["cli.py"]: 0, paths["util.py"]: 1}
+    fit = fit_budget(paths.values(), 100, distances)
+    assert fit.kept == {paths["main.py"], paths["cli.py"]}
+    assert fit.omitted == [paths["util.py"]]
+    assert fit.used == 8000
+
+    # Without entry points nothing is forced in.
+    fit = fit_budget(paths.values(), 100)
+    assert fit.kept == {paths["util.py"]}
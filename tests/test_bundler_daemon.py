@@ -0,0 +1,99 @@
+# tests/test_bundler_daemon.py
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from bundler_client import SOCKET_ENV, daemon_request
+
+SRC = os.path.join(os.path.dirname(__file__), os.pardir, "src")
+
+
+@pytest.fixture
+def daemon():
+    # Unix socket paths are limited to ~100 bytes, so don't use tmp_path.
+    sock_dir = tempfile.mkdtemp(prefix="bd-")
+    socket_path = os.path.join(sock_dir, "d.sock")
+    proc = subprocess.Popen([sys.executable, os.path.join(SRC, "bundler_daemon.py"), "serve",
+                             "--socket", socket_path, "--cache-mb", "16"],
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        deadline = time.time() + 10
+        while not os.path.exists(socket_path):
+            assert proc.poll() is None and time.time() < deadline, proc.stdout.read()
+            time.sleep(0.05)
+        yield socket_path
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        shutil.rmtree(sock_dir, ignore_errors=True)
+
+
+def run(tool, args, cwd, socket_path=None):
+    env = dict(os.environ)
+    env.pop(SOCKET_ENV, None)
+    if socket_path is not None:
+        env[SOCKET_ENV] = socket_path
+    return subprocess.run([sys.executable, os.path.join(SRC, tool), *args],
+                          capture_output=True, text=True, cwd=str(cwd), env=env)
+
+
+def write(root, rel, text):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_forwarded_runs_match_standalone(daemon, tmp_path):
+    write(tmp_path, "web/package.json", '{"name": "web"}\n')
+    write(tmp_path, "web/src/app.js", "import './b.js';\n// café\n")
+    write(tmp_path, "web/src/b.js", "export const b = 1;\n")
+    for args in (["web", "{out}"], ["web", "{out}", "--no-encode", "--strip", "--stats"]):
+        results = []
+        for name, socket_path in (("standalone.txt", None), ("daemon.txt", daemon)):
+            result = run("app-bundler.py", [a.format(out=name) for a in args], tmp_path, socket_path)
+            assert result.returncode == 0, result.stdout + result.stderr
+            results.append(((tmp_path / name).read_bytes(), result.stdout.replace(name, "OUT"), result.stderr))
+        assert results[0] == results[1]
+    assert daemon_request(daemon, {"cmd": "status"}, timeout=5)["requests"] == 2
+
+
+def test_changed_files_are_not_served_from_cache(daemon, tmp_path):
+    write(tmp_path, "a.py", "A = 1\n")
+    write(tmp_path, "b.py", "B = 2\n")
+    main = write(tmp_path, "main.py", "import a\n")
+    args = ["--no-encode", "main.py", "out.txt"]
+
+    assert run("python_bundler.py", args, tmp_path, daemon).returncode == 0
+    first = (tmp_path / "out.txt").read_text(encoding="utf-8")
+    assert "A = 1" in first and "B = 2" not in first
+
+    # Same size, later mtime: both the file contents and its parsed imports must be refreshed.
+    st = main.stat()
+    main.write_text("import b\n", encoding="utf-8")
+    os.utime(main, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert run("python_bundler.py", args, tmp_path, daemon).returncode == 0
+    second = (tmp_path / "out.txt").read_text(encoding="utf-8")
+    assert "import b" in second and "B = 2" in second and "A = 1" not in second
+
+    assert run("python_bundler.py", args, tmp_path).returncode == 0
+    assert (tmp_path / "out.txt").read_text(encoding="utf-8") == second
+
+
+def test_client_falls_back_to_standalone(tmp_path):
+    write(tmp_path, "main.py", "print(1)\n")
+    missing = str(tmp_path / "no-daemon.sock")
+    result = run("python_bundler.py", ["--no-encode", "main.py", "out.txt"], tmp_path, missing)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stderr == f"Note: no bundler daemon answering on {missing}; running standalone.\n"
+    assert "print(1)" in (tmp_path / "out.txt").read_text(encoding="utf-8")
+
+    result = run("bundler_client.py", ["python_bundler", "main.py", "out.txt"], tmp_path, missing)
+    assert result.returncode == 1
+    assert result.stdout.startswith(f"Error: no bundler daemon is running on {missing}.")
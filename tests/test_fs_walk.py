@@ -0,0 +1,79 @@
+# tests/test_fs_walk.py
+
+import errno
+import os
+
+import pytest
+
+import fs_walk
+from fs_walk import walk_files
+
+
+def make_tree(root):
+    for rel in ["a.py", "b/c.py", "b/d/e.txt", "b/d/f/g.js", "node_modules/x/index.js",
+                "src/node_modules/y.js", "src/app.ts", "z/.hidden", "empty_sibling/k"]:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+    (root / "empty").mkdir()
+    os.symlink("a.py", root / "link_to_file.py")
+    os.symlink("b", root / "link_to_dir")
+    os.symlink("missing", root / "dangling")
+    return str(root)
+
+
+def os_walk_files(top, prune=None):
+    found = []
+    for dirpath, dirnames, filenames in os.walk(top):
+        if prune is not None:
+            dirnames[:] = [d for d in dirnames if not prune(dirpath, d)]
+        found.extend(os.path.join(dirpath, f) for f in filenames)
+    return sorted(found)
+
+
+def prune_node_modules(parent, name):
+    return name == "node_modules"
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("prune", [None, prune_node_modules])
+def test_matches_os_walk(tmp_path, workers, prune):
+    top = make_tree(tmp_path)
+    assert walk_files(top, workers, prune_dir=prune) == os_walk_files(top, prune)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_keep_file(tmp_path, workers):
+    top = make_tree(tmp_path)
+    expected = [p for p in os_walk_files(top) if p.endswith(".py")]
+    assert walk_files(top, workers, keep_file=lambda name: name.endswith(".py")) == expected
+
+
+class _FailingScandir:
+    """
+    os.scandir() stand-in that raises after yielding its first entry.
+    """
+
+    def __init__(self, it):
+        self._it = it
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._it.close()
+
+    def __iter__(self):
+        yield next(self._it)
+        raise OSError(errno.ESTALE, "Stale file handle")
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_directory_failing_mid_scan_is_skipped(tmp_path, monkeypatch, workers):
+    top = make_tree(tmp_path)
+    bad = os.path.join(top, "b", "d")
+    expected = [p for p in os_walk_files(top) if not p.startswith(bad + os.sep)]
+    real_scandir = os.scandir
+    monkeypatch.setattr(fs_walk.os, "scandir",
+                        lambda path: _FailingScandir(real_scandir(path)) if path == bad else real_scandir(path))
+    assert walk_files(top, workers) == expected
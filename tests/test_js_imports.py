@@ -0,0 +1,137 @@
+# tests/test_js_imports.py
+
+import json
+import os
+
+import pytest
+
+from js_imports import JsImportGraph, scan_specifiers
+
+
+@pytest.mark.parametrize("src, expected", [
+    # division after numbers, ')' and identifiers
+    ("const r = 10 / 2; import D from './d';\n", ["./d"]),
+    ("x = 2 / n; require('./a')\n", ["./a"]),
+    ("x = 1e-3 / 2 / .5 / 0x1F / 1_000 / 10n; require('./a')\n", ["./a"]),
+    ("const r = (a) / 2 / b; require('./a')\n", ["./a"]),
+    ("const r = total / count; import('./a')\n", ["./a"]),
+    ("const r = arr[0] / 2; require('./a')\n", ["./a"]),
+    # regex literals after return, '(' and '='
+    ("function f(s) { return /'/.test(s); }\nrequire('./a')\n", ["./a"]),
+    ("s.replace(/\"/g, ''); require('./a')\n", ["./a"]),
+    ("const re = /import x from '.\\/y'/; require('./a')\n", ["./a"]),
+    ("const re = /[/'\"]/g; require('./a')\n", ["./a"]),
+])
+def test_division_and_regex(src, expected):
+    assert scan_specifiers(src) == expected
+
+
+def test_jsx_text_with_quotes():
+    src = ("import React from 'react';\n"
+           "export const A = () => <p>Don't stop</p>;\n"
+           "import B from './b';\n")
+    assert scan_specifiers(src) == ["react", "./b"]
+
+
+def test_template_literals_and_comments():
+    src = ("const s = `import x from './no' ${ `nested ${'./no2'}` } require('./no3')`;\n"
+           "// import y from './no4'\n"
+           "/* require('./no5') */\n"
+           "const t = `${a}`; import z from './z';\n")
+    assert scan_specifiers(src) == ["./z"]
+
+
+def test_import_forms():
+    src = ("import a from './a';\n"
+           "import { b, c as d } from \"./b\";\n"
+           "import * as e from './e';\n"
+           "import type { F } from './f';\n"
+           "import './side-effect.css';\n"
+           "import g = require('./g');\n"
+           "export * from './h';\n"
+           "export { i } from './i';\n"
+           "export type { J } from './j';\n"
+           "export const k = 1;\n"
+           "const l = await import('./l');\n"
+           "const m = require('./m');\n"
+           "obj.require('./not-a-require');\n"
+           "require('./a');\n")
+    assert scan_specifiers(src) == ["./a", "./b", "./e", "./f", "./side-effect.css", "./g",
+                                    "./h", "./i", "./j", "./l", "./m"]
+
+
+def write(root, rel, text=""):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def make_project(tmp_path):
+    write(tmp_path, "tsconfig.json", """{
+        // comments and trailing commas are allowed here
+        "compilerOptions": {
+            "baseUrl": ".",
+            "paths": {"@/*": ["src/*"], "@lib": ["lib/main"],},
+        },
+    }""")
+    write(tmp_path, "src/index.ts",
+          "import a from './a.js';\n"          # TS sibling of a .js specifier
+          "import b from './b';\n"             # extension probing
+          "import c from './c';\n"             # directory index file
+          "import d from '@/d';\n"             # paths wildcard
+          "import lib from '@lib';\n"          # exact paths entry
+          "import e from 'src/e';\n"           # relative to baseUrl
+          "import p from './pkg';\n"           # package.json "main"
+          "import './style.css';\n"
+          "import React from 'react';\n"       # node_modules: not followed
+          "import missing from './missing';\n")
+    write(tmp_path, "src/a.ts", "import deep from './deep/x';\n")
+    write(tmp_path, "src/deep/x.tsx", "export default 1;\n")
+    write(tmp_path, "src/b.jsx", "")
+    write(tmp_path, "src/c/index.ts", "")
+    write(tmp_path, "src/d.mjs", "")
+    write(tmp_path, "lib/main.ts", "")
+    write(tmp_path, "src/e.js", "")
+    write(tmp_path, "src/pkg/package.json", '{"main": "entry"}')
+    write(tmp_path, "src/pkg/entry.js", "")
+    write(tmp_path, "src/style.css", "")
+    write(tmp_path, "src/unused.ts", "")
+    write(tmp_path, "node_modules/react/index.js", "")
+    return tmp_path
+
+
+def test_resolved_closure(tmp_path):
+    project = make_project(tmp_path)
+    graph = JsImportGraph(str(project))
+    distances = graph.closure([str(project / "src" / "index.ts")])
+    rel = {os.path.relpath(p, str(project)).replace(os.sep, "/"): d for p, d in distances.items()}
+    assert rel == {
+        "src/index.ts": 0,
+        "src/a.ts": 1, "src/b.jsx": 1, "src/c/index.ts": 1, "src/d.mjs": 1,
+        "lib/main.ts": 1, "src/e.js": 1, "src/pkg/entry.js": 1, "src/style.css": 1,
+        "src/deep/x.tsx": 2,
+    }
+
+
+def test_scan_cache_is_validated_by_mtime_and_size(tmp_path):
+    project = make_project(tmp_path)
+    entry = str(project / "src" / "a.ts")
+    cache = str(tmp_path / "cache.json")
+    graph = JsImportGraph(str(project), cache_path=cache)
+    assert graph.specifiers(entry) == ["./deep/x"]
+    graph.save_cache()
+
+    # A matching cache entry is used as-is, without rescanning the file.
+    with open(cache, encoding="utf-8") as f:
+        data = json.load(f)
+    data["files"][entry][2] = ["./from-cache"]
+    with open(cache, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    assert JsImportGraph(str(project), cache_path=cache).specifiers(entry) == ["./from-cache"]
+
+    # Once the file changes, it is scanned again.
+    write(project, "src/a.ts", "import b from './b';\n")
+    st = os.stat(entry)
+    os.utime(entry, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert JsImportGraph(str(project), cache_path=cache).specifiers(entry) == ["./b"]
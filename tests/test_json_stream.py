@@ -0,0 +1,109 @@
+# tests/test_json_stream.py
+
+import io
+import json
+
+import pytest
+
+import json_stream
+from json_stream import iter_tokens, json_action, minify_stream, summarize_stream, write_json
+
+DOCUMENT = {
+    "text": "quote \" backslash \\ slash \\/ unicode é☃ tab\t newline\n",
+    "escapes": "\\\\\\\"\\",
+    "numbers": [0, -1, 3.25, -0.5e-3, 1E+21, 123456789012345678901234567890],
+    "literals": [True, False, None],
+    "nested": {"": {"a b": [[], {}, [[1]]]}, "k": "v"},
+}
+
+
+def minify(text, chunk_size=json_stream.CHUNK_SIZE):
+    out = []
+    minify_stream(io.StringIO(text), out.append, chunk_size)
+    return "".join(out)
+
+
+def summarize(text, **kwargs):
+    out = []
+    summarize_stream(io.StringIO(text), out.append, **kwargs)
+    return "".join(out)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, json_stream.CHUNK_SIZE])
+def test_minify_round_trips_across_chunk_boundaries(chunk_size):
+    text = json.dumps(DOCUMENT, indent=2, ensure_ascii=False)
+    minified = minify(text, chunk_size)
+    assert json.loads(minified) == DOCUMENT
+    assert minified == json.dumps(DOCUMENT, separators=(",", ":"), ensure_ascii=False)
+
+
+def test_tokens_are_not_split_by_chunks():
+    text = '[-12.5e+3, "a\\"b\\\\", true, null]'
+    expected = [(kind, tok) for kind, tok, _, _ in iter_tokens(io.StringIO(text))]
+    assert [(kind, tok) for kind, tok, _, _ in iter_tokens(io.StringIO(text), chunk_size=1)] == expected
+    assert expected == [("[", "["), ("number", "-12.5e+3"), (",", ","), ("string", '"a\\"b\\\\"'),
+                        (",", ","), ("literal", "true"), (",", ","), ("literal", "null"), ("]", "]")]
+
+
+def test_long_strings_come_in_pieces(monkeypatch):
+    monkeypatch.setattr(json_stream, "LONG_STRING", 4)
+    text = '{"k": "' + "ab\\\"cd\\\\" * 20 + '"}'
+    pieces = [tok for tok in iter_tokens(io.StringIO(text), chunk_size=3) if tok[0] == "string"]
+    assert len(pieces) > 2
+    assert all(more for _, _, more, _ in pieces[1:-1]) and not pieces[-1][2]
+    assert minify(text, chunk_size=3) == text.replace(" ", "")
+    assert json.loads(minify(text, chunk_size=3)) == json.loads(text)
+
+
+def test_comments_are_dropped():
+    text = '// header\n{"a": /* inline */ 1, "url": "http://x//y"} // trailing'
+    assert minify(text, chunk_size=2) == '{"a":1,"url":"http://x//y"}'
+
+
+def test_non_json_is_passed_through():
+    text = '{"a": 1} garbage /x 1 2\n'
+    minified = minify(text, chunk_size=1)
+    assert minified.replace(" ", "") == "".join(text.split())
+    assert minify("1 2 3") == "1 2 3"
+    assert minify('{"open": "unterminated') == '{"open":"unterminated'
+
+
+def test_summary_of_nested_arrays_and_objects():
+    text = '{"a": [1, 2, {"b": null}], "odd key": {"c": [[true], []]}, "s": "x"}'
+    assert summarize(text, file_size=100, threshold=10, chunk_size=1) == (
+        "JSON structure summary (streamed; file is 100 bytes, above the 10-byte --json-threshold):\n"
+        "path  types  occurrences  [array lengths]  [sample values]\n"
+        "$  object  x1\n"
+        "$.a  array  x1  length 3\n"
+        "$.a[]  number|object  x3  e.g. 1, 2\n"
+        "$.a[].b  null  x1  e.g. null\n"
+        '$["odd key"]  object  x1\n'
+        '$["odd key"].c  array  x1  length 2\n'
+        '$["odd key"].c[]  array  x2  lengths 0..1 (avg 0.5)\n'
+        '$["odd key"].c[][]  boolean  x1  e.g. true\n'
+        '$.s  string  x1  e.g. "x"\n')
+
+
+def test_summary_reports_where_json_stops():
+    assert summarize("[1, 2").endswith(
+        "$[]  number  x2  e.g. 1, 2\n"
+        "Note: unexpected end of file; the summary covers the file up to that point.\n")
+    assert summarize('{"a": 1} oops').endswith(
+        "Note: not valid JSON at character 9; the summary covers the file up to that point.\n")
+
+
+def test_threshold_switches_between_minify_and_summary(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"a": [1, 2]}\n', encoding="utf-8")
+    size = path.stat().st_size
+    assert json_action(size, "summary", threshold=size) == "minify"
+    assert json_action(size + 1, "summary", threshold=size) == "summary"
+    assert json_action(10 ** 9, "minify", threshold=1) == "minify"
+
+    out = []
+    assert write_json(str(path), "summary", out.append, threshold=size) == "minify"
+    assert "".join(out) == '{"a":[1,2]}'
+    out = []
+    assert write_json(str(path), "summary", out.append, threshold=size - 1) == "summary"
+    assert "".join(out).startswith(f"JSON structure summary (streamed; file is {size} bytes, "
+                                   f"above the {size - 1}-byte --json-threshold):\n")
@@ -0,0 +1,107 @@
+# tests/test_py_slice.py
+
+import os
+import subprocess
+import sys
+import textwrap
+
+from py_slice import ModuleSlicer
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(textwrap.dedent(text).lstrip("\n"), encoding="utf-8")
+    return str(path)
+
+
+def slice_project(tmp_path, entry, modules):
+    files = {os.path.abspath(entry)} | {os.path.abspath(m) for m in modules}
+    slicer = ModuleSlicer()
+    slicer.add_entry(entry, str(tmp_path), files)
+    return slicer
+
+
+def run_sliced(tmp_path, slicer, entry, modules):
+    out = tmp_path / "sliced"
+    out.mkdir()
+    for path in [entry] + modules:
+        (out / os.path.basename(path)).write_text(slicer.render(os.path.abspath(path)), encoding="utf-8")
+    return subprocess.run([sys.executable, str(out / os.path.basename(entry))],
+                          capture_output=True, text=True, cwd=str(out))
+
+
+def test_kept_statement_sharing_a_line_with_an_elided_one(tmp_path):
+    util2 = write(tmp_path, "util2.py", """
+        a = 1; b = 2
+        def unused():
+            return 3
+    """)
+    entry = write(tmp_path, "main.py", """
+        from util2 import b
+        print(b)
+    """)
+    slicer = slice_project(tmp_path, entry, [util2])
+    rendered = slicer.render(util2)
+    assert "a = 1; b = 2\n" in rendered
+    assert "def unused():" not in rendered
+    result = run_sliced(tmp_path, slicer, entry, [util2])
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "2\n"
+
+
+def test_setup_statements_that_bind_nothing_are_kept(tmp_path):
+    registry = write(tmp_path, "registry.py", """
+        REG = {}
+        class C:
+            pass
+        def f():
+            return REG["k"]() + C.x
+        def g():
+            return 40
+        def unrelated():
+            return 0
+        REG["k"] = g
+        C.x = 2
+    """)
+    entry = write(tmp_path, "main.py", """
+        from registry import f
+        print(f())
+    """)
+    slicer = slice_project(tmp_path, entry, [registry])
+    rendered = slicer.render(registry)
+    assert 'REG["k"] = g' in rendered and "C.x = 2" in rendered
+    assert "def unrelated():" not in rendered
+    result = run_sliced(tmp_path, slicer, entry, [registry])
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "42\n"
+
+
+def test_import_inside_a_function_is_not_a_module_level_binding(tmp_path):
+    helper = write(tmp_path, "helper.py", """
+        def value():
+            return 7
+        def unused():
+            return 0
+    """)
+    util = write(tmp_path, "util.py", """
+        def g():
+            import helper
+            return helper.value()
+        def lazy():
+            import json
+            return json.dumps([1])
+        def h():
+            return json.dumps([2])
+        import json
+    """)
+    entry = write(tmp_path, "main.py", """
+        from util import g, h
+        print(g(), h())
+    """)
+    slicer = slice_project(tmp_path, entry, [util, helper])
+    rendered = slicer.render(util)
+    assert "def lazy():" not in rendered
+    assert "def unused():" not in slicer.render(helper)
+    result = run_sliced(tmp_path, slicer, entry, [util, helper])
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "7 [2]\n"
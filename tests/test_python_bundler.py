@@ -0,0 +1,59 @@
+# tests/test_python_bundler.py
+
+import json
+import os
+import subprocess
+import sys
+import zipfile
+
+from bundle_index import member_record
+from python_bundler import zip_files
+from source_store import SourceStore
+from source_strip import StripStats
+
+PYTHON_BUNDLER = os.path.join(os.path.dirname(__file__), os.pardir, "src", "python_bundler.py")
+
+
+def test_transformed_files_keep_their_declared_encoding(tmp_path):
+    source = '# -*- coding: latin-1 -*-\n# comment\nNAME = "caf\xe9"\n'.encode("latin-1")
+    path = tmp_path / "main.py"
+    path.write_bytes(source)
+    zip_path = tmp_path / "out.zip"
+    members = []
+    zip_files([str(path)], str(zip_path), str(tmp_path), strip_mode="all", stats=StripStats(),
+              members=members, store=SourceStore())
+    with zipfile.ZipFile(zip_path) as zf:
+        data = zf.read("main.py")
+    assert data == '# -*- coding: latin-1 -*-\nNAME = "caf\xe9"\n'.encode("latin-1")
+    namespace = {}
+    exec(compile(data, "main.py", "exec"), namespace)
+    assert namespace["NAME"] == "caf\xe9"
+    assert members == [member_record("main.py", data)]
+
+
+def test_graph_records_local_package_imports(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "util.py").write_text("X = 1\n")
+    (tmp_path / "helpers.py").write_text("Y = 2\n")
+    (tmp_path / "main.py").write_text("from pkg import util\nimport helpers\nimport os\nimport requests\n")
+    for name in ("graph.json", "graph.dot"):
+        result = subprocess.run([sys.executable, PYTHON_BUNDLER, "--no-encode", "--graph-out", name,
+                                 "main.py", "out.txt"], capture_output=True, text=True, cwd=str(tmp_path))
+        assert result.returncode == 0, result.stdout + result.stderr
+
+    graph = json.loads((tmp_path / "graph.json").read_text(encoding="utf-8"))
+    assert [(e["from"], e["to"], e["kind"], e["module"], e["line"]) for e in graph["edges"]] == [
+        ("main.py", "pkg/__init__.py", "from", "pkg", 1),
+        ("main.py", "helpers.py", "absolute", "helpers", 2),
+    ]
+    assert [(u["module"], u["reason"]) for u in graph["unresolved"]] == [
+        ("os", "stdlib"), ("requests", "not found locally")]
+    nodes = {n["path"]: n["source"] for n in graph["nodes"]}
+    assert nodes["pkg/__init__.py"] == "package __init__"
+
+    dot = (tmp_path / "graph.dot").read_text(encoding="utf-8")
+    assert '"main.py" -> "pkg/__init__.py" [style=solid, tooltip="from: pkg"];' in dot
+    assert '"main.py" -> "helpers.py" [style=solid, tooltip="absolute: helpers"];' in dot
+    assert "//   main.py: requests (absolute, line 4, not found locally)" in dot
+    assert "main.py: pkg " not in dot
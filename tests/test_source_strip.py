@@ -0,0 +1,40 @@
+# tests/test_source_strip.py
+
+import pytest
+
+from source_strip import strip_source
+
+
+@pytest.mark.parametrize("name", ["a.scss", "a.less"])
+def test_url_with_double_slash_is_not_a_line_comment(name):
+    text = (".a { background: url(http://x.com/a.png); } // c\n"
+            ".b { background: url(//cdn.example.com/b.png) no-repeat; } // d\n"
+            ".c { background: url( //cdn.example.com/c.png ); }\n"
+            ".d { background: url(\"//cdn.example.com/d.png\"); } // e\n")
+    assert strip_source(text, name) == (
+        ".a { background: url(http://x.com/a.png); }\n"
+        ".b { background: url(//cdn.example.com/b.png) no-repeat; }\n"
+        ".c { background: url( //cdn.example.com/c.png ); }\n"
+        ".d { background: url(\"//cdn.example.com/d.png\"); }\n")
+
+
+@pytest.mark.parametrize("name", ["a.scss", "a.less"])
+def test_line_comments_are_still_removed(name):
+    text = "// header\n$w: 10px; // width\n.a { width: $w; }\n"
+    assert strip_source(text, name) == "$w: 10px;\n.a { width: $w; }\n"
+    assert strip_source(text, name, keep_lines=True) == "\n$w: 10px;\n.a { width: $w; }\n"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("const r = (a) / 2 / b; /* c */ x();\n", "const r = (a) / 2 / b; x();\n"),
+    ("a/* c */b\n", "a b\n"),
+    ("f(1, /* c */ 2);\n", "f(1, 2);\n"),
+    ("x();   /* c */   \n", "x();\n"),
+    ("/* a */ /* b */ y();\n", "y();\n"),
+    ("    /* c */ x();\n", "    x();\n"),
+    ("z  /*! license */  w\n", "z  /*! license */  w\n"),
+])
+@pytest.mark.parametrize("keep_lines", [False, True])
+def test_removed_block_comment_leaves_one_separator(text, expected, keep_lines):
+    assert strip_source(text, "a.js", keep_lines=keep_lines) == expected
+    assert strip_source(text, "a.css", keep_lines=keep_lines) == expected
@@ -0,0 +1,113 @@
+# tests/test_unbundle.py
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from bundle_index import load_index
+from source_strip import strip_source
+from unbundle import Bundle
+
+SRC = os.path.join(os.path.dirname(__file__), os.pardir, "src")
+
+
+def run(tool, *args, cwd):
+    result = subprocess.run([sys.executable, os.path.join(SRC, tool), *args],
+                            capture_output=True, text=True, cwd=str(cwd))
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+def write(root, rel, text):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def extract_all(bundle_path, index_path):
+    bundle = Bundle(str(bundle_path), load_index(str(index_path)))
+    try:
+        return {bundle.name(e): bundle.read(e) for e in bundle.index["entries"]}
+    finally:
+        bundle.close()
+
+
+def expected(root, names, strip):
+    """
+    name -> bytes as bundled: the file itself, or its --strip output.
+    """
+    result = {}
+    for name, rel in names.items():
+        text = (root / rel).read_text(encoding="utf-8")
+        result[name] = (strip_source(text, rel) if strip else text).encode("utf-8")
+    return result
+
+
+@pytest.fixture
+def python_project(tmp_path):
+    write(tmp_path, "app/main.py", "import pkg.util\nimport helper  # lib\n\nprint(pkg.util.X, helper.Y)\n")
+    write(tmp_path, "app/pkg/__init__.py", "")
+    write(tmp_path, "app/pkg/util.py", '"""Utilities."""\n\nX = 1  # one\n')
+    write(tmp_path, "lib/helper.py", '# café\nY = "é☃"\n')
+    return tmp_path
+
+
+@pytest.mark.parametrize("encode", [False, True])
+@pytest.mark.parametrize("strip", [False, True])
+def test_python_bundler_round_trip(python_project, encode, strip):
+    args = ["--index-out", "out.idx"]
+    if not encode:
+        args.append("--no-encode")
+    if strip:
+        args.append("--strip")
+    run("python_bundler.py", *args, "app/main.py", "lib", "out.txt", cwd=python_project)
+
+    names = {"main.py": "app/main.py", "pkg/__init__.py": "app/pkg/__init__.py",
+             "pkg/util.py": "app/pkg/util.py", "../lib/helper.py": "lib/helper.py"}
+    files = extract_all(python_project / "out.txt", python_project / "out.idx")
+    assert files == expected(python_project, names, strip)
+
+    # The CLI verifies the sha256 of each file and keeps '../' paths inside --out-dir.
+    run("unbundle.py", "out.txt", "--index", "out.idx", "--out-dir", "restored", cwd=python_project)
+    restored = python_project / "restored"
+    assert (restored / "lib" / "helper.py").read_bytes() == files["../lib/helper.py"]
+    assert (restored / "pkg" / "util.py").read_bytes() == files["pkg/util.py"]
+    assert run("unbundle.py", "out.txt", "--index", "out.idx", "pkg/util.py",
+               cwd=python_project).encode("utf-8") == files["pkg/util.py"]
+
+
+@pytest.fixture
+def app_roots(tmp_path):
+    write(tmp_path, "web/package.json", '{"name": "web"}\n')
+    write(tmp_path, "web/src/app.js", "// entry\nconst r = (a) / 2; /* note */ export { r };\n")
+    write(tmp_path, "web/src/style.css", "/* theme */\n.a { color: red; }\n")
+    write(tmp_path, "api/src/server.ts", "export const s: string = 'é☃'; // é\n")
+    write(tmp_path, "docs/src/readme.js", "export default 1;\n")
+    return tmp_path
+
+
+@pytest.mark.parametrize("encode", [False, True])
+@pytest.mark.parametrize("strip", [False, True])
+def test_app_bundler_multi_root_round_trip(app_roots, encode, strip):
+    args = ["out.txt", "--index-out", "out.idx"]
+    if not encode:
+        args.append("--no-encode")
+    if strip:
+        args.append("--strip")
+    run("app-bundler.py", *args, "web", "docs", "--tree-only", "api", cwd=app_roots)
+
+    names = {"web/package.json": "web/package.json", "web/src/app.js": "web/src/app.js",
+             "web/src/style.css": "web/src/style.css", "api/src/server.ts": "api/src/server.ts"}
+    assert extract_all(app_roots / "out.txt", app_roots / "out.idx") == expected(app_roots, names, strip)
+
+
+def test_single_root_text_offsets(app_roots):
+    run("app-bundler.py", "web", "out.txt", "--no-encode", "--index-out", "out.idx", cwd=app_roots)
+    bundle_bytes = (app_roots / "out.txt").read_bytes()
+    index = load_index(str(app_roots / "out.idx"))
+    assert index["bundle_size"] == len(bundle_bytes)
+    for entry in index["entries"]:
+        data = (app_roots / "web" / entry["path"]).read_bytes()
+        assert bundle_bytes[entry["offset"]:entry["offset"] + entry["length"]] == data